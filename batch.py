@@ -0,0 +1,7 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\batch.py
+import sys
+
+from src.cli.batch import main
+
+if __name__ == "__main__":
+    sys.exit(main())
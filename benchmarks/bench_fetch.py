@@ -0,0 +1,70 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\benchmarks\bench_fetch.py
+"""
+Benchmark pełnego fetch_data bez sieci: fetchery dostawców są odtwarzane z kasety
+(benchmarks/fixtures/fetch_cassette.json, nagranie: python -m src.api.replay ... -o PLIK).
+Syntetyczne tickery (T0000, T0001, ...) dostają dane nagranych tickerów, więc przebieg po setkach
+tickerów jest powtarzalny. Opóźnienie dostawców: nagrane × --latency-scale albo stałe --latency;
+--error-rate wstrzykuje błędy (deterministycznie, --seed). Wypisuje podsumowanie pomiarów fetch_data.
+
+Ograniczenie: kaseta zawiera zmapowane wyniki fetcherów, nie odpowiedzi HTTP, więc benchmark mierzy
+planowanie, scalanie i narzut fetch_data bez parsowania odpowiedzi i mapowania pól (map_api_fields).
+Tryb scrapowania jest ustawiony na 'sync' – tryb 'async' omija fetchery MarketWatch/Investing i kasetę.
+
+Przykład:
+    python benchmarks/bench_fetch.py --tickers 300 --latency-scale 0.01 --error-rate 0.05
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.api import api_fetcher  # noqa: E402
+from src.api.provider_health import ProviderHealthRegistry  # noqa: E402
+from src.api.provider_planner import ProviderPlanner  # noqa: E402
+from src.api.replay import Cassette, replaying  # noqa: E402
+
+CASSETTE = os.path.join(ROOT, "benchmarks", "fixtures", "fetch_cassette.json")
+LIMITATION = ("Uwaga: odtwarzane są zmapowane wyniki fetcherów (nie odpowiedzi HTTP) – czasy nie obejmują "
+              "parsowania odpowiedzi ani mapowania pól; scrapowanie w trybie 'sync'.")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark fetch_data na odtwarzanej kasecie")
+    parser.add_argument("--cassette", default=CASSETTE)
+    parser.add_argument("--tickers", type=int, default=200, help="Liczba tickerów (syntetycznych)")
+    parser.add_argument("--latency", type=float, default=None, help="Stałe opóźnienie dostawcy w sekundach")
+    parser.add_argument("--latency-scale", type=float, default=0.0, help="Mnożnik nagranych opóźnień")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--metrics", help="Zapis podsumowania pomiarów (.json)")
+    args = parser.parse_args(argv)
+
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    with replaying(Cassette(args.cassette), latency=args.latency, latency_scale=args.latency_scale,
+                   error_rate=args.error_rate, alias_unknown=True, seed=args.seed) as provider:
+        start = time.perf_counter()
+        results, missing, metrics = api_fetcher.fetch_data(
+            tickers, scrape_mode="sync", health_registry=ProviderHealthRegistry(), planner=ProviderPlanner(path=None),
+            return_metrics=True,
+        )
+        elapsed = time.perf_counter() - start
+
+    print(f"{len(results)} tickerów w {elapsed:.3f}s ({elapsed / max(1, len(tickers)) * 1e3:.2f} ms/ticker), "
+          f"niekompletne: {len(missing)}")
+    print(f"Odtwarzanie: {provider.stats}")
+    print(LIMITATION)
+    print(metrics.format_summary())
+    if args.metrics:
+        metrics.export_json(args.metrics)
+    else:
+        print(json.dumps(metrics.summary()["totals"], indent=4))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\benchmarks\bench_pipeline.py
+"""
+Benchmark potoku odświeżenie → punktacja → tabela na syntetycznych uniwersach spółek.
+
+Dla każdego rozmiaru (domyślnie 100, 1000, 10000) w katalogu roboczym powstaje `universe_<n>/data/`
+z plikami historii (dzienne notowania w dni robocze z --years lat, co --step-days dni), po czym mierzone są:
+wczytanie CompanyData, classify_phase i calculate_score dla całego uniwersum, calculate_trend,
+load_company_history i save_company_data dla próbki tickerów oraz build_table_rows (odpowiednik
+MainWindow.update_table bez tkinter). Kod aplikacji czyta konfiguracje sektorów z `src/core/sectors`
+względem katalogu bieżącego, więc benchmark pracuje w katalogu roboczym z ich kopią; gdy pliki
+konfiguracji są niedostępne (np. niepobrane z Git LFS), zapisywana jest syntetyczna konfiguracja.
+
+Wyniki trafiają do JSON (--output); --baseline porównuje przebieg z wcześniejszym wynikiem,
+a --compare STARY NOWY porównuje dwa zapisane wyniki bez uruchamiania. Etap wolniejszy o więcej niż
+--tolerance (domyślnie 20%) jest oznaczany jako regresja (kod wyjścia 1).
+
+Przykład:
+    python benchmarks/bench_pipeline.py --sizes 100 1000 --output bench.json
+    python benchmarks/bench_pipeline.py --sizes 100 1000 --baseline bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.core.company_data import CompanyData  # noqa: E402
+from src.core.phase_classifier import classify_phase  # noqa: E402
+from src.core.scoring_calculator import calculate_score, calculate_trend  # noqa: E402
+from src.core.table_model import build_table_rows  # noqa: E402
+from src.core.utils import load_sector_config  # noqa: E402
+
+SECTORS = ["Technology", "Financials", "Biotechnology"]
+PHASES = ["Start-up", "Wzrost", "Dojrzałość", "Schyłek"]
+COLUMNS = ("ticker", "nazwa", "sektor", "faza", "punkty", "więcej")
+# wskaźnik → (średnia, odchylenie) rozkładu syntetycznych wartości
+INDICATORS = {
+    "pe_ratio": (22.0, 12.0),
+    "forward_pe": (19.0, 10.0),
+    "peg_ratio": (1.8, 1.0),
+    "revenue_growth": (12.0, 18.0),
+    "gross_margin": (48.0, 18.0),
+    "debt_equity": (0.9, 0.6),
+    "current_ratio": (1.6, 0.7),
+    "roe": (15.0, 12.0),
+    "eps_ttm": (3.0, 4.0),
+    "price_to_book_ratio": (4.0, 3.0),
+    "price_to_sales_ratio": (5.0, 4.0),
+    "operating_margin": (18.0, 14.0),
+    "profit_margin": (12.0, 12.0),
+    "quick_ratio": (1.3, 0.6),
+    "earnings_growth": (8.0, 20.0),
+    "analyst_target_price": (120.0, 60.0),
+}
+
+
+def synthetic_sector_config() -> Dict:
+    """Konfiguracja sektora w formacie src/core/sectors (fazy, wskaźniki, progi, klasyfikacja)."""
+    main = ["revenue_growth", "gross_margin", "roe", "debt_equity", "pe_ratio"]
+    thresholds = {
+        "revenue_growth": [(30, 20, ">"), (15, 12, ">"), (5, 6, ">"), (0, 0, "<=")],
+        "gross_margin": [(60, 18, ">"), (40, 12, ">"), (20, 6, ">"), (0, 0, "<=")],
+        "roe": [(25, 18, ">"), (15, 12, ">"), (5, 6, ">"), (0, 0, "<=")],
+        "debt_equity": [(0.3, 18, "<"), (1.0, 12, "<"), (2.0, 6, "<"), (3.0, 0, ">=")],
+        "pe_ratio": [(10, 19, "<"), (20, 12, "<"), (35, 6, "<"), (50, 0, ">=")],
+    }
+    phase_config = {
+        "main": main,
+        "fallback": {
+            "revenue_growth": [{"indicator": "earnings_growth", "weight": 0.15}],
+            "roe": [{"indicator": "profit_margin", "weight": 0.15}],
+            "pe_ratio": [{"indicator": "forward_pe", "weight": 0.1}, {"indicator": "price_to_sales_ratio", "weight": 0.05}],
+        },
+        "weights": {indicator: 0.2 for indicator in main},
+    }
+    return {
+        "indicators": {phase: phase_config for phase in PHASES},
+        "scoring_thresholds": {
+            phase: {
+                indicator: [{"threshold": t, "points": p, "condition": c} for t, p, c in rules]
+                for indicator, rules in thresholds.items()
+            }
+            for phase in PHASES
+        },
+        "phase_classification": {
+            "Start-up": [{"indicator": "revenue_growth", "condition": ">", "value": 40}, {"indicator": "eps_ttm", "condition": "<", "value": 0}],
+            "Wzrost": [{"indicator": "revenue_growth", "condition": ">", "value": 15}, {"indicator": "eps_ttm", "condition": ">", "value": 0}],
+            "Dojrzałość": [{"indicator": "revenue_growth", "condition": "<=", "value": 15}, {"indicator": "profit_margin", "condition": ">", "value": 8}],
+            "Schyłek": [{"indicator": "revenue_growth", "condition": "<", "value": 0}, {"indicator": "profit_margin", "condition": "<", "value": 3}],
+        },
+    }
+
+
+def prepare_workdir(workdir: str) -> str:
+    """Kopiuje konfiguracje sektorów do katalogu roboczego (lub zapisuje syntetyczne, gdy są nieczytelne)."""
+    sectors_dir = os.path.join(workdir, "src", "core", "sectors")
+    os.makedirs(sectors_dir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        real = {sector: load_sector_config(sector) for sector in SECTORS}
+    finally:
+        os.chdir(cwd)
+    for sector, config in real.items():
+        path = os.path.join(sectors_dir, f"{sector.lower()}.json")
+        if config is not None:
+            shutil.copyfile(os.path.join(ROOT, "src", "core", "sectors", f"{sector.lower()}.json"), path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(synthetic_sector_config(), f, ensure_ascii=False)
+    return "synthetic" if any(config is None for config in real.values()) else "repository"
+
+
+def _business_days(years: int, step: int) -> List[str]:
+    end = date.today()
+    day = end - timedelta(days=365 * years)
+    days = []
+    while day <= end:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    days = days[::-1][::step][::-1]  # ostatni dzień (dzisiejszy zapis) zawsze w historii
+    return [d.isoformat() for d in days]
+
+
+def _revenues(day: str, base: float, growth: float, count: int, months: int) -> List[Dict]:
+    current = datetime.strptime(day, "%Y-%m-%d").date()
+    period_end = date(current.year, ((current.month - 1) // 3) * 3 + 1, 1) - timedelta(days=1)
+    entries = []
+    for i in range(count):
+        end = period_end - timedelta(days=int(30.4 * months * i))
+        entries.append({"date": end.isoformat(), "revenue": f"{base * (1 + growth) ** (-i):.2f}", "is_manual": False})
+    return entries
+
+
+def generate_universe(data_dir: str, size: int, years: int, step: int, seed: int) -> None:
+    """Zapisuje `size` plików historii spółek (losowe błądzenie wskaźników, stałe ziarno)."""
+    os.makedirs(data_dir, exist_ok=True)
+    days = _business_days(years, step)
+    rng = random.Random(seed)
+    for n in range(size):
+        ticker = f"S{n:05d}"
+        sector = SECTORS[n % len(SECTORS)]
+        values = {key: rng.gauss(mean, sd) for key, (mean, sd) in INDICATORS.items()}
+        price = rng.uniform(5, 500)
+        revenue = rng.uniform(5e7, 5e10)
+        growth = values["revenue_growth"] / 400
+        history = []
+        for day in days:
+            price *= 1 + rng.gauss(0.0003, 0.02)
+            for key, (_, sd) in INDICATORS.items():
+                values[key] += rng.gauss(0, sd * 0.01)
+            entry = {"ticker": ticker, "date": day, "is_in_portfolio": n % 50 == 0, "nazwa": f"Synthetic {n}",
+                     "sektor": sector, "faza": None, "punkty": None, "cena": f"{price:.2f}"}
+            entry.update({key: f"{value:.2f}" for key, value in values.items()})
+            entry["market_cap"] = f"{price * 1e8:.2f}"
+            entry["revenue"] = f"{revenue:.2f}"
+            entry["quarterly_revenue"] = _revenues(day, revenue / 4, growth, 4, 3)
+            entry["yearly_revenue"] = _revenues(day, revenue, growth * 4, 3, 12)
+            history.append(entry)
+        with open(os.path.join(data_dir, f"{ticker}.json"), "w", encoding="utf-8") as f:
+            json.dump(history, f)
+
+
+def _timed(stage: Dict, name: str, count: int, func: Callable[[], None]) -> None:
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    stage[name] = {
+        "seconds": round(seconds, 4),
+        "count": count,
+        "per_item_ms": round(seconds / count * 1e3, 4) if count else None,
+    }
+    print(f"  {name:24} {seconds:10.3f}s  ({count} elem.)")
+
+
+def run_size(workdir: str, size: int, args: argparse.Namespace) -> Dict:
+    """Generuje (lub używa istniejącego) uniwersum i mierzy etapy potoku."""
+    data_dir = os.path.join(workdir, f"universe_{size}", "data")
+    stages: Dict[str, Dict] = {}
+    if args.regenerate or not os.path.isdir(data_dir) or len(os.listdir(data_dir)) != size:
+        shutil.rmtree(data_dir, ignore_errors=True)
+        _timed(stages, "generate", size, lambda: generate_universe(data_dir, size, args.years, args.step_days, args.seed))
+    holder = {}
+    _timed(stages, "load_all_companies", size, lambda: holder.update(company_data=CompanyData(data_dir=data_dir)))
+    company_data: CompanyData = holder["company_data"]
+    companies = company_data.companies
+    sample = companies[: args.sample]
+
+    def classify_all():
+        for company in companies:
+            company["faza"] = classify_phase(company["sektor"], company) or "None"
+
+    def score_all():
+        for company in companies:
+            if company["faza"] != "None":
+                score, _ = calculate_score(company["sektor"], company["faza"], company, company_data)
+                company["punkty"] = str(round(float(score), 2)) if score is not None else "None"
+
+    _timed(stages, "classify_phase", len(companies), classify_all)
+    _timed(stages, "calculate_score", len(companies), score_all)
+    _timed(stages, "calculate_trend", len(sample), lambda: [
+        calculate_trend(c["ticker"], company_data, c["sektor"], c["faza"]) for c in sample if c["faza"] != "None"
+    ])
+    _timed(stages, "load_company_history", len(sample), lambda: [company_data.load_company_history(c["ticker"]) for c in sample])
+    _timed(stages, "save_company_data", len(sample), lambda: [company_data.save_company_data(c["ticker"], c) for c in sample])
+    _timed(stages, "update_table", len(companies), lambda: build_table_rows(company_data, COLUMNS))
+    return stages
+
+
+def compare(baseline: Dict, current: Dict, tolerance: float) -> List[str]:
+    """
+    Porównuje czasy etapów dwóch wyników.
+    Returns:
+        Lista opisów regresji (etapy wolniejsze o więcej niż `tolerance`); wypisuje pełne zestawienie.
+    """
+    regressions = []
+    for size, stages in current.get("sizes", {}).items():
+        for name, result in stages.items():
+            before = baseline.get("sizes", {}).get(size, {}).get(name)
+            if not before or name == "generate" or not before["seconds"]:
+                continue
+            ratio = result["seconds"] / before["seconds"]
+            flag = "REGRESJA" if ratio > 1 + tolerance else ""
+            print(f"{size:>6} {name:24} {before['seconds']:10.3f}s → {result['seconds']:10.3f}s  x{ratio:5.2f} {flag}")
+            if flag:
+                regressions.append(f"{size}/{name}: x{ratio:.2f}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark potoku odświeżenie → punktacja → tabela")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--years", type=int, default=2, help="Długość historii w latach")
+    parser.add_argument("--step-days", type=int, default=5,
+                        help="Co który dzień roboczy zapis historii (1 – pełna historia dzienna, duże pliki przy 10k spółek)")
+    parser.add_argument("--sample", type=int, default=100, help="Liczba tickerów dla etapów per ticker (trend, historia, zapis)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", help="Katalog roboczy (domyślnie tymczasowy; podany jest używany ponownie)")
+    parser.add_argument("--regenerate", action="store_true", help="Wygeneruj uniwersa od nowa")
+    parser.add_argument("-o", "--output", help="Plik wyników (.json)")
+    parser.add_argument("--baseline", help="Wcześniejszy wynik do porównania z tym przebiegiem")
+    parser.add_argument("--compare", nargs=2, metavar=("STARY", "NOWY"), help="Porównaj dwa wyniki bez uruchamiania")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--log-level", default="ERROR", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level))
+
+    if args.compare:
+        with open(args.compare[0], "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.compare[1], "r", encoding="utf-8") as f:
+            current = json.load(f)
+        return 1 if compare(baseline, current, args.tolerance) else 0
+
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="bench_pipeline_")
+    sectors = prepare_workdir(workdir)
+    result = {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "years": args.years,
+        "step_days": args.step_days,
+        "sample": args.sample,
+        "sector_config": sectors,
+        "sizes": {},
+    }
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for size in args.sizes:
+            print(f"Uniwersum {size} spółek ({workdir}, konfiguracja sektorów: {sectors})")
+            result["sizes"][str(size)] = run_size(workdir, size, args)
+    finally:
+        os.chdir(cwd)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=4, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(json.load(f), result, args.tolerance)
+        if regressions:
+            print(f"Regresje: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\benchmarks\bench_scraper.py
+"""
+Porównanie parsowania zapisanych stron (benchmarks/fixtures/*.html): dotychczasowe podejście
+(html.parser, cały dokument, osobne `soup.find` dla każdego pola) kontra parse_marketwatch /
+parse_investing (lxml, SoupStrainer, jedno przejście). Sprawdza też zgodność wyników.
+
+Przykład:
+    python benchmarks/bench_scraper.py --repeat 20
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from src.api import scraper  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def legacy_marketwatch(html: str) -> Dict:
+    """Parsowanie MarketWatch sprzed zmiany (pełny html.parser + wielokrotne find)."""
+    soup = BeautifulSoup(html, "html.parser")
+    data = {}
+    name_elem = soup.find("h1", class_="company__name")
+    data["company_name"] = name_elem.text.strip() if name_elem else ""
+    for label, key in scraper.KEY_DATA_LABELS.items():
+        elem = soup.find("small", string=label)
+        if elem:
+            value = elem.find_next("span", class_="primary")
+            data[key] = value.text.strip() if value else ""
+    price_elem = soup.find("bg-quote", class_="value")
+    data["current_price"] = price_elem.text.strip() if price_elem else ""
+    return data
+
+
+def legacy_investing(html: str) -> Dict:
+    """Parsowanie Investing.com sprzed zmiany (pełny html.parser + wielokrotne find)."""
+    soup = BeautifulSoup(html, "html.parser")
+    data = {}
+    name_elem = soup.find("h1", class_="instrument-header_title__GTWDv")
+    data["company_name"] = name_elem.text.strip() if name_elem else ""
+    for label, key in scraper.KEY_DATA_LABELS.items():
+        elem = soup.find("span", string=label)
+        if elem:
+            value = elem.find_next("span")
+            data[key] = value.text.strip() if value else ""
+    price_elem = soup.find("div", class_="instrument-price_instrument-price__3uw25")
+    data["current_price"] = price_elem.text.strip() if price_elem else ""
+    return data
+
+
+CASES = [
+    ("marketwatch_aapl.html", legacy_marketwatch, scraper.parse_marketwatch),
+    ("investing_aapl.html", legacy_investing, scraper.parse_investing),
+]
+
+
+def _time(func: Callable[[str], Dict], html: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark parsowania stron scrapera")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    print(f"parser: {scraper._get_parser()}")
+    status = 0
+    for fixture, legacy, current in CASES:
+        with open(os.path.join(FIXTURES, fixture), "r", encoding="utf-8") as f:
+            html = f.read()
+        if legacy(html) != current(html):
+            print(f"{fixture}: NIEZGODNE WYNIKI {legacy(html)} != {current(html)}")
+            status = 1
+        before = _time(legacy, html, args.repeat)
+        after = _time(current, html, args.repeat)
+        print(f"{fixture:26} przed: {before * 1000:8.2f} ms   po: {after * 1000:8.2f} ms   x{before / after:.1f}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\benchmarks\bench_sentiment.py
+"""
+Porównanie backendów sentymentu na dołączonym korpusie postów (benchmarks/fixtures/sentiment_corpus.json):
+czas inicjalizacji, przepustowość (posty/s), trafność względem etykiet korpusu oraz zgodność
+z DistilBERT (backend 'transformers'), o ile jest dostępny.
+
+Przykład:
+    python benchmarks/bench_sentiment.py --backends lexicon quantized transformers --repeat 20
+    python benchmarks/bench_sentiment.py --backends lexicon --workers 1 2 4 --tickers 400
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.core import sentiment_analyzer  # noqa: E402
+
+CORPUS_PATH = os.path.join(ROOT, "benchmarks", "fixtures", "sentiment_corpus.json")
+BASELINE = "transformers"
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_backend(name: str, texts: List[str], repeat: int, batch_size: int) -> Optional[Dict]:
+    """Mierzy jeden backend (bez cache wyników); None gdy backend jest niedostępny."""
+    start = time.perf_counter()
+    backend = sentiment_analyzer.create_backend(name)
+    init_seconds = time.perf_counter() - start
+    if not backend.available:
+        return None
+
+    labels = [label for label, _ in backend.classify(texts[:batch_size] or texts)]  # rozgrzewka
+    start = time.perf_counter()
+    for _ in range(repeat):
+        labels = []
+        for i in range(0, len(texts), batch_size):
+            labels.extend(label for label, _ in backend.classify(texts[i:i + batch_size]))
+    elapsed = time.perf_counter() - start
+    return {
+        "init_seconds": round(init_seconds, 4),
+        "posts_per_second": round(len(texts) * repeat / elapsed, 1) if elapsed else None,
+        "labels": labels,
+    }
+
+
+def run_parallel(name: str, texts: List[str], tickers: int, workers: int, batch_size: int) -> float:
+    """Mierzy przepustowość (tickery/s) trybu wieloprocesowego score_tickers_parallel."""
+    items = [(f"T{i}", texts) for i in range(tickers)]
+    start = time.perf_counter()
+    done = sum(1 for _ in sentiment_analyzer.score_tickers_parallel(
+        items, workers=workers, backend=name, batch_size=batch_size))
+    return round(done / (time.perf_counter() - start), 2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark backendów sentymentu")
+    parser.add_argument("--backends", nargs="+", default=list(sentiment_analyzer.BACKENDS))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=sentiment_analyzer.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--workers", type=int, nargs="*", default=[],
+                        help="Liczby procesów do pomiaru skalowania score_tickers_parallel")
+    parser.add_argument("--tickers", type=int, default=200, help="Liczba tickerów w pomiarze wieloprocesowym")
+    parser.add_argument("--save", help="Zapisz wyniki do pliku JSON")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    texts = [item["text"] for item in corpus]
+    gold = [item["label"] for item in corpus]
+
+    results = {}
+    for name in args.backends:
+        outcome = run_backend(name, texts, args.repeat, args.batch_size)
+        if outcome is None:
+            print(f"{name:14} pominięto (backend niedostępny)")
+            continue
+        outcome["accuracy"] = round(sum(a == b for a, b in zip(outcome["labels"], gold)) / len(gold), 3)
+        results[name] = outcome
+
+    baseline_labels = results.get(BASELINE, {}).get("labels")
+    print(f"{'backend':14} {'init [s]':>9} {'posty/s':>10} {'trafność':>9} {'zgodność z DistilBERT':>22}")
+    for name, outcome in results.items():
+        agreement = None
+        if baseline_labels:
+            agreement = round(sum(a == b for a, b in zip(outcome["labels"], baseline_labels)) / len(texts), 3)
+        outcome["agreement_with_baseline"] = agreement
+        print(
+            f"{name:14} {outcome['init_seconds']:>9.3f} {outcome['posts_per_second']:>10} "
+            f"{outcome['accuracy']:>9.3f} {('-' if agreement is None else f'{agreement:.3f}'):>22}"
+        )
+
+    for name in results:
+        for workers in args.workers:
+            # cache wyników jest per proces – każdy pomiar startuje z nowymi procesami
+            rate = run_parallel(name, texts, args.tickers, workers, args.batch_size)
+            results[name].setdefault("parallel_tickers_per_second", {})[workers] = rate
+            print(f"{name:14} procesy: {workers:>2}   tickery/s: {rate}")
+
+    if args.save:
+        summary = {name: {k: v for k, v in o.items() if k != "labels"} for name, o in results.items()}
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"corpus_size": len(texts), "repeat": args.repeat, "results": summary}, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\benchmarks\bench_startup.py
+"""
+Pomiar kosztu startu aplikacji: czas importu kluczowych modułów (każdy w świeżym procesie)
+oraz – gdy dostępny jest ekran – czas do pierwszego wyrenderowania głównego okna.
+
+Przykład:
+    python benchmarks/bench_startup.py --save startup.json
+    python benchmarks/bench_startup.py --baseline startup.json --tolerance 0.25
+Kod wyjścia 1 oznacza regresję względem pliku bazowego.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_TARGETS = [
+    "src.core.company_data",
+    "src.api.api_fetcher",
+    "src.core.sentiment_analyzer",
+    "src.cli.batch",
+    "src.gui.main_window",
+]
+
+HEAVY_MODULES = ["requests", "yfinance", "pandas", "matplotlib", "transformers", "bs4"]
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+_WINDOW_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import tkinter as tk
+from src.gui.main_window import MainWindow
+root = tk.Tk()
+MainWindow(root)
+root.update()
+elapsed = time.perf_counter() - start
+root.destroy()
+print(json.dumps({"seconds": elapsed}))
+"""
+
+
+def _run_snippet(code: str) -> Optional[Dict]:
+    """Uruchamia fragment kodu w nowym interpreterze i zwraca ostatnią linię JSON ze stdout."""
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    for line in reversed(proc.stdout.strip().splitlines()):
+        try:
+            return json.loads(line)
+        except ValueError:
+            continue
+    return None
+
+
+def measure_imports(repeat: int) -> Dict[str, Dict]:
+    """Mierzy medianę czasu importu każdego modułu docelowego (w osobnym procesie)."""
+    results = {}
+    for module in IMPORT_TARGETS:
+        samples: List[float] = []
+        heavy: List[str] = []
+        for _ in range(repeat):
+            out = _run_snippet(_IMPORT_SNIPPET.format(module=module, heavy=HEAVY_MODULES))
+            if out is None:
+                break
+            samples.append(out["seconds"])
+            heavy = out["heavy"]
+        if samples:
+            results[module] = {"seconds": round(statistics.median(samples), 4), "heavy": heavy}
+        else:
+            results[module] = {"seconds": None, "heavy": [], "skipped": "błąd importu (brak zależności/ekranu)"}
+    return results
+
+
+def measure_first_window(repeat: int) -> Optional[float]:
+    """Mierzy czas do pierwszego wyrenderowania MainWindow; None gdy brak ekranu."""
+    if sys.platform != "win32" and not os.environ.get("DISPLAY"):
+        return None
+    samples = []
+    for _ in range(repeat):
+        out = _run_snippet(_WINDOW_SNIPPET)
+        if out is None:
+            return None
+        samples.append(out["seconds"])
+    return round(statistics.median(samples), 4)
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Zwraca listę opisów regresji (czas większy niż baseline * (1 + tolerance))."""
+    regressions = []
+    base_imports = baseline.get("imports", {})
+    for module, stats in current["imports"].items():
+        base = base_imports.get(module, {}).get("seconds")
+        if base and stats["seconds"] and stats["seconds"] > base * (1 + tolerance):
+            regressions.append(f"import {module}: {stats['seconds']:.4f}s > {base:.4f}s")
+    base_window = baseline.get("first_window_seconds")
+    window = current.get("first_window_seconds")
+    if base_window and window and window > base_window * (1 + tolerance):
+        regressions.append(f"pierwsze okno: {window:.4f}s > {base_window:.4f}s")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark startu aplikacji Analizator")
+    parser.add_argument("--repeat", type=int, default=5, help="Liczba powtórzeń (mediana)")
+    parser.add_argument("--save", help="Zapisz wyniki do pliku JSON")
+    parser.add_argument("--baseline", help="Porównaj z wynikami z pliku JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Dopuszczalny wzrost czasu (ułamek)")
+    args = parser.parse_args(argv)
+
+    current = {
+        "python": sys.version.split()[0],
+        "imports": measure_imports(args.repeat),
+        "first_window_seconds": measure_first_window(args.repeat),
+    }
+    for module, stats in current["imports"].items():
+        seconds = f"{stats['seconds']:.4f}s" if stats["seconds"] is not None else "pominięto"
+        heavy = ", ".join(stats["heavy"]) or "-"
+        print(f"{module:32} {seconds:>10}   ciężkie moduły: {heavy}")
+    window = current["first_window_seconds"]
+    print(f"{'pierwsze okno':32} {(f'{window:.4f}s' if window is not None else 'pominięto (brak ekranu)'):>10}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=4, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESJA: {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
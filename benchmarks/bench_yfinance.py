@@ -0,0 +1,80 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\benchmarks\bench_yfinance.py
+"""
+Porównanie odczytu przychodów z zapisanych ramek sprawozdań (benchmarks/fixtures/yfinance_statements.json):
+dotychczasowe podejście (iterrows po wszystkich okresach i `row.get` na pełnym wierszu, potem obcięcie
+listy) kontra api_fetcher._statement_revenue (tylko pozycja 'Total Revenue' i potrzebne okresy,
+dostęp kolumnowy). Ramka yahooquery (okresy w wierszach) jest budowana z tych samych danych.
+Sprawdza też zgodność wyników.
+
+Przykład:
+    python benchmarks/bench_yfinance.py --repeat 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from src.api.api_fetcher import _statement_revenue  # noqa: E402
+
+FIXTURE = os.path.join(ROOT, "benchmarks", "fixtures", "yfinance_statements.json")
+
+
+def load_frames() -> dict:
+    """Ramki yfinance (pozycje × okresy) i yahooquery (okresy × pozycje) z zapisanego pliku."""
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    frames = {}
+    for name in ("quarterly_financials", "financials"):
+        raw = fixture[name]
+        frame = pd.DataFrame(raw["data"], index=raw["index"], columns=pd.to_datetime(raw["columns"]))
+        frames[f"yfinance {name}"] = (frame, "Total Revenue")
+        yq = frame.T.rename(columns=lambda c: c.replace(" ", ""))
+        yq.insert(0, "periodType", "3M" if name.startswith("quarterly") else "12M")
+        yq.insert(0, "asOfDate", yq.index)
+        frames[f"yahooquery {name}"] = (yq.reset_index(drop=True), "TotalRevenue")
+    return frames
+
+
+def legacy_revenue(frame: pd.DataFrame, label: str, limit: int) -> List[dict]:
+    """Podejście sprzed zmiany: iterrows po okresach (wierszach) i obcięcie gotowej listy."""
+    rows = frame.T if label in frame.index else frame.set_index("asOfDate").sort_index(ascending=False)
+    return [
+        {"date": str(index), "revenue": float(row.get(label, None)) if row.get(label) else None}
+        for index, row in rows.iterrows()
+        if row.get(label) is not None
+    ][:limit]
+
+
+def _time(func: Callable, repeat: int, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark odczytu przychodów z ramek sprawozdań")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    status = 0
+    for name, (frame, label) in load_frames().items():
+        limit = 4 if "quarterly" in name else 5
+        if legacy_revenue(frame, label, limit) != _statement_revenue(frame, label, limit):
+            print(f"{name}: NIEZGODNE WYNIKI")
+            status = 1
+        before = _time(legacy_revenue, args.repeat, frame, label, limit)
+        after = _time(_statement_revenue, args.repeat, frame, label, limit)
+        print(f"{name:32} przed: {before * 1e6:9.1f} µs   po: {after * 1e6:9.1f} µs   x{before / after:.1f}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
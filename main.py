@@ -1,11 +1,8 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\Analizator\main.py
-import tkinter as tk
-from src.gui.main_window import MainWindow
-from src.core.logging_config import setup_logging
 import logging
 
-# Inicjalizacja logowania
-setup_logging()
+from src.core.logging_config import setup_logging
+from src.core.profiling import enable_from_env
 
 def main():
     """
@@ -27,7 +24,14 @@ def main():
         >>> main()
         # Uruchamia aplikację, tworząc okno GUI i zapisując logi do error.log
     """
+    # Logowanie konfigurujemy dopiero w punkcie wejścia, a GUI (tkinter, matplotlib) importujemy
+    # leniwie – import modułów biblioteki nie ma efektów ubocznych ani kosztu startu okna.
+    setup_logging()
+    enable_from_env()  # PROFILE=cprofile|sampling – profilowanie od startu
     try:
+        import tkinter as tk
+        from src.gui.main_window import MainWindow
+
         root = tk.Tk()
         app = MainWindow(root)
         logging.info("Uruchomiono aplikację Analizator")
@@ -1,56 +1,184 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\api_fetcher.py
 import logging
 import os
+import threading
 import time
-from datetime import datetime
-
-import requests
-import yfinance as yf
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from datetime import datetime, timezone
+from functools import partial
 
 from src.api.api_field_mapping import map_api_fields
-from src.api.api_keys import get_api_key
+from src.api.fetch_metrics import FetchMetrics, collecting, current_metrics
+from src.api.key_pool import KeysExhausted, get_key_pool
 import src.api.scraper as scraper  # ważne: import modułu (łatwy patch w testach)
-from src.core.logging_config import setup_logging
-
-# --- Importy opcjonalne (bez twardej zależności w czasie importu modułu) ---
-try:
-    # Alpha Vantage – jeżeli brak biblioteki, wyłączamy tylko ten fetcher
-    from alpha_vantage.fundamentaldata import FundamentalData  # type: ignore
-except Exception:
-    logging.warning(
-        "Biblioteka 'alpha_vantage' nie jest zainstalowana – fetch_from_alpha_vantage zostanie pominięty."
-    )
-    FundamentalData = None  # type: ignore[misc]
-
-try:
-    # yahooquery – jeżeli brak biblioteki, wyłączamy tylko ten fetcher
-    from yahooquery import Ticker as YahooQueryTicker  # type: ignore
-except Exception:
-    logging.warning(
-        "Biblioteka 'yahooquery' nie jest zainstalowana – fetch_from_yahooquery zostanie pominięty."
+from src.api.provider_health import get_registry
+from src.api.provider_planner import get_planner
+from src.api.singleflight import get_singleflight
+from src.core.profiling import profiled
+
+# Biblioteki sieciowe (requests, yfinance, alpha_vantage, yahooquery) importujemy leniwie
+# w funkcjach – import modułu nie ładuje pandas/yfinance, co skraca start GUI i trybu wsadowego.
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    """
+    Zwraca współdzieloną sesję HTTP z konfiguracją retry (tworzoną przy pierwszym użyciu).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                session = requests.Session()
+                # Krótkie ponowienia – trwałe awarie dostawcy obsługuje bezpiecznik (provider_health)
+                retries = Retry(total=2, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+                session.mount("https://", HTTPAdapter(max_retries=retries))
+                _session = session
+    return _session
+
+
+def _response_stats(response) -> dict:
+    """Status, rozmiar treści i liczba ponowień urllib3 odpowiedzi (0/None, gdy niedostępne)."""
+    status = getattr(response, "status_code", None)
+    content = getattr(response, "content", None)
+    try:
+        retries = len(response.raw.retries.history)
+    except Exception:
+        retries = 0
+    return {
+        "status": status if isinstance(status, int) else None,
+        "size": len(content) if isinstance(content, (bytes, str)) else 0,
+        "retries": retries if isinstance(retries, int) else 0,
+    }
+
+
+# Awaria dostawcy w bieżącym wywołaniu fetchera (wyjątek, błąd sieci, HTTP 429/5xx) – dla bezpiecznika.
+# Pusta odpowiedź (brak danych dla tickera) awarią nie jest: trafia tylko do planera.
+_CALL_STATE = threading.local()
+FAILURE_STATUSES = {429}
+
+
+def _note_failure() -> None:
+    """Oznacza bieżące wywołanie dostawcy jako nieudane."""
+    _CALL_STATE.failed = True
+
+
+def _tracked_call(call) -> tuple:
+    """Wykonuje wywołanie fetchera i zwraca (dane, czy wystąpiła awaria dostawcy)."""
+    _CALL_STATE.failed = False
+    try:
+        data = call()
+        return data, _CALL_STATE.failed
+    finally:
+        _CALL_STATE.failed = False
+
+
+def _get(provider: str, endpoint: str, ticker: str, url: str, timeout: int = 15):
+    """
+    GET przez wspólną sesję z deduplikacją (src.api.singleflight): równoczesne żądania o ten sam
+    (dostawca, endpoint, ticker) współdzielą jedno wywołanie HTTP, a odpowiedzi 200 są krótko pamiętane.
+    Żądanie lub trafienie w pamięć jest rejestrowane w pomiarach bieżącego fetch_data (src.api.fetch_metrics).
+    """
+    metrics = current_metrics()
+    executed = []
+
+    def request():
+        executed.append(True)
+        start = time.perf_counter()
+        try:
+            response = _get_session().get(url, timeout=timeout)
+        except Exception:
+            if metrics is not None:
+                metrics.record_request(provider, endpoint, time.perf_counter() - start, error=True)
+            raise
+        if metrics is not None:
+            metrics.record_request(provider, endpoint, time.perf_counter() - start, **_response_stats(response))
+        return response
+
+    response = get_singleflight().do(
+        (provider, endpoint, ticker.upper()),
+        request,
+        memoize=lambda result: getattr(result, "status_code", None) == 200,
     )
-    YahooQueryTicker = None  # type: ignore[misc]
+    if not executed and metrics is not None:
+        metrics.record_cache_hit(provider, endpoint)
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int) and (status in FAILURE_STATUSES or status >= 500):
+        _note_failure()
+    return response
+
+
+def _pause(provider: str, seconds: float) -> None:
+    """Stałe opóźnienie przed zapytaniem (ochrona przed 429), liczone w pomiarach jako oczekiwanie na limit."""
+    time.sleep(seconds)
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.record_rate_limit_sleep(provider, seconds)
+
 
-# Inicjalizacja logowania
-setup_logging()
+def _number(value):
+    """Liczba z wartości dostawcy (None dla braków, NaN i wartości nieliczbowych)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return None
+    return float(value)
 
-# Konfiguracja retry dla żądań HTTP
-session = requests.Session()
-retries = Retry(total=5, backoff_factor=2, status_forcelist=[429, 500, 502, 503, 504])
-session.mount("https://", HTTPAdapter(max_retries=retries))
 
+def _statement_revenue(frame, label: str, limit: int) -> list:
+    """
+    Lista {"date", "revenue"} z ramki sprawozdania bez iterrows – tylko pozycja `label`
+    i `limit` najnowszych okresów, dostęp kolumnowy.
+    Układ yfinance: pozycje w indeksie, okresy w kolumnach (od najnowszego).
+    Układ yahooquery: okresy w wierszach (kolumna 'asOfDate', bez wierszy 'TTM').
+    """
+    try:
+        if frame is None or not hasattr(frame, "index") or getattr(frame, "empty", True):
+            return []
+        import numpy as np
 
-def fetch_from_yfinance(ticker: str, data_type: str = "company") -> dict:
+        if label in frame.index:
+            values = frame.loc[label].to_numpy(dtype=float)
+            dates = frame.columns
+            mask = ~np.isnan(values)
+            order = np.flatnonzero(mask)
+        elif label in frame.columns:
+            values = frame[label].to_numpy(dtype=float)
+            mask = ~np.isnan(values)
+            if "periodType" in frame.columns:
+                mask &= frame["periodType"].to_numpy() != "TTM"
+            order = np.flatnonzero(mask)
+            if "asOfDate" in frame.columns:
+                dates = frame["asOfDate"]
+                keys = dates.to_numpy()[order]
+                order = order[np.argsort(keys, kind="stable")[::-1]]
+                dates = dates.tolist()
+            else:
+                dates = frame.index
+        else:
+            return []
+        order = order[:limit]
+        return [{"date": str(dates[i]), "revenue": float(values[i]) if values[i] else None} for i in order]
+    except Exception as e:
+        logging.error(f"Błąd odczytu pozycji {label} ze sprawozdania: {str(e)}")
+        return []
+
+
+def fetch_from_yfinance(ticker: str, data_type: str = "company", statements: bool = True) -> dict:
     """
     Pobiera dane z Yahoo Finance dla podanego tickera.
+    statements=False – bez sprawozdań (quarterly_financials/financials); zwraca wtedy dodatkowo
+    'latest_period' i 'next_earnings' do wykrycia nowego okresu (odświeżanie przyrostowe).
     """
     try:
         if data_type not in ["company", "etf"]:
             logging.info(f"Pomijam yfinance dla {data_type}, używane tylko dla spółek i ETF")
             return {}
-        time.sleep(1)  # Opóźnienie dla uniknięcia błędu 429
+        _pause("yfinance", 1)  # Opóźnienie dla uniknięcia błędu 429
+        import yfinance as yf
+
         ticker_obj = yf.Ticker(ticker.upper())
         data = ticker_obj.info or {}
 
@@ -70,67 +198,61 @@ def fetch_from_yfinance(ticker: str, data_type: str = "company") -> dict:
         data["rnd_sales"] = None
         data["cac_ltv"] = None
 
-        hist = ticker_obj.history(period="1d", raise_errors=False)
-        if hist is not None and hasattr(hist, "empty") and not hist.empty:
-            try:
-                data["cena"] = float(hist["Close"].iloc[-1])
-            except Exception:
-                pass
+        # Notowanie z info (currentPrice/regularMarketPrice) – osobne pobranie historii tylko, gdy info go nie ma.
+        # fast_info.last_price nie jest lżejsze: yfinance pobiera do niego historię z całego roku.
+        price = _number(data.get("currentPrice")) or _number(data.get("regularMarketPrice"))
+        if price is None:
+            hist = ticker_obj.history(period="1d", raise_errors=False)
+            if hist is not None and hasattr(hist, "empty") and not hist.empty:
+                try:
+                    price = float(hist["Close"].iloc[-1])
+                except Exception:
+                    price = None
+        if price is not None:
+            data["cena"] = price
 
-        quarterly_income = getattr(ticker_obj, "quarterly_financials", None)
-        if quarterly_income is not None and hasattr(quarterly_income, "iterrows") and not quarterly_income.empty:
-            data["quarterly_revenue"] = [
-                {
-                    "date": str(index),
-                    "revenue": float(row.get("Total Revenue", None)) if row.get("Total Revenue") else None,
-                }
-                for index, row in quarterly_income.iterrows()
-                if row.get("Total Revenue") is not None
-            ][:4]
+        signals = _period_signals(data.get("mostRecentQuarter"), data.get("earningsTimestamp"))
+        if not statements:
+            logging.debug(f"Pominięto sprawozdania yfinance dla {ticker} (odświeżanie przyrostowe)")
+            return {**map_api_fields("yfinance", data), **signals}
 
-        yearly_income = getattr(ticker_obj, "financials", None)
-        if yearly_income is not None and hasattr(yearly_income, "iterrows") and not yearly_income.empty:
-            data["yearly_revenue"] = [
-                {
-                    "date": str(index),
-                    "revenue": float(row.get("Total Revenue", None)) if row.get("Total Revenue") else None,
-                }
-                for index, row in yearly_income.iterrows()
-                if row.get("Total Revenue") is not None
-            ][:5]
-            try:
-                data["revenue"] = (
-                    float(yearly_income["Total Revenue"].iloc[0])
-                    if "Total Revenue" in yearly_income.columns and not yearly_income.empty
-                    else None
-                )
-            except Exception:
-                data["revenue"] = None
+        quarterly = _statement_revenue(getattr(ticker_obj, "quarterly_financials", None), "Total Revenue", 4)
+        if quarterly:
+            data["quarterly_revenue"] = quarterly
+        yearly = _statement_revenue(getattr(ticker_obj, "financials", None), "Total Revenue", 5)
+        if yearly:
+            data["yearly_revenue"] = yearly
+            data["revenue"] = yearly[0]["revenue"]
 
         logging.debug(f"Surowe dane z yfinance dla {ticker}: {list(data.keys())}")
         return map_api_fields("yfinance", data)
     except Exception as e:
         logging.error(f"Błąd pobierania danych z yfinance dla {ticker}: {str(e)}")
+        _note_failure()
         return {}
 
 
-def fetch_from_alpha_vantage(ticker: str, data_type: str = "company") -> dict:
+def fetch_from_alpha_vantage(ticker: str, data_type: str = "company", statements: bool = True) -> dict:
     """
     Pobiera dane z Alpha Vantage dla podanego tickera.
+    statements=False – tylko przegląd i notowanie (bez INCOME_STATEMENT/BALANCE_SHEET/CASH_FLOW).
     UWAGA: dla testów funkcja działa nawet bez klucza – używa 'DUMMY' (mocki przejmują wywołania).
     """
     try:
         if data_type != "company":
             logging.info(f"Pomijam Alpha Vantage dla {data_type}, używane tylko dla spółek")
             return {}
-        if FundamentalData is None:
+        try:
+            from alpha_vantage.fundamentaldata import FundamentalData  # type: ignore
+        except ImportError:
             logging.warning("Pomijam Alpha Vantage: brak biblioteki 'alpha_vantage'")
             return {}
 
-        api_key = get_api_key("ALPHA_VANTAGE_API_KEY") or os.getenv("ALPHA_VANTAGE_API_KEY_TEST", "DUMMY")
-
-        # Limit 5 żądań/min – w testach mocki przejmą wywołania
-        time.sleep(0 if api_key == "DUMMY" else 12)
+        # Limit 5 żądań/min na klucz – pula czeka na budżet zamiast stałego sleep; w testach klucz 'DUMMY' bez limitu
+        pool = get_key_pool("Alpha Vantage")
+        api_key = pool.acquire(cost=5 if statements else 2)
+        if not api_key:
+            raise KeysExhausted("Alpha Vantage: wyczerpany limit wszystkich kluczy")
         fd = FundamentalData(key=api_key)
         overview, _ = fd.get_company_overview(symbol=ticker.upper())
 
@@ -143,9 +265,9 @@ def fetch_from_alpha_vantage(ticker: str, data_type: str = "company") -> dict:
             data["interest_coverage"] = overview.get("InterestCoverage")
 
         # Dodatkowe endpointy REST (quote/income/balance/cashflow)
-        quote = session.get(
+        quote = _get(
+            "Alpha Vantage", "global_quote", ticker,
             f"https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={ticker.upper()}&apikey={api_key}",
-            timeout=15,
         )
         if quote.status_code == 200:
             qj = quote.json() or {}
@@ -155,9 +277,14 @@ def fetch_from_alpha_vantage(ticker: str, data_type: str = "company") -> dict:
             except Exception:
                 pass
 
-        income = session.get(
+        if not statements:
+            pool.report_responses(api_key, [quote])
+            logging.debug(f"Pominięto sprawozdania Alpha Vantage dla {ticker} (odświeżanie przyrostowe)")
+            return map_api_fields("Alpha Vantage", data)
+
+        income = _get(
+            "Alpha Vantage", "income_statement", ticker,
             f"https://www.alphavantage.co/query?function=INCOME_STATEMENT&symbol={ticker.upper()}&apikey={api_key}",
-            timeout=15,
         )
         if income.status_code == 200:
             ij = income.json() or {}
@@ -184,9 +311,9 @@ def fetch_from_alpha_vantage(ticker: str, data_type: str = "company") -> dict:
             except Exception:
                 data["revenue"] = None
 
-        balance = session.get(
+        balance = _get(
+            "Alpha Vantage", "balance_sheet", ticker,
             f"https://www.alphavantage.co/query?function=BALANCE_SHEET&symbol={ticker.upper()}&apikey={api_key}",
-            timeout=15,
         )
         if balance.status_code == 200:
             bj = balance.json() or {}
@@ -206,9 +333,9 @@ def fetch_from_alpha_vantage(ticker: str, data_type: str = "company") -> dict:
                 except Exception:
                     data["cash_ratio"] = None
 
-        cash_flow = session.get(
+        cash_flow = _get(
+            "Alpha Vantage", "cash_flow", ticker,
             f"https://www.alphavantage.co/query?function=CASH_FLOW&symbol={ticker.upper()}&apikey={api_key}",
-            timeout=15,
         )
         if cash_flow.status_code == 200:
             cfj = cash_flow.json() or {}
@@ -225,6 +352,7 @@ def fetch_from_alpha_vantage(ticker: str, data_type: str = "company") -> dict:
                     data["operating_cash_flow"] = float(c0.get("operatingCashflow", 0))
                 except Exception:
                     data["operating_cash_flow"] = None
+        pool.report_responses(api_key, [quote, income, balance, cash_flow])
 
         # Ustawienia domyślne braków
         data.setdefault("user_growth", None)
@@ -238,58 +366,77 @@ def fetch_from_alpha_vantage(ticker: str, data_type: str = "company") -> dict:
 
         logging.debug(f"Surowe dane z Alpha Vantage dla {ticker}: {list(data.keys())}")
         return map_api_fields("Alpha Vantage", data)
+    except KeysExhausted:
+        raise
     except Exception as e:
         logging.error(f"Błąd pobierania danych z Alpha Vantage dla {ticker}: {str(e)}")
+        _note_failure()
         return {}
 
 
-def fetch_from_fmp(ticker: str, data_type: str = "company") -> dict:
+def fetch_from_fmp(ticker: str, data_type: str = "company", statements: bool = True) -> dict:
     """
     Pobiera dane z Financial Modeling Prep dla podanego tickera.
+    statements=False – tylko profil, notowanie, wskaźniki i estymacje (4 z 8 żądań); z notowania
+    zwraca dodatkowo 'next_earnings' (odświeżanie przyrostowe).
     UWAGA: dla testów funkcja działa nawet bez klucza – używa 'DUMMY' (mocki przejmują wywołania).
     """
     try:
         if data_type != "company":
             logging.info(f"Pomijam FMP dla {data_type}, używane tylko dla spółek")
             return {}
-        fmp_key = get_api_key("FMP_API_KEY") or os.getenv("FMP_API_KEY_TEST", "DUMMY")
+        pool = get_key_pool("FMP")
+        fmp_key = pool.acquire(cost=8 if statements else 4)
+        if not fmp_key:
+            raise KeysExhausted("FMP: wyczerpany limit wszystkich kluczy")
 
-        profile = session.get(
-            f"https://financialmodelingprep.com/api/v3/profile/{ticker.upper()}?apikey={fmp_key}", timeout=15
-        )
-        quote = session.get(
-            f"https://financialmodelingprep.com/api/v3/quote/{ticker.upper()}?apikey={fmp_key}", timeout=15
-        )
-        ratios = session.get(
-            f"https://financialmodelingprep.com/api/v3/ratios/{ticker.upper()}?limit=1&apikey={fmp_key}", timeout=15
+        profile = _get(
+            "FMP", "profile", ticker,
+            f"https://financialmodelingprep.com/api/v3/profile/{ticker.upper()}?apikey={fmp_key}",
         )
-        income = session.get(
-            f"https://financialmodelingprep.com/api/v3/income-statement/{ticker.upper()}?limit=5&apikey={fmp_key}",
-            timeout=15,
+        quote = _get(
+            "FMP", "quote", ticker,
+            f"https://financialmodelingprep.com/api/v3/quote/{ticker.upper()}?apikey={fmp_key}",
         )
-        balance = session.get(
-            f"https://financialmodelingprep.com/api/v3/balance-sheet-statement/{ticker.upper()}?limit=5&apikey={fmp_key}",
-            timeout=15,
+        ratios = _get(
+            "FMP", "ratios", ticker,
+            f"https://financialmodelingprep.com/api/v3/ratios/{ticker.upper()}?limit=1&apikey={fmp_key}",
         )
-        cash_flow = session.get(
-            f"https://financialmodelingprep.com/api/v3/cash-flow-statement/{ticker.upper()}?limit=5&apikey={fmp_key}",
-            timeout=15,
-        )
-        income_quarterly = session.get(
-            f"https://financialmodelingprep.com/api/v3/income-statement/{ticker.upper()}?period=quarter&limit=4&apikey={fmp_key}",
-            timeout=15,
-        )
-        analyst = session.get(
-            f"https://financialmodelingprep.com/api/v4/analyst-estimates/{ticker.upper()}?apikey={fmp_key}", timeout=15
+        income = balance = cash_flow = income_quarterly = None
+        if statements:
+            income = _get(
+                "FMP", "income-statement", ticker,
+                f"https://financialmodelingprep.com/api/v3/income-statement/{ticker.upper()}?limit=5&apikey={fmp_key}",
+            )
+            balance = _get(
+                "FMP", "balance-sheet-statement", ticker,
+                f"https://financialmodelingprep.com/api/v3/balance-sheet-statement/{ticker.upper()}?limit=5&apikey={fmp_key}",
+            )
+            cash_flow = _get(
+                "FMP", "cash-flow-statement", ticker,
+                f"https://financialmodelingprep.com/api/v3/cash-flow-statement/{ticker.upper()}?limit=5&apikey={fmp_key}",
+            )
+            income_quarterly = _get(
+                "FMP", "income-statement-quarter", ticker,
+                f"https://financialmodelingprep.com/api/v3/income-statement/{ticker.upper()}?period=quarter&limit=4&apikey={fmp_key}",
+            )
+        analyst = _get(
+            "FMP", "analyst-estimates", ticker,
+            f"https://financialmodelingprep.com/api/v4/analyst-estimates/{ticker.upper()}?apikey={fmp_key}",
         )
 
+        responses = [profile, quote, ratios, income, balance, cash_flow, income_quarterly, analyst]
+        pool.report_responses(fmp_key, [r for r in responses if r is not None])
+
         data: dict = {}
         if profile.status_code == 200 and profile.json():
             pj = profile.json()[0]
             data.update(pj)
             data["market_cap"] = pj.get("mktCap")
+        signals = {}
         if quote.status_code == 200 and quote.json():
             data.update(quote.json()[0])
+            signals = _period_signals(None, quote.json()[0].get("earningsAnnouncement"))
         if ratios.status_code == 200 and ratios.json():
             r = ratios.json()[0]
             data.update(r)
@@ -299,7 +446,7 @@ def fetch_from_fmp(ticker: str, data_type: str = "company") -> dict:
             data["net_debt_ebitda"] = r.get("netDebtToEBITDA")
             data["inventory_turnover"] = r.get("inventoryTurnover")
             data["asset_turnover"] = r.get("assetTurnover")
-        if income.status_code == 200 and income.json():
+        if income is not None and income.status_code == 200 and income.json():
             ij = income.json()
             data["revenue"] = ij[0].get("revenue")
             data["operating_margin"] = ij[0].get("operatingMargin")
@@ -308,7 +455,7 @@ def fetch_from_fmp(ticker: str, data_type: str = "company") -> dict:
                 {"date": entry["date"], "revenue": float(entry["revenue"]) if entry["revenue"] else None}
                 for entry in ij[:5]
             ]
-        if balance.status_code == 200 and balance.json():
+        if balance is not None and balance.status_code == 200 and balance.json():
             bj = balance.json()[0]
             data["total_debt"] = bj.get("totalDebt")
             data["total_equity"] = bj.get("totalEquity")
@@ -322,12 +469,12 @@ def fetch_from_fmp(ticker: str, data_type: str = "company") -> dict:
                 data["debt_equity"] = (td / te) if te else None
             except Exception:
                 data["debt_equity"] = None
-        if cash_flow.status_code == 200 and cash_flow.json():
+        if cash_flow is not None and cash_flow.status_code == 200 and cash_flow.json():
             cf = cash_flow.json()[0]
             data["free_cash_flow"] = cf.get("freeCashFlow")
             data["operating_cash_flow"] = cf.get("operatingCashFlow")
             data["cash_flow_to_debt_ratio"] = cf.get("cashFlowToDebtRatio")
-        if income_quarterly.status_code == 200 and income_quarterly.json():
+        if income_quarterly is not None and income_quarterly.status_code == 200 and income_quarterly.json():
             iq = income_quarterly.json()
             data["quarterly_revenue"] = [
                 {"date": entry["date"], "revenue": float(entry["revenue"]) if entry["revenue"] else None}
@@ -347,39 +494,52 @@ def fetch_from_fmp(ticker: str, data_type: str = "company") -> dict:
         data.setdefault("cac_ltv", None)
 
         logging.debug(f"Surowe dane z FMP dla {ticker}: {list(data.keys())}")
+        if not statements:
+            return {**map_api_fields("FMP", data), **signals}
         return map_api_fields("FMP", data)
+    except KeysExhausted:
+        raise
     except Exception as e:
         logging.error(f"Błąd pobierania danych z FMP dla {ticker}: {str(e)}")
+        _note_failure()
         return {}
 
 
-def fetch_from_finnhub(ticker: str, data_type: str = "company") -> dict:
+def fetch_from_finnhub(ticker: str, data_type: str = "company", statements: bool = True) -> dict:
     """
     Pobiera dane z Finnhub dla podanego tickera.
+    Finnhub nie pobiera sprawozdań (metryki TTM), więc `statements` nie zmienia zapytań.
     UWAGA: dla testów funkcja działa nawet bez klucza – używa 'TEST' (mocki przejmują wywołania).
     """
     try:
         if data_type != "company":
             logging.info(f"Pomijam Finnhub dla {data_type}, używane tylko dla spółek")
             return {}
-        # wybierz pierwszy prawidłowy klucz (albo DUMMY na potrzeby testów)
-        from src.api.api_keys import FINNHUB_API_KEYS
-
-        valid_key = next((k for k in FINNHUB_API_KEYS if k and not str(k).startswith("your_")), None)
+        # klucz z puli FINNHUB_API_KEY_1..N (rotacja między wątkami; bez konfiguracji – 'TEST' na potrzeby testów)
+        pool = get_key_pool("Finnhub")
+        valid_key = pool.acquire(cost=4)
         if not valid_key:
-            valid_key = os.getenv("FINNHUB_API_KEY_TEST", "TEST")
+            raise KeysExhausted("Finnhub: wyczerpany limit wszystkich kluczy")
 
-        profile = session.get(
-            f"https://finnhub.io/api/v1/stock/profile2?symbol={ticker.upper()}&token={valid_key}", timeout=15
+        profile = _get(
+            "Finnhub", "stock/profile2", ticker,
+            f"https://finnhub.io/api/v1/stock/profile2?symbol={ticker.upper()}&token={valid_key}",
+        )
+        quote = _get(
+            "Finnhub", "quote", ticker,
+            f"https://finnhub.io/api/v1/quote?symbol={ticker.upper()}&token={valid_key}",
         )
-        quote = session.get(f"https://finnhub.io/api/v1/quote?symbol={ticker.upper()}&token={valid_key}", timeout=15)
-        recommendation = session.get(
-            f"https://finnhub.io/api/v1/stock/recommendation?symbol={ticker.upper()}&token={valid_key}", timeout=15
+        recommendation = _get(
+            "Finnhub", "stock/recommendation", ticker,
+            f"https://finnhub.io/api/v1/stock/recommendation?symbol={ticker.upper()}&token={valid_key}",
         )
-        financials = session.get(
-            f"https://finnhub.io/api/v1/stock/metric?symbol={ticker.upper()}&metric=all&token={valid_key}", timeout=15
+        financials = _get(
+            "Finnhub", "stock/metric", ticker,
+            f"https://finnhub.io/api/v1/stock/metric?symbol={ticker.upper()}&metric=all&token={valid_key}",
         )
 
+        pool.report_responses(valid_key, [profile, quote, recommendation, financials])
+
         data: dict = {}
         if profile.status_code == 200 and profile.json():
             pj = profile.json()
@@ -415,33 +575,43 @@ def fetch_from_finnhub(ticker: str, data_type: str = "company") -> dict:
 
         logging.debug(f"Surowe dane z Finnhub dla {ticker}: {list(data.keys())}")
         return map_api_fields("Finnhub", data)
+    except KeysExhausted:
+        raise
     except Exception as e:
         logging.error(f"Błąd pobierania danych z Finnhub dla {ticker}: {str(e)}")
+        _note_failure()
         return {}
 
 
-def fetch_from_yahooquery(ticker: str, data_type: str = "company") -> dict:
+def fetch_from_yahooquery(ticker: str, data_type: str = "company", statements: bool = True) -> dict:
     """
     Pobiera dane z YahooQuery dla podanego tickera.
+    statements=False – bez przychodów ze sprawozdań (kwartalnych i rocznych).
     """
     try:
         if data_type not in ["company", "etf"]:
             logging.info(f"Pomijam yahooquery dla {data_type}, używane tylko dla spółek i ETF")
             return {}
-        if YahooQueryTicker is None:
+        try:
+            from yahooquery import Ticker as YahooQueryTicker  # type: ignore
+        except ImportError:
             logging.warning("Pomijam yahooquery: moduł nie jest dostępny")
             return {}
 
         ticker_obj = YahooQueryTicker(ticker.upper())
         data: dict = {}
 
-        summary = getattr(ticker_obj, "summary_profile", None)
-        if summary and ticker.upper() in summary and isinstance(summary[ticker.upper()], dict):
-            data.update(summary[ticker.upper()])
+        # jedno żądanie quoteSummary z trzema modułami zamiast osobnych summary_profile/financial_data/key_stats
+        modules = ticker_obj.get_modules(["summaryProfile", "financialData", "defaultKeyStatistics"])
+        entry = modules.get(ticker.upper()) if isinstance(modules, dict) else None
+        entry = entry if isinstance(entry, dict) else {}
+
+        summary = entry.get("summaryProfile")
+        if isinstance(summary, dict):
+            data.update(summary)
 
-        financials = getattr(ticker_obj, "financial_data", None)
-        if financials and ticker.upper() in financials and isinstance(financials[ticker.upper()], dict):
-            f = financials[ticker.upper()]
+        f = entry.get("financialData")
+        if isinstance(f, dict):
             data.update(f)
             data["market_cap"] = f.get("marketCap")
             data["ebitda_margin"] = f.get("ebitdaMargin")
@@ -449,39 +619,23 @@ def fetch_from_yahooquery(ticker: str, data_type: str = "company") -> dict:
             data["interest_coverage"] = f.get("interestCoverage")
             data["net_debt_ebitda"] = f.get("netDebtToEBITDA")
 
-        key_stats = getattr(ticker_obj, "key_stats", None)
-        if key_stats and ticker.upper() in key_stats and isinstance(key_stats[ticker.upper()], dict):
-            data.update(key_stats[ticker.upper()])
+        key_stats = entry.get("defaultKeyStatistics")
+        if isinstance(key_stats, dict):
+            data.update(key_stats)
 
-        income = ticker_obj.income_statement(frequency="q")
-        if hasattr(income, "empty") and not income.empty:
-            data["quarterly_revenue"] = [
-                {
-                    "date": str(index[1]) if isinstance(index, tuple) else str(index),
-                    "revenue": float(row.get("TotalRevenue", None)) if row.get("TotalRevenue") else None,
-                }
-                for index, row in income.head(4).iterrows()
-                if row.get("TotalRevenue") is not None
-            ]
-
-        yearly_income = ticker_obj.income_statement(frequency="a")
-        if hasattr(yearly_income, "empty") and not yearly_income.empty:
-            data["yearly_revenue"] = [
-                {
-                    "date": str(index[1]) if isinstance(index, tuple) else str(index),
-                    "revenue": float(row.get("TotalRevenue", None)) if row.get("TotalRevenue") else None,
-                }
-                for index, row in yearly_income.head(5).iterrows()
-                if row.get("TotalRevenue") is not None
-            ]
-            try:
-                data["revenue"] = (
-                    float(yearly_income["TotalRevenue"].iloc[0])
-                    if "TotalRevenue" in yearly_income.columns and not yearly_income.empty
-                    else None
-                )
-            except Exception:
-                data["revenue"] = None
+        if statements:
+            # tylko pozycja TotalRevenue zamiast pełnych rachunków wyników
+            quarterly = _statement_revenue(
+                ticker_obj.get_financial_data("TotalRevenue", frequency="q", trailing=False), "TotalRevenue", 4
+            )
+            if quarterly:
+                data["quarterly_revenue"] = quarterly
+            yearly = _statement_revenue(
+                ticker_obj.get_financial_data("TotalRevenue", frequency="a", trailing=False), "TotalRevenue", 5
+            )
+            if yearly:
+                data["yearly_revenue"] = yearly
+                data["revenue"] = yearly[0]["revenue"]
 
         data.setdefault("user_growth", None)
         data.setdefault("inventory_turnover", None)
@@ -496,20 +650,21 @@ def fetch_from_yahooquery(ticker: str, data_type: str = "company") -> dict:
         return map_api_fields("yahooquery", data)
     except Exception as e:
         logging.error(f"Błąd pobierania danych z yahooquery dla {ticker}: {str(e)}")
+        _note_failure()
         return {}
 
 
-def fetch_from_marketwatch(ticker: str, data_type: str = "company") -> dict:
+def fetch_from_marketwatch(ticker: str, data_type: str = "company", statements: bool = True) -> dict:
     """
     Pobiera dane z MarketWatch za pomocą scrapera.
     Gdy scraping rzuci wyjątek albo zwróci pusty dict – zwracamy {} (bez mapowania),
-    aby testy mogły asertywnie sprawdzić błąd.
+    aby testy mogły asertywnie sprawdzić błąd. Parametr `statements` nie ma znaczenia (strona bez sprawozdań).
     """
     try:
         if data_type != "company":
             logging.info(f"Pomijam MarketWatch dla {data_type}, używane tylko dla spółek")
             return {}
-        time.sleep(1)
+        _pause("MarketWatch", 1)
         data = scraper.scrape_marketwatch(ticker)
         if not isinstance(data, dict) or not data:
             return {}
@@ -517,20 +672,21 @@ def fetch_from_marketwatch(ticker: str, data_type: str = "company") -> dict:
         return map_api_fields("MarketWatch", data)
     except Exception as e:
         logging.error(f"Błąd pobierania danych z MarketWatch dla {ticker}: {str(e)}")
+        _note_failure()
         return {}
 
 
-def fetch_from_investing(ticker: str, data_type: str = "company") -> dict:
+def fetch_from_investing(ticker: str, data_type: str = "company", statements: bool = True) -> dict:
     """
     Pobiera dane z Investing.com za pomocą scrapera.
     Gdy scraping rzuci wyjątek albo zwróci pusty dict – zwracamy {} (bez mapowania),
-    aby testy mogły asertywnie sprawdzić błąd.
+    aby testy mogły asertywnie sprawdzić błąd. Parametr `statements` nie ma znaczenia (strona bez sprawozdań).
     """
     try:
         if data_type != "company":
             logging.info(f"Pomijam Investing.com dla {data_type}, używane tylko dla spółek")
             return {}
-        time.sleep(1)
+        _pause("Investing", 1)
         data = scraper.scrape_investing(ticker)
         if not isinstance(data, dict) or not data:
             return {}
@@ -538,15 +694,121 @@ def fetch_from_investing(ticker: str, data_type: str = "company") -> dict:
         return map_api_fields("Investing", data)
     except Exception as e:
         logging.error(f"Błąd pobierania danych z Investing.com dla {ticker}: {str(e)}")
+        _note_failure()
         return {}
 
 
-def fetch_data(tickers, parent=None, data_type="company"):
+# Typy danych obsługiwane przez dostawców – dla pozostałych fetcher nie jest wywoływany
+# (pusty wynik "nieobsługiwany typ" nie może liczyć się jako awaria dostawcy)
+PROVIDER_DATA_TYPES = {
+    "yfinance": {"company", "etf"},
+    "FMP": {"company"},
+    "Alpha Vantage": {"company"},
+    "Finnhub": {"company"},
+    "yahooquery": {"company", "etf"},
+    "MarketWatch": {"company"},
+    "Investing": {"company"},
+}
+
+
+def _has_values(data) -> bool:
+    """Czy odpowiedź dostawcy zawiera choć jedną wartość (pusty dict/same None – brak danych)."""
+    if not isinstance(data, dict):
+        return False
+    return any(value not in (None, [], "") for value in data.values())
+
+
+def _period_signals(latest_period, next_earnings) -> dict:
+    """
+    Sygnały nowego okresu sprawozdawczego dla odświeżania przyrostowego:
+    koniec ostatniego okresu i data publikacji wyników (epoch w sekundach albo tekst ISO) → 'YYYY-MM-DD'.
+    """
+    signals = {}
+    for key, value in (("latest_period", latest_period), ("next_earnings", next_earnings)):
+        if value in (None, ""):
+            continue
+        try:
+            if isinstance(value, (int, float)):
+                signals[key] = datetime.fromtimestamp(value, tz=timezone.utc).strftime("%Y-%m-%d")
+            else:
+                signals[key] = datetime.strptime(str(value)[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+        except (TypeError, ValueError, OverflowError, OSError):
+            continue
+    return signals
+
+
+# Źródła scrapowane – w trybie async pobierane współbieżnie dla wszystkich tickerów naraz
+SCRAPED_SOURCES = {"MarketWatch": "marketwatch", "Investing": "investing"}
+
+
+def _prefetched_scraper(api_name: str, scraped: dict):
+    """Zwraca fetcher korzystający z wyników scrapingu async zamiast pobierać stronę ponownie."""
+    source = SCRAPED_SOURCES[api_name]
+
+    def fetch(ticker: str, data_type: str = "company", statements: bool = True) -> dict:
+        data = scraped.get(ticker, {}).get(source)
+        if not isinstance(data, dict) or not data:
+            return {}
+        return map_api_fields(api_name, data)
+
+    return fetch
+
+
+@profiled("fetch_data")
+def fetch_data(
+    tickers,
+    parent=None,
+    data_type="company",
+    scrape_mode=None,
+    health_registry=None,
+    planner=None,
+    refresh_mode=None,
+    refresh_state=None,
+    metrics=None,
+    return_metrics=False,
+):
     """
     Pobiera dane z wielu API dla listy tickerów, uzupełniając brakujące pola.
-    Zwraca (wyniki, brakujące_ticker->klucze)
+    Dostawcy z otwartym obwodem (seria błędów) są pomijani, zdegradowani – odpytywani na końcu
+    (src.api.provider_health; health_registry domyślnie rejestr procesowy).
+    Kolejność dostawców dla tickera ustala planer (src.api.provider_planner) na podstawie historycznej
+    skuteczności wypełniania brakujących kluczy i opóźnień; statystyki zapisywane są między uruchomieniami.
+    scrape_mode: 'sync' (domyślnie) – strony pobierane po kolei przez fetch_from_marketwatch/investing;
+        'async' – współbieżnie dla wszystkich tickerów z limitami per domena (src.api.async_scraper).
+        Gdy None – wartość zmiennej środowiskowej SCRAPE_MODE.
+    Równoczesne wywołania dostawcy dla tego samego tickera oraz identyczne żądania HTTP są deduplikowane
+    (src.api.singleflight).
+    refresh_mode: 'full' (domyślnie) – pełne pobranie; 'incremental' – sprawozdania (src.api.refresh_state.STATEMENT_KEYS)
+        pobierane tylko, gdy spodziewany lub wykryty jest nowy okres sprawozdawczy, w przeciwnym razie
+        uzupełniane z zapamiętanego stanu (refresh_state domyślnie stan procesowy). Gdy None – REFRESH_MODE.
+    metrics: Obiekt src.api.fetch_metrics.FetchMetrics, do którego trafiają pomiary przebiegu (liczba i opóźnienia
+        żądań per dostawca/endpoint, bajty, ponowienia, trafienia w pamięć, wypełnione klucze, oczekiwanie na limity);
+        domyślnie nowy obiekt, dla którego czas przebiegu jest zapisywany, a podsumowanie logowane po zakończeniu.
+        Przekazany obiekt należy do wywołującego – to on zapisuje czas przebiegu (record_run) i loguje podsumowanie.
+    Zwraca (wyniki, brakujące_ticker->klucze), a przy return_metrics=True (wyniki, brakujące, pomiary).
     """
+    owned = metrics is None
+    metrics = FetchMetrics() if owned else metrics
+    start = time.perf_counter()
+    with collecting(metrics):
+        results, missing_tickers = _fetch_all(
+            tickers, data_type, scrape_mode, health_registry, planner, refresh_mode, refresh_state, metrics
+        )
+    if owned:
+        metrics.record_run(len(tickers), time.perf_counter() - start)
+        logging.info(metrics.format_summary())
+    if return_metrics:
+        return results, missing_tickers, metrics
+    return results, missing_tickers
+
+
+def _fetch_all(tickers, data_type, scrape_mode, health_registry, planner, refresh_mode, refresh_state, metrics):
+    """Właściwe pobieranie dla fetch_data (pomiary w `metrics` ustawionych jako bieżące)."""
+
     try:
+        scrape_mode = (scrape_mode or os.getenv("SCRAPE_MODE") or "sync").lower()
+        incremental = (refresh_mode or os.getenv("REFRESH_MODE") or "full").lower() == "incremental"
+        incremental = incremental and data_type == "company"
         logging.info(f"Rozpoczęto pobieranie danych dla tickerów: {tickers}, typ: {data_type}")
         results = {}
         missing_tickers = {}
@@ -659,27 +921,119 @@ def fetch_data(tickers, parent=None, data_type="company"):
             ("Investing", fetch_from_investing),
         ]
 
-        for api_name, method in api_methods:
-            for ticker in list(tickers):
-                t = ticker.upper()
+        health = health_registry or get_registry()
+        planner = planner or get_planner()
+        methods = dict(api_methods)
+        supported = [name for name, _ in api_methods if data_type in PROVIDER_DATA_TYPES.get(name, {data_type})]
+        scraped = None
+        state = None
+        if incremental:
+            from src.api.refresh_state import STATEMENT_KEYS, get_refresh_state
+
+            state = refresh_state or get_refresh_state()
+
+        # Kolejność ticker-major: dla każdego tickera planer wybiera następnego dostawcę na podstawie
+        # aktualnie brakujących kluczy (historyczna skuteczność / opóźnienie), bezpiecznik filtruje niedostępnych.
+        for ticker in list(tickers):
+            t = ticker.upper()
+            tried = set()
+            statements = True
+            signals = {}
+            if incremental:
+                statements = state.needs_statements(t)
+                if not statements:
+                    cached = state.cached_statements(t)
+                    for key in STATEMENT_KEYS:
+                        if key in missing_tickers[t] and cached.get(key) not in (None, []):
+                            results[t][key] = cached[key]
+                            missing_tickers[t].remove(key)
+                    logging.info(f"Odświeżanie przyrostowe {t}: bez sprawozdań (okres {state.tickers[t].get('last_period')})")
+            while missing_tickers.get(t):
+                plan = planner.plan([p for p in supported if p not in tried], missing_tickers[t])
+                plan = health.order(plan)
+                if not plan:
+                    break
+                api_name = plan[0]
+                tried.add(api_name)
+                method = methods[api_name]
+                prefetched = False
+                reserved = False
                 try:
-                    if t in missing_tickers and missing_tickers[t]:
-                        data = method(t, data_type)
-                        if data:
-                            for key in missing_tickers[t][:]:
-                                if key in data and data[key] is not None:
-                                    results[t][key] = data[key]
-                                    missing_tickers[t].remove(key)
-                            logging.info(f"Pobrano dane z {api_name} dla {t}: pola={list(data.keys())}")
-                        if not missing_tickers[t]:
-                            del missing_tickers[t]
-                        else:
-                            logging.info(f"Brakujące klucze dla {t} po {api_name}: {missing_tickers[t]}")
+                    if scrape_mode == "async" and api_name in SCRAPED_SOURCES and data_type == "company":
+                        if scraped is None:
+                            from src.api.async_scraper import scrape_tickers
+
+                            pending = [x.upper() for x in tickers if missing_tickers.get(x.upper())]
+                            scraped = scrape_tickers(pending, sources=SCRAPED_SOURCES.values()) if pending else {}
+                        method = _prefetched_scraper(api_name, scraped)
+                        prefetched = True  # zdrowie domen śledzi scraper async
+                    if not prefetched:
+                        if not health.allow_request(api_name):
+                            logging.info(f"Pomijam {api_name} dla {t}: dostawca niedostępny (obwód otwarty)")
+                            continue
+                        reserved = True
+                    requested = list(missing_tickers[t])
+                    start = time.perf_counter()
+                    # równoczesne fetch_data (GUI, makro, tryb wsadowy) o ten sam ticker współdzielą wywołanie dostawcy
+                    call = partial(method, t, data_type) if statements else partial(method, t, data_type, statements=False)
+                    data, failed = get_singleflight().do(
+                        (api_name, f"fetch:{data_type}:{statements}", t), partial(_tracked_call, call), ttl=0
+                    )
+                    reserved = False
+                    elapsed = time.perf_counter() - start
+                    filled = [key for key in requested if data and data.get(key) is not None]
+                    metrics.record_provider_call(api_name, elapsed, len(filled), empty=not _has_values(data))
+                    if not prefetched:
+                        # bezpiecznik liczy tylko awarie (wyjątek, 429/5xx); pusty wynik ocenia planer
+                        health.record(api_name, not failed, elapsed)
+                        planner.record(api_name, requested, data, elapsed)
+                    if data:
+                        for key in missing_tickers[t][:]:
+                            if key in data and data[key] is not None:
+                                results[t][key] = data[key]
+                                missing_tickers[t].remove(key)
+                        logging.debug("Pobrano dane z %s dla %s: pola=%s", api_name, t, list(data))
+                    if incremental and data:
+                        for key in ("latest_period", "next_earnings"):
+                            if data.get(key):
+                                signals[key] = max(signals.get(key, ""), data[key])
+                        if not statements and state.is_new_period(t, signals.get("latest_period")):
+                            # nowy okres sprawozdawczy – sprawozdania pobieramy od nowa u wszystkich dostawców
+                            logging.info(f"Wykryto nowy okres sprawozdawczy dla {t}: {signals['latest_period']}")
+                            statements = True
+                            tried.clear()
+                            for key in STATEMENT_KEYS:
+                                if key not in missing_tickers[t]:
+                                    results[t][key] = [] if key.endswith("_revenue") else None
+                                    missing_tickers[t].append(key)
+                    if missing_tickers[t]:
+                        logging.debug("Brakujące klucze dla %s po %s: %s", t, api_name, missing_tickers[t])
+                except KeysExhausted as e:
+                    # brak budżetu kluczy to nie awaria dostawcy – bez wpisu do zdrowia, planera i metryk;
+                    # zwalniamy tylko miejsce próbne obwodu półotwartego zarezerwowane przez allow_request
+                    if reserved:
+                        health.release(api_name)
+                    logging.warning(f"Pomijam {api_name} dla {t}: {str(e)}")
+                    continue
                 except Exception as e:
+                    if reserved:
+                        health.record(api_name, False, time.perf_counter() - start)
                     logging.error(f"Błąd pobierania danych z {api_name} dla {t}: {str(e)}")
                     continue
+            if incremental:
+                state.record(t, results[t], statements, signals)
+            if t in missing_tickers and not missing_tickers[t]:
+                del missing_tickers[t]
 
-        logging.info(f"Zakończono pobieranie danych, brakujące tickery: {missing_tickers}")
+        planner.save()
+        if state is not None:
+            state.save()
+        logging.info(
+            f"Zakończono pobieranie danych: {len(results)} tickerów, niekompletne: {len(missing_tickers)}"
+        )
+        logging.debug("Brakujące klucze po pobraniu: %s", missing_tickers)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Zdrowie dostawców: %s", health.snapshot())
         return results, missing_tickers
     except Exception as e:
         logging.error(f"Błąd podczas pobierania danych z API dla {tickers}: {str(e)}")
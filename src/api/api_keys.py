@@ -12,10 +12,7 @@ import os
 import logging
 from typing import Optional, List
 
-from src.core.logging_config import setup_logging
 
-# Konfiguracja logowania (singleton)
-setup_logging()
 logger = logging.getLogger(__name__)
 
 
@@ -53,16 +50,25 @@ def _normalize(value: Optional[str]) -> Optional[str]:
     return v
 
 
-def _get_finnhub_keys_from_env(max_slots: int = 5) -> List[str]:
-    """Zbierz FINNHUB_API_KEY_1..N, pomijając puste/placeholdery."""
+def _get_keys_from_env(prefix: str, max_slots: int = 5, include_base: bool = True) -> List[str]:
+    """
+    Zbierz klucze PREFIX oraz PREFIX_1..N (np. FMP_API_KEY, FMP_API_KEY_1, ...),
+    pomijając puste/placeholdery i duplikaty.
+    """
+    names = ([prefix] if include_base else []) + [f"{prefix}_{i}" for i in range(1, max_slots + 1)]
     keys: List[str] = []
-    for i in range(1, max_slots + 1):
-        v = _normalize(os.getenv(f"FINNHUB_API_KEY_{i}"))
-        if v:
+    for name in names:
+        v = _normalize(os.getenv(name))
+        if v and v not in keys:
             keys.append(v)
     return keys
 
 
+def _get_finnhub_keys_from_env(max_slots: int = 5) -> List[str]:
+    """Zbierz FINNHUB_API_KEY_1..N, pomijając puste/placeholdery."""
+    return _get_keys_from_env("FINNHUB_API_KEY", max_slots, include_base=False)
+
+
 def get_api_key(key_name: str, *, finnhub_index: int = 0) -> Optional[str]:
     """
     Pobierz klucz API wg nazwy.
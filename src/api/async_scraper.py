@@ -0,0 +1,274 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\async_scraper.py
+"""
+Współbieżny (asyncio) scraping MarketWatch / Investing.com z limitami grzeczności per domena:
+- najwyżej `max_per_domain` równoczesnych połączeń do jednej domeny,
+- odstęp `min_delay` + losowy `jitter` między startami żądań do tej samej domeny,
+- respektowanie nagłówka Retry-After przy 429/503,
+- bezpiecznik (CircuitBreaker) per domena – zablokowana domena nie kosztuje timeoutu dla każdego tickera.
+
+Żądania HTTP wykonywane są w wątkach (asyncio.to_thread) na sesji z pulą połączeń keep-alive,
+więc moduł nie wymaga dodatkowych zależności (aiohttp/httpx).
+
+scrape_tickers korzysta z jednego scrapera procesowego (get_scraper): sesja, bezpieczniki i odstępy
+między żądaniami do domeny są wspólne dla kolejnych wywołań fetch_data i równoległych wątków trybu
+wsadowego; sesja zamykana jest przy wyjściu z procesu.
+"""
+import asyncio
+import atexit
+import logging
+import random
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.api import scraper
+from src.api.circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+
+# źródło → (szablon URL, funkcja parsująca, przekształcenie tickera)
+SOURCES = {
+    "marketwatch": (scraper.MARKETWATCH_URL, scraper.parse_marketwatch, str.upper),
+    "investing": (scraper.INVESTING_URL, scraper.parse_investing, str.lower),
+}
+
+RETRY_STATUSES = {429, 503}
+TRANSIENT_STATUSES = {500, 502, 504}
+# 401/403 zwykle oznacza blokadę (anty-bot) – liczy się do bezpiecznika domeny
+BLOCK_STATUSES = {401, 403}
+
+
+class ScrapeError(Exception):
+    """Nie udało się pobrać strony (po wyczerpaniu prób lub przy otwartym obwodzie)."""
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Interpretuje nagłówek Retry-After (liczba sekund lub data HTTP).
+    Returns:
+        Liczba sekund oczekiwania (>= 0) lub None, gdy nagłówek jest pusty/niepoprawny.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class AsyncScraper:
+    """Scraper asynchroniczny z limitem połączeń, odstępami i bezpiecznikiem per domena."""
+
+    def __init__(
+        self,
+        max_per_domain: int = 2,
+        min_delay: float = 1.0,
+        jitter: float = 0.5,
+        max_retries: int = 2,
+        backoff: float = 2.0,
+        max_retry_after: float = 60.0,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 300.0,
+        timeout: int = 10,
+        session=None,
+    ):
+        """
+        Args:
+            max_per_domain: Maks. liczba równoczesnych żądań do jednej domeny.
+            min_delay: Minimalny odstęp (s) między startami żądań do jednej domeny.
+            jitter: Maks. losowy dodatek (s) do odstępu.
+            max_retries: Liczba ponowień po 429/503/5xx/błędzie sieci.
+            backoff: Podstawa wykładniczego opóźnienia ponowień (gdy brak Retry-After).
+            max_retry_after: Dłuższy Retry-After otwiera obwód domeny zamiast czekać.
+            failure_threshold: Liczba kolejnych błędów domeny otwierająca obwód.
+            recovery_timeout: Czas (s) otwarcia obwodu przed próbą półotwartą.
+            timeout: Timeout pojedynczego żądania HTTP (s).
+            session: Sesja HTTP (domyślnie nowa sesja scrapera bez wbudowanych ponowień).
+        """
+        self.max_per_domain = max(1, max_per_domain)
+        self.min_delay = max(0.0, min_delay)
+        self.jitter = max(0.0, jitter)
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.timeout = timeout
+        # ponowienia obsługujemy sami (Retry-After, bezpiecznik) – adapter ich nie powtarza
+        self._owns_session = session is None
+        self.session = session or scraper.build_session(pool_maxsize=self.max_per_domain * 2)
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        # bezpieczniki i terminy startu żądań są wspólne dla wszystkich wątków i pętli zdarzeń,
+        # semafory asyncio są związane z pętlą – osobne dla każdego asyncio.run
+        self._lock = threading.Lock()
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._next_slot: Dict[str, float] = {}
+
+    def breaker(self, domain: str) -> CircuitBreaker:
+        with self._lock:
+            if domain not in self.breakers:
+                self.breakers[domain] = CircuitBreaker(
+                    domain, failure_threshold=self.failure_threshold, recovery_timeout=self.recovery_timeout
+                )
+            return self.breakers[domain]
+
+    def _semaphore(self, domain: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._semaphores.setdefault(loop, {})
+            return semaphores.setdefault(domain, asyncio.Semaphore(self.max_per_domain))
+
+    async def _wait_for_slot(self, domain: str) -> None:
+        """Rezerwuje najbliższy wolny termin startu żądania do domeny (odstęp + jitter) i czeka na niego."""
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_slot.get(domain, now))
+            self._next_slot[domain] = start_at + self.min_delay + random.uniform(0, self.jitter)
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _defer_domain(self, domain: str, seconds: float) -> None:
+        """Przesuwa kolejne żądania do domeny o `seconds` (Retry-After dotyczy całej domeny)."""
+        with self._lock:
+            self._next_slot[domain] = max(self._next_slot.get(domain, 0.0), time.monotonic() + seconds)
+
+    def close(self) -> None:
+        """Zamyka sesję HTTP utworzoną przez scraper."""
+        if self._owns_session:
+            self.session.close()
+
+    async def fetch(self, url: str) -> str:
+        """
+        Pobiera stronę z zachowaniem limitów domeny.
+        Raises:
+            CircuitOpenError: Obwód domeny jest otwarty.
+            ScrapeError: Żądanie nie powiodło się po wszystkich próbach.
+        """
+        domain = urlparse(url).netloc
+        breaker = self.breaker(domain)
+        semaphore = self._semaphore(domain)
+        last_error = "brak odpowiedzi"
+        for attempt in range(self.max_retries + 1):
+            if breaker.state == OPEN:
+                raise CircuitOpenError(f"Obwód {domain} otwarty (ponowna próba za {breaker.retry_after():.0f}s)")
+            async with semaphore:
+                await self._wait_for_slot(domain)
+                # ponowne sprawdzenie tuż przed wysłaniem – zadania czekające w kolejce domeny też widzą otwarty obwód
+                if not breaker.allow_request():
+                    raise CircuitOpenError(f"Obwód {domain} otwarty (ponowna próba za {breaker.retry_after():.0f}s)")
+                try:
+                    response = await asyncio.to_thread(self.session.get, url, timeout=self.timeout)
+                except Exception as e:
+                    breaker.record_failure()
+                    last_error = str(e)
+                    wait = None
+                else:
+                    status = response.status_code
+                    if status < 400:
+                        breaker.record_success()
+                        return response.text
+                    last_error = f"HTTP {status}"
+                    if status in RETRY_STATUSES:
+                        wait = parse_retry_after(response.headers.get("Retry-After"))
+                        if wait is not None and wait > self.max_retry_after:
+                            breaker.open_for(wait)
+                            raise ScrapeError(f"{url}: {last_error}, Retry-After {wait:.0f}s – domena wstrzymana")
+                        breaker.record_failure()
+                    elif status in TRANSIENT_STATUSES or status in BLOCK_STATUSES:
+                        breaker.record_failure()
+                        wait = None
+                        if status in BLOCK_STATUSES:
+                            raise ScrapeError(f"{url}: {last_error}")
+                    else:
+                        # 404 itp. – problem tickera, nie domeny: domena odpowiedziała (zwalnia też próbę półotwartą)
+                        breaker.record_success()
+                        raise ScrapeError(f"{url}: {last_error}")
+            if attempt < self.max_retries:
+                if wait is None:
+                    wait = self.backoff ** attempt + random.uniform(0, self.jitter)
+                self._defer_domain(domain, wait)
+                logging.debug(f"Ponawiam {url} za {wait:.1f}s ({last_error})")
+        raise ScrapeError(f"{url}: {last_error} po {self.max_retries + 1} próbach")
+
+    async def scrape(self, ticker: str, source: str) -> Dict:
+        """Pobiera i parsuje stronę jednego tickera z danego źródła ({} przy błędzie)."""
+        url_template, parse, transform = SOURCES[source]
+        try:
+            html = await self.fetch(url_template.format(ticker=transform(ticker)))
+            data = await asyncio.to_thread(parse, html)
+            logging.debug(f"Zescrapowano (async) {source} dla {ticker}: {data}")
+            return data
+        except CircuitOpenError as e:
+            logging.info(f"Pomijam {source} dla {ticker}: {str(e)}")
+        except Exception as e:
+            logging.error(f"Błąd scrapowania (async) {source} dla {ticker}: {str(e)}")
+        return {}
+
+    async def scrape_many(
+        self, tickers: Iterable[str], sources: Iterable[str] = tuple(SOURCES)
+    ) -> Dict[str, Dict[str, Dict]]:
+        """
+        Scrapuje wszystkie pary (ticker, źródło) współbieżnie.
+        Returns:
+            Słownik ticker → źródło → dane.
+        """
+        pairs: List[Tuple[str, str]] = [(t, s) for t in tickers for s in sources]
+        outputs = await asyncio.gather(*(self.scrape(t, s) for t, s in pairs))
+        results: Dict[str, Dict[str, Dict]] = {}
+        for (ticker, source), data in zip(pairs, outputs):
+            results.setdefault(ticker, {})[source] = data
+        return results
+
+
+_SCRAPER: Optional[AsyncScraper] = None
+_SCRAPER_LOCK = threading.Lock()
+
+
+def get_scraper() -> AsyncScraper:
+    """Zwraca procesowy scraper (domyślne limity); sesja zamykana przy wyjściu z procesu."""
+    global _SCRAPER
+    with _SCRAPER_LOCK:
+        if _SCRAPER is None:
+            _SCRAPER = AsyncScraper()
+            atexit.register(_SCRAPER.close)
+        return _SCRAPER
+
+
+def scrape_tickers(
+    tickers: Iterable[str], sources: Iterable[str] = tuple(SOURCES), **kwargs
+) -> Dict[str, Dict[str, Dict]]:
+    """
+    Synchroniczne opakowanie AsyncScraper.scrape_many (dla kodu bez pętli zdarzeń).
+    Args:
+        tickers: Tickery do pobrania.
+        sources: Źródła ('marketwatch', 'investing').
+        **kwargs: Parametry AsyncScraper (limity domen, opóźnienia, bezpiecznik); bez nich – scraper
+            procesowy, którego bezpieczniki i odstępy obowiązują między wywołaniami.
+    Returns:
+        Słownik ticker → źródło → dane ({} przy błędzie).
+    """
+    tickers = list(tickers)
+    sources = list(sources)
+    start = time.perf_counter()
+    if kwargs:
+        async_scraper = AsyncScraper(**kwargs)
+        try:
+            results = asyncio.run(async_scraper.scrape_many(tickers, sources))
+        finally:
+            async_scraper.close()
+    else:
+        results = asyncio.run(get_scraper().scrape_many(tickers, sources))
+    logging.info(
+        f"Scraping async: {len(tickers)} tickerów x {len(sources)} źródeł w {time.perf_counter() - start:.2f}s"
+    )
+    return results
@@ -0,0 +1,116 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\circuit_breaker.py
+"""
+Bezpiecznik (circuit breaker) dla zewnętrznych źródeł danych.
+
+Po `failure_threshold` kolejnych błędach obwód się otwiera i żądania są odrzucane bez wysyłania,
+aż minie `recovery_timeout`. Potem obwód przechodzi w stan półotwarty: przepuszcza ograniczoną
+liczbę żądań próbnych – sukces zamyka obwód, porażka otwiera go ponownie.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Żądanie odrzucone, bo obwód dla źródła jest otwarty."""
+
+
+class CircuitBreaker:
+    """Bezpiecznik z progiem kolejnych błędów i próbkowaniem w stanie półotwartym (bezpieczny wątkowo)."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 60.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            name: Nazwa chronionego źródła (do logów).
+            failure_threshold: Liczba kolejnych błędów otwierająca obwód.
+            recovery_timeout: Czas (s) w stanie otwartym przed próbą półotwartą.
+            half_open_max_calls: Liczba jednoczesnych żądań próbnych w stanie półotwartym.
+            clock: Źródło czasu (podmieniane w testach).
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open_for = recovery_timeout
+        self._half_open_calls = 0
+
+    @property
+    def state(self) -> str:
+        """Aktualny stan (z uwzględnieniem upływu czasu otwarcia)."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._open_for:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+            logging.info(f"Obwód {self.name}: półotwarty, przepuszczam żądanie próbne")
+        return self._state
+
+    def retry_after(self) -> float:
+        """Ile sekund zostało do próby półotwartej (0 gdy obwód nie jest otwarty)."""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return max(0.0, self._open_for - (self._clock() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """Czy żądanie może zostać wysłane. W stanie półotwartym rezerwuje miejsce próbne."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def release_probe(self) -> None:
+        """Zwalnia miejsce próbne zarezerwowane przez allow_request, gdy żądanie nie zostało wysłane."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logging.info(f"Obwód {self.name}: zamknięty po udanym żądaniu")
+            self._state = CLOSED
+            self._failures = 0
+            self._half_open_calls = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._current_state() == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._trip(self.recovery_timeout)
+
+    def open_for(self, seconds: Optional[float] = None) -> None:
+        """Wymusza otwarcie obwodu (np. długi Retry-After lub wyczerpany limit klucza)."""
+        with self._lock:
+            self._trip(self.recovery_timeout if seconds is None else max(seconds, 0.0))
+
+    def _trip(self, seconds: float) -> None:
+        if self._state != OPEN:
+            logging.warning(f"Obwód {self.name}: otwarty na {seconds:.0f}s po {self._failures} błędach")
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._open_for = seconds
+        self._half_open_calls = 0
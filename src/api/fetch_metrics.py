@@ -0,0 +1,251 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\fetch_metrics.py
+"""
+Pomiary potoku pobierania danych (fetch_data).
+
+FetchMetrics zbiera per dostawca i endpoint: liczbę żądań, histogram opóźnień, przesłane bajty,
+ponowienia HTTP, statusy, trafienia w pamięć singleflight, a per dostawca także liczbę wywołań,
+wypełnione klucze i czas oczekiwania na limity. Bieżący obiekt pomiarów jest ustawiany przez
+fetch_data w zmiennej kontekstowej, więc fetchery i pula kluczy rejestrują dane bez zmiany sygnatur.
+Podsumowanie można zapisać do JSON (jeden przebieg) albo dopisać do pliku JSONL (trendy).
+"""
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+
+# górne granice kubełków histogramu opóźnień (sekundy); ostatni kubełek – powyżej
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_CURRENT: ContextVar[Optional["FetchMetrics"]] = ContextVar("fetch_metrics", default=None)
+
+
+def _bucket_labels() -> Tuple[str, ...]:
+    return tuple(f"<={b:g}s" for b in LATENCY_BUCKETS) + (f">{LATENCY_BUCKETS[-1]:g}s",)
+
+
+class _Histogram:
+    """Histogram opóźnień z sumą i maksimum."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        self.counts[index] += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "_Histogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def snapshot(self) -> Dict:
+        count = sum(self.counts)
+        return {
+            "count": count,
+            "avg_seconds": round(self.total / count, 4) if count else 0.0,
+            "max_seconds": round(self.max, 4),
+            "buckets": {label: n for label, n in zip(_bucket_labels(), self.counts) if n},
+        }
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.bytes = 0
+        self.retries = 0
+        self.errors = 0
+        self.statuses: Dict[str, int] = {}
+        self.latency = _Histogram()
+
+
+class _ProviderStats:
+    def __init__(self):
+        self.calls = 0
+        self.empty = 0
+        self.keys_filled = 0
+        self.rate_limit_sleep = 0.0
+        self.latency = _Histogram()
+
+
+class FetchMetrics:
+    """Pomiary jednego lub wielu przebiegów fetch_data (bezpieczne wątkowo)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = datetime.now()
+        self.wall_seconds = 0.0
+        self.tickers = 0
+        self._endpoints: Dict[Tuple[str, str], _EndpointStats] = {}
+        self._providers: Dict[str, _ProviderStats] = {}
+
+    def _endpoint(self, provider: str, endpoint: str) -> _EndpointStats:
+        return self._endpoints.setdefault((provider, endpoint), _EndpointStats())
+
+    def _provider(self, provider: str) -> _ProviderStats:
+        return self._providers.setdefault(provider, _ProviderStats())
+
+    def record_request(
+        self,
+        provider: str,
+        endpoint: str,
+        latency: float,
+        status: Optional[int] = None,
+        size: int = 0,
+        retries: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Żądanie HTTP (lub wywołanie biblioteki) do endpointu dostawcy."""
+        with self._lock:
+            stats = self._endpoint(provider, endpoint)
+            stats.requests += 1
+            stats.bytes += size
+            stats.retries += retries
+            stats.errors += int(error)
+            key = str(status) if status is not None else "error"
+            stats.statuses[key] = stats.statuses.get(key, 0) + 1
+            stats.latency.add(latency)
+
+    def record_cache_hit(self, provider: str, endpoint: str) -> None:
+        """Odpowiedź z pamięci lub współdzielona z wywołaniem w toku (singleflight)."""
+        with self._lock:
+            self._endpoint(provider, endpoint).cache_hits += 1
+
+    def record_provider_call(self, provider: str, latency: float, keys_filled: int, empty: bool = False) -> None:
+        """Wywołanie fetchera dostawcy dla jednego tickera."""
+        with self._lock:
+            stats = self._provider(provider)
+            stats.calls += 1
+            stats.empty += int(empty)
+            stats.keys_filled += keys_filled
+            stats.latency.add(latency)
+
+    def record_rate_limit_sleep(self, provider: str, seconds: float) -> None:
+        """Czas oczekiwania na limit dostawcy (pula kluczy, stałe opóźnienia)."""
+        with self._lock:
+            self._provider(provider).rate_limit_sleep += seconds
+
+    def record_run(self, tickers: int, seconds: float) -> None:
+        """Zakończony przebieg fetch_data: liczba tickerów i czas całkowity."""
+        with self._lock:
+            self.tickers += tickers
+            self.wall_seconds += seconds
+
+    def merge(self, other: "FetchMetrics") -> None:
+        """Dołącza pomiary innego przebiegu (np. z wątku roboczego trybu wsadowego – src.cli.batch.run_batch)."""
+        with other._lock:
+            endpoints = dict(other._endpoints)
+            providers = dict(other._providers)
+            wall, tickers = other.wall_seconds, other.tickers
+        with self._lock:
+            self.wall_seconds += wall
+            self.tickers += tickers
+            for key, src in endpoints.items():
+                dst = self._endpoint(*key)
+                dst.requests += src.requests
+                dst.cache_hits += src.cache_hits
+                dst.bytes += src.bytes
+                dst.retries += src.retries
+                dst.errors += src.errors
+                for status, n in src.statuses.items():
+                    dst.statuses[status] = dst.statuses.get(status, 0) + n
+                dst.latency.merge(src.latency)
+            for name, src in providers.items():
+                dst = self._provider(name)
+                dst.calls += src.calls
+                dst.empty += src.empty
+                dst.keys_filled += src.keys_filled
+                dst.rate_limit_sleep += src.rate_limit_sleep
+                dst.latency.merge(src.latency)
+
+    def summary(self) -> Dict:
+        """Podsumowanie w postaci słownika (gotowe do zapisu w JSON)."""
+        with self._lock:
+            providers = {}
+            for name, stats in sorted(self._providers.items()):
+                providers[name] = {
+                    "calls": stats.calls,
+                    "empty": stats.empty,
+                    "keys_filled": stats.keys_filled,
+                    "rate_limit_sleep_seconds": round(stats.rate_limit_sleep, 3),
+                    "latency": stats.latency.snapshot(),
+                    "endpoints": {},
+                }
+            for (name, endpoint), stats in sorted(self._endpoints.items()):
+                entry = providers.setdefault(name, {"endpoints": {}})
+                entry["endpoints"][endpoint] = {
+                    "requests": stats.requests,
+                    "cache_hits": stats.cache_hits,
+                    "bytes": stats.bytes,
+                    "retries": stats.retries,
+                    "errors": stats.errors,
+                    "statuses": dict(stats.statuses),
+                    "latency": stats.latency.snapshot(),
+                }
+            endpoints = self._endpoints.values()
+            return {
+                "started": self.started.isoformat(timespec="seconds"),
+                "wall_seconds": round(self.wall_seconds, 3),
+                "tickers": self.tickers,
+                "totals": {
+                    "requests": sum(s.requests for s in endpoints),
+                    "cache_hits": sum(s.cache_hits for s in endpoints),
+                    "bytes": sum(s.bytes for s in endpoints),
+                    "retries": sum(s.retries for s in endpoints),
+                    "provider_calls": sum(s.calls for s in self._providers.values()),
+                    "keys_filled": sum(s.keys_filled for s in self._providers.values()),
+                    "rate_limit_sleep_seconds": round(
+                        sum(s.rate_limit_sleep for s in self._providers.values()), 3
+                    ),
+                },
+                "providers": providers,
+            }
+
+    def format_summary(self) -> str:
+        """Jednoliniowe podsumowanie do logu."""
+        data = self.summary()
+        totals = data["totals"]
+        per_provider = ", ".join(
+            f"{name}: {p.get('calls', 0)} wyw./{p.get('keys_filled', 0)} kluczy/"
+            f"{p.get('latency', {}).get('avg_seconds', 0.0)}s"
+            for name, p in data["providers"].items()
+        )
+        return (
+            f"Pobieranie: {data['tickers']} tickerów w {data['wall_seconds']}s, żądania {totals['requests']} "
+            f"(z pamięci {totals['cache_hits']}, ponowienia {totals['retries']}, {totals['bytes']} B), "
+            f"oczekiwanie na limity {totals['rate_limit_sleep_seconds']}s; {per_provider}"
+        )
+
+    def export_json(self, path: str, append: bool = False) -> None:
+        """Zapisuje podsumowanie do pliku JSON; append=True – dopisuje wiersz do pliku JSONL (trendy)."""
+        try:
+            if append:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(self.summary(), ensure_ascii=False) + "\n")
+            else:
+                with open(path, "w", encoding="utf-8") as f:
+                    json.dump(self.summary(), f, indent=4, ensure_ascii=False)
+        except Exception as e:
+            logging.error(f"Błąd zapisu pomiarów pobierania do {path}: {str(e)}")
+
+
+def current_metrics() -> Optional[FetchMetrics]:
+    """Pomiary bieżącego przebiegu fetch_data (None poza fetch_data)."""
+    return _CURRENT.get()
+
+
+@contextmanager
+def collecting(metrics: FetchMetrics) -> Iterator[FetchMetrics]:
+    """Ustawia `metrics` jako bieżące pomiary w obrębie bloku."""
+    token = _CURRENT.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _CURRENT.reset(token)
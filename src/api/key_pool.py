@@ -0,0 +1,225 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\key_pool.py
+"""
+Pula kluczy API z budżetem żądań per klucz.
+
+Każdy klucz ma własny kubełek żetonów (limit dostawcy, np. 60 żądań/min dla Finnhub).
+`acquire` wydaje klucz z największym zapasem żetonów, więc równoległe wątki rozkładają się
+na wszystkie klucze – przepustowość rośnie liniowo z ich liczbą. Klucz, który dostał 429,
+jest czasowo wycofywany; odrzucony (401/403) – na dłużej.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.api.api_keys import _get_keys_from_env
+from src.api.fetch_metrics import current_metrics
+
+# dostawca → (prefiks zmiennych środowiskowych, limit żądań, okres w sekundach)
+PROVIDER_LIMITS: Dict[str, Tuple[str, int, float]] = {
+    "Finnhub": ("FINNHUB_API_KEY", 60, 60.0),
+    "FMP": ("FMP_API_KEY", 250, 86400.0),
+    "Alpha Vantage": ("ALPHA_VANTAGE_API_KEY", 5, 60.0),
+}
+# klucze zastępcze, gdy brak konfiguracji (testy/mocki) – bez limitu
+FALLBACK_KEYS = {"Finnhub": ("FINNHUB_API_KEY_TEST", "TEST"), "FMP": ("FMP_API_KEY_TEST", "DUMMY"),
+                 "Alpha Vantage": ("ALPHA_VANTAGE_API_KEY_TEST", "DUMMY")}
+
+RATE_LIMIT_RETIRE_SECONDS = 60.0
+REJECTED_RETIRE_SECONDS = 3600.0
+
+
+class KeysExhausted(RuntimeError):
+    """Wyczerpany budżet wszystkich kluczy dostawcy – wywołanie pominięte (nie jest błędem dostawcy)."""
+
+
+class _KeyState:
+    """Stan jednego klucza: żetony, czas ostatniego uzupełnienia, wycofanie."""
+
+    def __init__(self, key: str, capacity: float, now: float):
+        self.key = key
+        self.tokens = capacity
+        self.updated = now
+        self.retired_until = 0.0
+        self.uses = 0
+        self.rate_limited = 0
+
+
+class KeyPool:
+    """Rotacja kluczy jednego dostawcy z kubełkiem żetonów per klucz (bezpieczna wątkowo)."""
+
+    def __init__(
+        self,
+        name: str,
+        keys: Iterable[str],
+        limit: Optional[int] = None,
+        period: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            name: Nazwa dostawcy (do logów).
+            keys: Klucze API (duplikaty są pomijane).
+            limit: Liczba żądań na okres dla jednego klucza (None – bez limitu).
+            period: Okres limitu w sekundach.
+            clock: Źródło czasu (podmieniane w testach).
+            sleep: Funkcja oczekiwania (podmieniana w testach).
+        """
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        now = clock()
+        self._keys: List[_KeyState] = [
+            _KeyState(k, float(limit or 0), now) for k in dict.fromkeys(k for k in keys if k)
+        ]
+        self._by_key = {state.key: state for state in self._keys}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _refill(self, state: _KeyState, now: float) -> None:
+        if self.limit is None:
+            return
+        state.tokens = min(float(self.limit), state.tokens + (now - state.updated) * self.limit / self.period)
+        state.updated = now
+
+    def _try_acquire(self, cost: float) -> Tuple[Optional[str], float]:
+        """Zwraca (klucz, 0) albo (None, czas oczekiwania na najbliższy dostępny klucz)."""
+        with self._lock:
+            now = self._clock()
+            best: Optional[_KeyState] = None
+            wait = float("inf")
+            for state in self._keys:
+                if state.retired_until > now:
+                    wait = min(wait, state.retired_until - now)
+                    continue
+                if self.limit is None:
+                    best = state if best is None or state.uses < best.uses else best
+                    continue
+                self._refill(state, now)
+                if state.tokens >= cost:
+                    if best is None or state.tokens > best.tokens:
+                        best = state
+                else:
+                    wait = min(wait, (cost - state.tokens) * self.period / self.limit)
+            if best is None:
+                return None, wait
+            if self.limit is not None:
+                best.tokens -= cost
+            best.uses += 1
+            return best.key, 0.0
+
+    def acquire(self, cost: float = 1, max_wait: float = 60.0) -> Optional[str]:
+        """
+        Wydaje klucz z budżetem na `cost` żądań; w razie potrzeby czeka (maks. `max_wait` sekund).
+        Returns:
+            Klucz API lub None, gdy żaden klucz nie będzie dostępny w zadanym czasie.
+        """
+        if not self._keys:
+            return None
+        if self.limit is not None:
+            cost = min(cost, self.limit)
+        deadline = self._clock() + max_wait
+        while True:
+            key, wait = self._try_acquire(cost)
+            if key is not None:
+                return key
+            remaining = deadline - self._clock()
+            if wait == float("inf") or wait > remaining:
+                logging.warning(f"Pula kluczy {self.name}: brak dostępnego klucza (oczekiwanie {wait:.0f}s)")
+                return None
+            logging.debug(f"Pula kluczy {self.name}: czekam {wait:.2f}s na budżet")
+            metrics = current_metrics()
+            if metrics is not None:
+                metrics.record_rate_limit_sleep(self.name, wait)
+            self._sleep(wait)
+
+    def report(self, key: str, status_code: Optional[int], retry_after: Optional[float] = None) -> None:
+        """
+        Zgłasza wynik żądania wykonanego kluczem.
+        429 – klucz wycofany na `retry_after` (domyślnie 60s) i wyzerowany budżet; 401/403 – wycofany na godzinę.
+        """
+        state = self._by_key.get(key)
+        if state is None or status_code is None:
+            return
+        with self._lock:
+            now = self._clock()
+            if status_code == 429:
+                state.rate_limited += 1
+                state.tokens = 0.0
+                state.updated = now
+                state.retired_until = now + (retry_after or RATE_LIMIT_RETIRE_SECONDS)
+                logging.warning(f"Pula kluczy {self.name}: klucz ...{key[-4:]} wycofany po 429")
+            elif status_code in (401, 403):
+                state.retired_until = now + REJECTED_RETIRE_SECONDS
+                logging.error(f"Pula kluczy {self.name}: klucz ...{key[-4:]} odrzucony ({status_code})")
+
+    def report_responses(self, key: str, responses: Iterable) -> None:
+        """Zgłasza odpowiedzi HTTP wykonane kluczem (pierwsza 429/401/403 wycofuje klucz)."""
+        for response in responses:
+            status = getattr(response, "status_code", None)
+            if status not in (429, 401, 403):
+                continue
+            try:
+                retry_after = float(response.headers.get("Retry-After"))
+            except (TypeError, ValueError, AttributeError):
+                retry_after = None
+            self.report(key, status, retry_after)
+            return
+
+    def snapshot(self) -> List[Dict]:
+        """Stan kluczy (bez ujawniania pełnych wartości)."""
+        with self._lock:
+            now = self._clock()
+            return [
+                {
+                    "key": f"...{s.key[-4:]}",
+                    "tokens": None if self.limit is None else round(s.tokens, 2),
+                    "uses": s.uses,
+                    "rate_limited": s.rate_limited,
+                    "retired_for": round(max(0.0, s.retired_until - now), 1),
+                }
+                for s in self._keys
+            ]
+
+
+# dostawca → (klucze ze środowiska, z których zbudowano pulę; pula)
+_POOLS: Dict[str, Tuple[Tuple[str, ...], KeyPool]] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_key_pool(provider: str) -> KeyPool:
+    """
+    Zwraca procesową pulę kluczy dostawcy ('Finnhub', 'FMP', 'Alpha Vantage').
+    Klucze: PREFIKS oraz PREFIKS_1..5 ze zmiennych środowiskowych; gdy brak – klucz testowy bez limitu.
+    Zmiana kluczy w środowisku (np. zapis w zakładce Ustawienia) buduje pulę od nowa.
+    """
+    prefix, limit, period = PROVIDER_LIMITS[provider]
+    keys = _get_keys_from_env(prefix)
+    if not keys:
+        env_name, default = FALLBACK_KEYS[provider]
+        source = (os.getenv(env_name, default),)
+    else:
+        source = tuple(keys)
+    with _POOLS_LOCK:
+        cached = _POOLS.get(provider)
+        if cached is not None and cached[0] == source:
+            return cached[1]
+        if keys:
+            pool = KeyPool(provider, keys, limit=limit, period=period)
+            logging.info(f"Pula kluczy {provider}: {len(keys)} kluczy, limit {limit}/{period:.0f}s na klucz")
+        else:
+            pool = KeyPool(provider, source)
+        _POOLS[provider] = (source, pool)
+        return pool
+
+
+def reset_key_pools() -> None:
+    """Usuwa pule (np. po zmianie kluczy w środowisku)."""
+    with _POOLS_LOCK:
+        _POOLS.clear()
@@ -0,0 +1,153 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\provider_health.py
+"""
+Zdrowie dostawców danych (yfinance, FMP, Alpha Vantage, ...).
+
+Każdy dostawca ma bezpiecznik (kolejne błędy → obwód otwarty, po czasie próba półotwarta) oraz
+kroczące statystyki ostatnich wywołań (odsetek błędów, opóźnienie). fetch_data pomija dostawców
+z otwartym obwodem i przesuwa na koniec kolejki dostawców zdegradowanych, zamiast dla każdego
+tickera i endpointu czekać na wyczerpanie ponowień HTTP.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from src.api.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+
+DEFAULT_WINDOW = 50
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RECOVERY_TIMEOUT = 300.0
+# powyżej tego odsetka błędów (przy min. liczbie próbek) dostawca jest zdegradowany
+DEGRADED_ERROR_RATE = 0.5
+MIN_SAMPLES = 4
+
+
+class ProviderHealth:
+    """Bezpiecznik i kroczące statystyki jednego dostawcy (bezpieczne wątkowo)."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout: float = DEFAULT_RECOVERY_TIMEOUT,
+        window: int = DEFAULT_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.breaker = CircuitBreaker(
+            name, failure_threshold=failure_threshold, recovery_timeout=recovery_timeout, clock=clock
+        )
+        self._samples: Deque[Tuple[bool, float]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool, latency: float) -> None:
+        """Rejestruje wynik wywołania dostawcy."""
+        with self._lock:
+            self._samples.append((ok, latency))
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def allow_request(self) -> bool:
+        return self.breaker.allow_request()
+
+    def release(self) -> None:
+        """Wywołanie nie doszło do skutku (np. brak budżetu kluczy) – bez wpisu do statystyk."""
+        self.breaker.release_probe()
+
+    @property
+    def samples(self) -> int:
+        return len(self._samples)
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._samples:
+                return 0.0
+            return sum(1 for ok, _ in self._samples if not ok) / len(self._samples)
+
+    @property
+    def avg_latency(self) -> float:
+        with self._lock:
+            if not self._samples:
+                return 0.0
+            return sum(latency for _, latency in self._samples) / len(self._samples)
+
+    @property
+    def degraded(self) -> bool:
+        """Obwód nie jest zamknięty albo odsetek błędów w oknie przekracza próg."""
+        if self.breaker.state != CLOSED:
+            return True
+        return self.samples >= MIN_SAMPLES and self.error_rate > DEGRADED_ERROR_RATE
+
+    def snapshot(self) -> Dict:
+        return {
+            "state": self.breaker.state,
+            "samples": self.samples,
+            "error_rate": round(self.error_rate, 3),
+            "avg_latency": round(self.avg_latency, 3),
+            "retry_after": round(self.breaker.retry_after(), 1),
+        }
+
+
+class ProviderHealthRegistry:
+    """Rejestr zdrowia dostawców – współdzielony przez wszystkie wywołania fetch_data w procesie."""
+
+    def __init__(self, **health_kwargs):
+        self._health_kwargs = health_kwargs
+        self._providers: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> ProviderHealth:
+        with self._lock:
+            if name not in self._providers:
+                self._providers[name] = ProviderHealth(name, **self._health_kwargs)
+            return self._providers[name]
+
+    def allow_request(self, name: str) -> bool:
+        return self.get(name).allow_request()
+
+    def record(self, name: str, ok: bool, latency: float) -> None:
+        self.get(name).record(ok, latency)
+
+    def release(self, name: str) -> None:
+        self.get(name).release()
+
+    def order(self, names: Iterable[str]) -> List[str]:
+        """
+        Kolejność odpytywania: zdrowi dostawcy w kolejności priorytetu, potem zdegradowani.
+        Dostawcy z otwartym obwodem trafiają na koniec (fetch_data i tak ich pominie, chyba że minie czas otwarcia).
+        """
+        def tier(name: str) -> int:
+            health = self._providers.get(name)
+            if health is None:
+                return 0
+            if health.breaker.state == OPEN:
+                return 2
+            return 1 if health.degraded else 0
+
+        return sorted(names, key=tier)  # sortowanie stabilne – zachowuje priorytet w obrębie grupy
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            providers = dict(self._providers)
+        return {name: health.snapshot() for name, health in providers.items()}
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Zeruje stan jednego lub wszystkich dostawców (np. po zmianie klucza API)."""
+        with self._lock:
+            if name is None:
+                self._providers.clear()
+            else:
+                self._providers.pop(name, None)
+        logging.info(f"Zresetowano zdrowie dostawców: {name or 'wszyscy'}")
+
+
+_REGISTRY = ProviderHealthRegistry()
+
+
+def get_registry() -> ProviderHealthRegistry:
+    """Zwraca procesowy rejestr zdrowia dostawców."""
+    return _REGISTRY
@@ -0,0 +1,170 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\provider_planner.py
+"""
+Planer kolejności dostawców danych.
+
+Dla każdego dostawcy zapamiętuje (średnia krocząca wykładnicza) skuteczność wypełniania każdego
+klucza wewnętrznego oraz opóźnienie wywołania. Dla tickera układa dostawców zachłannie według
+oczekiwanej liczby uzupełnionych brakujących kluczy na sekundę; dostawców, którzy wg historii
+niczego by nie dodali, pomija. Statystyki są zapisywane do pliku JSON i przetrwają restart.
+
+Skuteczność wygasa z czasem w stronę wartości początkowej (okres półtrwania DECAY_HALF_LIFE), więc
+dostawca pominięty po awarii lub serii pustych odpowiedzi po kilku godzinach znów zostanie odpytany.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+DEFAULT_STATS_FILE = "provider_stats.json"
+# waga nowej obserwacji w średniej kroczącej
+ALPHA = 0.2
+# założenia dla dostawcy/klucza bez historii – zachęcają do eksploracji
+PRIOR_FILL_RATE = 0.5
+PRIOR_LATENCY = 1.0
+# dostawca z mniejszą oczekiwaną korzyścią (w kluczach) jest pomijany...
+MIN_EXPECTED_GAIN = 0.05
+# ...ale dopiero gdy ma wystarczająco dużo obserwacji
+MIN_SAMPLES = 5
+# okres półtrwania (s) odchylenia skuteczności od PRIOR_FILL_RATE – przy 24 h pominięty dostawca
+# (skuteczność 0) wraca do planu po 1–4 h bez wywołań, zależnie od liczby brakujących kluczy
+DECAY_HALF_LIFE = 24 * 3600.0
+
+
+class ProviderPlanner:
+    """Statystyki skuteczności/opóźnień dostawców i planowanie kolejności odpytywania (bezpieczne wątkowo)."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_STATS_FILE, clock: Callable[[], float] = time.time):
+        """
+        Args:
+            path: Plik JSON ze statystykami (None – bez zapisu na dysk).
+            clock: Źródło czasu (sekundy epoki) – do wygaszania statystyk.
+        """
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.stats: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Wczytuje statystyki z pliku (brak/uszkodzony plik – puste statystyki)."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stats = json.load(f)
+            if isinstance(stats, dict):
+                with self._lock:
+                    self.stats = stats
+                logging.info(f"Wczytano statystyki dostawców z {self.path}")
+        except Exception as e:
+            logging.error(f"Błąd wczytywania statystyk dostawców z {self.path}: {str(e)}")
+
+    def save(self) -> None:
+        """Zapisuje statystyki (atomowo: plik tymczasowy + podmiana), jeśli się zmieniły."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(self.stats, indent=4, ensure_ascii=False)
+            self._dirty = False
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Błąd zapisu statystyk dostawców do {self.path}: {str(e)}")
+
+    def record(self, provider: str, requested_keys: Iterable[str], data: Optional[Dict], latency: float) -> None:
+        """
+        Aktualizuje statystyki po wywołaniu dostawcy.
+        Args:
+            provider: Nazwa dostawcy.
+            requested_keys: Klucze brakujące przed wywołaniem.
+            data: Zwrócone dane (None/{} – nic nie wypełniono).
+            latency: Czas wywołania w sekundach.
+        """
+        data = data or {}
+        with self._lock:
+            entry = self.stats.setdefault(provider, {"samples": 0, "latency": latency, "fill": {}})
+            decay = self._decay(entry)
+            entry["samples"] = round(entry["samples"] * decay) + 1
+            entry["latency"] = round((1 - ALPHA) * entry["latency"] + ALPHA * latency, 4)
+            fill = entry["fill"]
+            for key in list(fill):
+                fill[key] = round(PRIOR_FILL_RATE + (fill[key] - PRIOR_FILL_RATE) * decay, 4)
+            for key in requested_keys:
+                filled = 1.0 if data.get(key) not in (None, [], "") else 0.0
+                previous = fill.get(key, PRIOR_FILL_RATE)
+                fill[key] = round((1 - ALPHA) * previous + ALPHA * filled, 4)
+            entry["updated"] = self.clock()
+            self._dirty = True
+
+    def _decay(self, entry: Dict) -> float:
+        """Mnożnik wygaszania statystyk dostawcy (1 – świeże, 0 – bardzo stare lub bez znacznika czasu)."""
+        age = max(self.clock() - entry.get("updated", 0.0), 0.0)
+        return 0.5 ** (age / DECAY_HALF_LIFE)
+
+    def fill_rate(self, provider: str, key: str) -> float:
+        """Skuteczność wypełniania klucza, wygaszona w stronę PRIOR_FILL_RATE od ostatniego wywołania."""
+        entry = self.stats.get(provider)
+        if not entry or key not in entry.get("fill", {}):
+            return PRIOR_FILL_RATE
+        return PRIOR_FILL_RATE + (entry["fill"][key] - PRIOR_FILL_RATE) * self._decay(entry)
+
+    def latency(self, provider: str) -> float:
+        return max(self.stats.get(provider, {}).get("latency", PRIOR_LATENCY), 0.01)
+
+    def samples(self, provider: str) -> int:
+        """Liczba obserwacji dostawcy (wygaszana razem ze skutecznością)."""
+        entry = self.stats.get(provider)
+        return round(entry.get("samples", 0) * self._decay(entry)) if entry else 0
+
+    def plan(self, providers: Iterable[str], missing_keys: Iterable[str]) -> List[str]:
+        """
+        Układa dostawców dla jednego tickera.
+        Zachłannie wybiera dostawcę o największej oczekiwanej liczbie uzupełnionych kluczy na sekundę,
+        po czym zmniejsza prawdopodobieństwo braku każdego klucza o jego szansę wypełnienia.
+        Przy równych wynikach zachowuje kolejność wejściową (priorytet jakości danych).
+        Returns:
+            Lista dostawców do odpytania (pominięci ci, którzy wg historii nic by nie dodali).
+        """
+        remaining = list(providers)
+        still_missing = {key: 1.0 for key in missing_keys}
+        with self._lock:
+            ordered: List[str] = []
+            while remaining and still_missing:
+                gains = {
+                    p: sum(prob * self.fill_rate(p, key) for key, prob in still_missing.items())
+                    for p in remaining
+                }
+                best = max(remaining, key=lambda p: gains[p] / self.latency(p))
+                if gains[best] < MIN_EXPECTED_GAIN:
+                    # reszta nic nie wnosi – zostawiamy tylko dostawców bez wystarczającej historii
+                    ordered.extend(p for p in remaining if self.samples(p) < MIN_SAMPLES)
+                    break
+                ordered.append(best)
+                remaining.remove(best)
+                for key in still_missing:
+                    still_missing[key] *= 1.0 - self.fill_rate(best, key)
+            else:
+                ordered.extend(p for p in remaining if self.samples(p) < MIN_SAMPLES)
+        return ordered
+
+
+_PLANNER: Optional[ProviderPlanner] = None
+_PLANNER_LOCK = threading.Lock()
+
+
+def get_planner() -> ProviderPlanner:
+    """Zwraca procesowy planer (plik statystyk: PROVIDER_STATS_PATH lub provider_stats.json)."""
+    global _PLANNER
+    if _PLANNER is None:
+        with _PLANNER_LOCK:
+            if _PLANNER is None:
+                _PLANNER = ProviderPlanner(os.getenv("PROVIDER_STATS_PATH", DEFAULT_STATS_FILE))
+    return _PLANNER
@@ -0,0 +1,200 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\refresh_state.py
+"""
+Stan odświeżania przyrostowego (REFRESH_MODE=incremental).
+
+Sprawozdania finansowe zmieniają się tylko po publikacji wyników, więc dla każdego tickera
+zapamiętujemy ostatni widziany okres sprawozdawczy, datę publikacji wyników i wartości pól
+pochodzących ze sprawozdań. Między publikacjami fetch_data pobiera tylko notowania i wskaźniki,
+a pola sprawozdawcze uzupełnia z zapamiętanego stanu; sprawozdania są pobierane ponownie, gdy
+nowy okres jest spodziewany (kalendarz, data wyników) albo wykryty (nowszy `latest_period`).
+"""
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+DEFAULT_STATE_FILE = "refresh_state.json"
+
+# pola, które dostawcy liczą ze sprawozdań (income/balance/cash flow)
+STATEMENT_KEYS = [
+    "quarterly_revenue",
+    "yearly_revenue",
+    "revenue",
+    "debt_equity",
+    "cash_ratio",
+    "free_cash_flow",
+    "operating_cash_flow",
+    "operating_margin",
+    "profit_margin",
+    "current_ratio",
+    "roe",
+    "quick_ratio",
+    "cash_flow_to_debt_ratio",
+]
+# długość kwartału i typowe opóźnienie publikacji wyników po końcu okresu
+QUARTER_DAYS = 91
+REPORTING_LAG_DAYS = 30
+# gdy nowy okres jest spodziewany, ale jeszcze niewykryty – ponawiamy co tyle dni
+RECHECK_DAYS = 7
+# niezależnie od kalendarza sprawozdania odświeżamy co najmniej raz na tyle dni
+MAX_AGE_DAYS = 120
+
+
+def _to_date(value) -> Optional[date]:
+    """'2024-09-30', '2024-09-30 00:00:00' lub date → date (None dla wartości nieczytelnych)."""
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def latest_period_in(result: Dict) -> Optional[str]:
+    """Najnowsza data okresu w quarterly_revenue/yearly_revenue wyniku (format YYYY-MM-DD)."""
+    dates = [
+        _to_date(entry.get("date"))
+        for key in ("quarterly_revenue", "yearly_revenue")
+        for entry in (result.get(key) or [])
+        if isinstance(entry, dict)
+    ]
+    dates = [d for d in dates if d]
+    return max(dates).isoformat() if dates else None
+
+
+class RefreshState:
+    """Ostatnie okresy sprawozdawcze i pola sprawozdań per ticker (bezpieczne wątkowo, zapis do JSON)."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_STATE_FILE):
+        """
+        Args:
+            path: Plik JSON ze stanem (None – bez zapisu na dysk).
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.tickers: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Wczytuje stan z pliku (brak/uszkodzony plik – pusty stan)."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                tickers = json.load(f)
+            if isinstance(tickers, dict):
+                with self._lock:
+                    self.tickers = tickers
+                logging.info(f"Wczytano stan odświeżania z {self.path}")
+        except Exception as e:
+            logging.error(f"Błąd wczytywania stanu odświeżania z {self.path}: {str(e)}")
+
+    def save(self) -> None:
+        """Zapisuje stan (atomowo: plik tymczasowy + podmiana), jeśli się zmienił."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(self.tickers, indent=4, ensure_ascii=False)
+            self._dirty = False
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.error(f"Błąd zapisu stanu odświeżania do {self.path}: {str(e)}")
+
+    def needs_statements(self, ticker: str, today: Optional[date] = None) -> bool:
+        """
+        Czy dla tickera trzeba pobrać sprawozdania.
+        Tak, gdy: brak stanu; minęła zapamiętana data publikacji wyników; od końca ostatniego okresu
+        minął kwartał + opóźnienie publikacji (ponawiane co RECHECK_DAYS); stan jest starszy niż MAX_AGE_DAYS.
+        """
+        today = today or date.today()
+        entry = self.tickers.get(ticker.upper())
+        if not entry:
+            return True
+        refreshed = _to_date(entry.get("refreshed"))
+        if refreshed is None or (today - refreshed).days >= MAX_AGE_DAYS:
+            return True
+        earnings = _to_date(entry.get("next_earnings"))
+        if earnings and refreshed < earnings <= today:
+            return True
+        last_period = _to_date(entry.get("last_period"))
+        if last_period is None:
+            return (today - refreshed).days >= RECHECK_DAYS
+        expected = last_period + timedelta(days=QUARTER_DAYS + REPORTING_LAG_DAYS)
+        return today >= expected and (today - refreshed).days >= RECHECK_DAYS
+
+    def is_new_period(self, ticker: str, latest_period: Optional[str]) -> bool:
+        """Czy zgłoszony przez dostawcę okres jest nowszy od zapamiętanego."""
+        reported = _to_date(latest_period)
+        if reported is None:
+            return False
+        known = _to_date(self.tickers.get(ticker.upper(), {}).get("last_period"))
+        return known is None or reported > known
+
+    def cached_statements(self, ticker: str) -> Dict:
+        """Zapamiętane wartości pól sprawozdawczych tickera."""
+        return dict(self.tickers.get(ticker.upper(), {}).get("statements", {}))
+
+    def record(
+        self,
+        ticker: str,
+        result: Dict,
+        statements_fetched: bool,
+        signals: Optional[Dict] = None,
+        today: Optional[date] = None,
+    ) -> None:
+        """
+        Aktualizuje stan tickera po pobraniu.
+        Args:
+            ticker: Ticker.
+            result: Wynik fetch_data dla tickera.
+            statements_fetched: Czy w tym przebiegu pobierano sprawozdania (gdy żaden dostawca ich nie zwrócił,
+                zachowujemy poprzedni stan).
+            signals: Dane od dostawców: 'latest_period' (koniec ostatniego okresu), 'next_earnings' (data wyników).
+        """
+        signals = signals or {}
+        today = today or date.today()
+        with self._lock:
+            entry = self.tickers.setdefault(ticker.upper(), {})
+            if signals.get("next_earnings"):
+                entry["next_earnings"] = signals["next_earnings"]
+            snapshot = {key: result.get(key) for key in STATEMENT_KEYS if result.get(key) not in (None, [], "")}
+            if statements_fetched and (snapshot or not entry.get("statements")):
+                periods = [p for p in (latest_period_in(result), signals.get("latest_period")) if _to_date(p)]
+                if periods:
+                    entry["last_period"] = max(periods, key=_to_date)[:10]
+                entry["statements"] = snapshot
+                entry["refreshed"] = today.isoformat()
+            self._dirty = True
+
+    def forget(self, tickers: Optional[Iterable[str]] = None) -> None:
+        """Usuwa stan tickerów (None – wszystkich), wymuszając pełne odświeżenie."""
+        with self._lock:
+            if tickers is None:
+                self.tickers.clear()
+            else:
+                for ticker in tickers:
+                    self.tickers.pop(ticker.upper(), None)
+            self._dirty = True
+
+
+_STATE: Optional[RefreshState] = None
+_STATE_LOCK = threading.Lock()
+
+
+def get_refresh_state() -> RefreshState:
+    """Zwraca procesowy stan odświeżania (plik: REFRESH_STATE_PATH lub refresh_state.json)."""
+    global _STATE
+    if _STATE is None:
+        with _STATE_LOCK:
+            if _STATE is None:
+                _STATE = RefreshState(os.getenv("REFRESH_STATE_PATH", DEFAULT_STATE_FILE))
+    return _STATE
@@ -0,0 +1,280 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\replay.py
+"""
+Nagrywanie i odtwarzanie odpowiedzi dostawców (kasety) – powtarzalne testy i benchmarki fetch_data bez sieci.
+
+Nagrywanie (`recording`) opakowuje fetchery api_fetcher (yfinance, FMP, Alpha Vantage, Finnhub, yahooquery,
+MarketWatch, Investing) i zapisuje ich zmapowane wyniki wraz z czasem odpowiedzi do kasety JSON.
+Odtwarzanie (`replaying`) podstawia w ich miejsce lokalny zamiennik (ReplayProvider), który zwraca
+zapisane dane z konfigurowalnym opóźnieniem (nagranym, skalowanym lub stałym) i wstrzykiwaniem błędów.
+Wstrzykiwanie jest deterministyczne (seed), niezależnie od kolejności wątków.
+
+Ograniczenia: kasety zawierają wyniki po mapowaniu pól, a nie odpowiedzi HTTP, więc odtwarzanie pomija
+parsowanie odpowiedzi i map_api_fields (i pomiary żądań HTTP w FetchMetrics). fetch_data w trybie
+scrape_mode='async' pobiera MarketWatch/Investing przez src.api.async_scraper z pominięciem podmienionych
+fetcherów – z kasetą należy używać trybu 'sync'.
+
+Przykład nagrania kasety:
+    python -m src.api.replay AAPL MSFT NVDA -o benchmarks/fixtures/fetch_cassette.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+from src.api import api_fetcher  # import modułu – podmieniamy jego atrybuty
+
+# dostawca (nazwa w fetch_data) → funkcja api_fetcher
+PROVIDER_FUNCTIONS: Dict[str, str] = {
+    "yfinance": "fetch_from_yfinance",
+    "FMP": "fetch_from_fmp",
+    "Alpha Vantage": "fetch_from_alpha_vantage",
+    "Finnhub": "fetch_from_finnhub",
+    "yahooquery": "fetch_from_yahooquery",
+    "MarketWatch": "fetch_from_marketwatch",
+    "Investing": "fetch_from_investing",
+}
+
+CASSETTE_VERSION = 1
+
+
+class ReplayError(ConnectionError):
+    """Błąd wstrzyknięty przez ReplayProvider (symulacja awarii dostawcy)."""
+
+
+class Cassette:
+    """Zapisane odpowiedzi dostawców: dostawca → typ danych → ticker → {'data', 'latency'} (bezpieczne wątkowo)."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Plik JSON kasety (None – tylko w pamięci); istniejący plik jest wczytywany.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Dict[str, Dict]]] = {}
+        if path and os.path.exists(path):
+            self.load()
+
+    def load(self) -> None:
+        """Wczytuje kasetę z pliku."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        with self._lock:
+            self.entries = payload.get("providers", {})
+        logging.info(f"Wczytano kasetę {self.path}: {len(self.tickers())} tickerów")
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Zapisuje kasetę (atomowo: plik tymczasowy + podmiana)."""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            payload = json.dumps(
+                {"version": CASSETTE_VERSION, "providers": self.entries}, indent=4, ensure_ascii=False, default=str
+            )
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def put(self, provider: str, data_type: str, ticker: str, data: Dict, latency: float) -> None:
+        """Zapisuje odpowiedź dostawcy dla tickera (nadpisuje poprzednią)."""
+        with self._lock:
+            self.entries.setdefault(provider, {}).setdefault(data_type, {})[ticker.upper()] = {
+                "data": dict(data or {}),
+                "latency": round(latency, 4),
+            }
+
+    def get(self, provider: str, data_type: str, ticker: str) -> Optional[Dict]:
+        """Zapisana odpowiedź ({'data', 'latency'}) lub None."""
+        with self._lock:
+            return self.entries.get(provider, {}).get(data_type, {}).get(ticker.upper())
+
+    def tickers(self, data_type: str = "company") -> List[str]:
+        """Posortowane tickery z co najmniej jedną zapisaną odpowiedzią danego typu."""
+        with self._lock:
+            return sorted({t for types in self.entries.values() for t in types.get(data_type, {})})
+
+
+class ReplayProvider:
+    """Lokalny zamiennik fetcherów odtwarzający kasetę z opóźnieniem i wstrzykiwaniem błędów."""
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: Union[None, float, Dict[str, float]] = None,
+        latency_scale: float = 1.0,
+        error_rate: Union[float, Dict[str, float]] = 0.0,
+        alias_unknown: bool = False,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            cassette: Kaseta z odpowiedziami.
+            latency: Stałe opóźnienie w sekundach (liczba lub słownik per dostawca); None – opóźnienie nagrane.
+            latency_scale: Mnożnik opóźnienia (0 – bez czekania, benchmark samego przetwarzania).
+            error_rate: Prawdopodobieństwo błędu ReplayError (liczba lub słownik per dostawca).
+            alias_unknown: Nieznane tickery odtwarzane danymi nagranego tickera (stałe przypisanie wg CRC32),
+                co pozwala zasymulować przebieg po setkach tickerów z kilku nagranych.
+            seed: Ziarno wstrzykiwania błędów.
+            sleep: Funkcja czekania (podmieniana w testach).
+        """
+        self.cassette = cassette
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.alias_unknown = alias_unknown
+        self.seed = seed
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._calls: Dict[tuple, int] = {}
+        self.stats = {"calls": 0, "hits": 0, "misses": 0, "errors": 0}
+
+    def _per_provider(self, value, provider: str, default=None):
+        return value.get(provider, default) if isinstance(value, dict) else value
+
+    def _resolve(self, provider: str, data_type: str, ticker: str) -> Optional[Dict]:
+        entry = self.cassette.get(provider, data_type, ticker)
+        if entry is None and self.alias_unknown:
+            recorded = self.cassette.tickers(data_type)
+            if recorded:
+                alias = recorded[zlib.crc32(ticker.upper().encode("utf-8")) % len(recorded)]
+                entry = self.cassette.get(provider, data_type, alias)
+        return entry
+
+    def _should_fail(self, provider: str, ticker: str) -> bool:
+        rate = self._per_provider(self.error_rate, provider, 0.0) or 0.0
+        if rate <= 0:
+            return False
+        with self._lock:
+            key = (provider, ticker)
+            attempt = self._calls[key] = self._calls.get(key, 0) + 1
+        draw = zlib.crc32(f"{self.seed}:{provider}:{ticker}:{attempt}".encode("utf-8")) / 0xFFFFFFFF
+        return draw < rate
+
+    def fetch(self, provider: str, ticker: str, data_type: str = "company", statements: bool = True) -> Dict:
+        """Odtwarza odpowiedź dostawcy (sygnatura jak fetch_from_*)."""
+        ticker = ticker.upper()
+        entry = self._resolve(provider, data_type, ticker)
+        latency = self._per_provider(self.latency, provider)
+        if latency is None:
+            latency = entry["latency"] if entry else 0.0
+        delay = latency * self.latency_scale
+        if delay > 0:
+            self._sleep(delay)
+        with self._lock:
+            self.stats["calls"] += 1
+        if self._should_fail(provider, ticker):
+            with self._lock:
+                self.stats["errors"] += 1
+            raise ReplayError(f"Wstrzyknięty błąd {provider} dla {ticker}")
+        with self._lock:
+            self.stats["hits" if entry else "misses"] += 1
+        if not entry:
+            return {}
+        data = dict(entry["data"])
+        if not statements:
+            from src.api.refresh_state import STATEMENT_KEYS
+
+            for key in STATEMENT_KEYS:
+                data.pop(key, None)
+        return data
+
+    def method(self, provider: str) -> Callable[..., Dict]:
+        """Funkcja o sygnaturze fetch_from_* odtwarzająca danego dostawcę."""
+
+        def replay(ticker: str, data_type: str = "company", statements: bool = True) -> Dict:
+            return self.fetch(provider, ticker, data_type, statements)
+
+        replay.__name__ = f"replay_{PROVIDER_FUNCTIONS[provider]}"
+        return replay
+
+
+@contextmanager
+def _patched(methods: Dict[str, Callable]) -> Iterator[None]:
+    originals = {name: getattr(api_fetcher, name) for name in methods}
+    try:
+        for name, method in methods.items():
+            setattr(api_fetcher, name, method)
+        yield
+    finally:
+        for name, method in originals.items():
+            setattr(api_fetcher, name, method)
+
+
+@contextmanager
+def replaying(cassette: Union[str, Cassette], **options) -> Iterator[ReplayProvider]:
+    """
+    Podstawia fetchery api_fetcher zamiennikiem odtwarzającym kasetę.
+    Args:
+        cassette: Ścieżka do kasety lub obiekt Cassette.
+        **options: Parametry ReplayProvider (latency, latency_scale, error_rate, alias_unknown, seed, sleep).
+    """
+    if isinstance(cassette, str):
+        cassette = Cassette(cassette)
+    provider = ReplayProvider(cassette, **options)
+    with _patched({name: provider.method(p) for p, name in PROVIDER_FUNCTIONS.items()}):
+        yield provider
+
+
+@contextmanager
+def recording(cassette: Union[str, Cassette]) -> Iterator[Cassette]:
+    """
+    Nagrywa odpowiedzi prawdziwych fetcherów do kasety (zapis po wyjściu z bloku, gdy kaseta ma ścieżkę).
+    Zapisywane są tylko pełne odpowiedzi (ze sprawozdaniami); odpowiedzi bez sprawozdań nie nadpisują pełnych.
+    """
+    if isinstance(cassette, str):
+        cassette = Cassette(cassette)
+
+    def wrap(provider: str, original: Callable) -> Callable:
+        def record(ticker: str, data_type: str = "company", statements: bool = True) -> Dict:
+            start = time.perf_counter()
+            data = original(ticker, data_type) if statements else original(ticker, data_type, statements=False)
+            if statements or cassette.get(provider, data_type, ticker) is None:
+                cassette.put(provider, data_type, ticker, data, time.perf_counter() - start)
+            return data
+
+        return record
+
+    methods = {name: wrap(p, getattr(api_fetcher, name)) for p, name in PROVIDER_FUNCTIONS.items()}
+    try:
+        with _patched(methods):
+            yield cassette
+    finally:
+        try:
+            cassette.save()
+        except Exception as e:
+            logging.error(f"Błąd zapisu kasety {cassette.path}: {str(e)}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Nagrywa kasetę dla podanych tickerów (każdy obsługujący typ danych dostawca osobno)."""
+    parser = argparse.ArgumentParser(prog="python -m src.api.replay", description="Nagrywanie kasety odpowiedzi dostawców")
+    parser.add_argument("tickers", nargs="+", help="Tickery do nagrania")
+    parser.add_argument("-o", "--output", required=True, help="Plik kasety (.json); istniejący jest uzupełniany")
+    parser.add_argument("--data-type", default="company", choices=["company", "etf", "macro"])
+    args = parser.parse_args(argv)
+
+    with recording(args.output) as cassette:
+        for ticker in args.tickers:
+            # wszyscy dostawcy, nie tylko potrzebni do kompletu – odtwarzanie ma działać przy dowolnej kolejności planera
+            for provider, name in PROVIDER_FUNCTIONS.items():
+                if args.data_type not in api_fetcher.PROVIDER_DATA_TYPES.get(provider, {args.data_type}):
+                    continue
+                try:
+                    getattr(api_fetcher, name)(ticker.upper(), args.data_type)
+                except Exception as e:
+                    logging.error(f"Błąd nagrywania {provider} dla {ticker}: {str(e)}")
+    print(f"Nagrano {len(cassette.tickers(args.data_type))} tickerów do {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,190 @@
 # Lokalizacja: C:\Users\Msi\Desktop\Analizator\src\api\scraper.py
-import requests
-from bs4 import BeautifulSoup
 import logging
-from src.core.logging_config import setup_logging
+import threading
+from typing import Dict, List, Optional
+
+# requests i BeautifulSoup importowane leniwie w funkcjach (krótszy import modułu)
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+MARKETWATCH_URL = "https://www.marketwatch.com/investing/stock/{ticker}"
+INVESTING_URL = "https://www.investing.com/equities/{ticker}"
+
+# Etykiety bloku "key data" → klucze wyniku
+KEY_DATA_LABELS = {"Sector": "sector", "P/E Ratio": "pe_ratio", "EPS": "eps"}
+
+MARKETWATCH_NAME_CLASS = "company__name"
+INVESTING_NAME_CLASS = "instrument-header_title__GTWDv"
+INVESTING_PRICE_CLASS = "instrument-price_instrument-price__3uw25"
+
+_session = None
+_session_lock = threading.Lock()
+_parser = None
+
+
+def build_session(max_retries=None, pool_maxsize: int = 8):
+    """
+    Tworzy sesję HTTP scrapera z pulą połączeń keep-alive.
+    Args:
+        max_retries: Obiekt Retry/liczba prób dla HTTPAdapter (None – brak ponowień).
+        pool_maxsize: Maks. liczba utrzymywanych połączeń na host.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=max_retries or 0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _get_session():
+    """
+    Zwraca współdzieloną sesję HTTP scrapera (pula połączeń keep-alive + retry), tworzoną przy pierwszym użyciu.
+    Dzięki temu kolejne strony tej samej domeny nie płacą za nowy handshake TLS.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                from urllib3.util.retry import Retry
+
+                retries = Retry(
+                    total=3,
+                    backoff_factor=1,
+                    status_forcelist=[429, 500, 502, 503, 504],
+                    respect_retry_after_header=True,
+                )
+                _session = build_session(retries)
+    return _session
+
+
+def _get_parser() -> str:
+    """Parser HTML: lxml (C, kilkukrotnie szybszy), a gdy niedostępny – wbudowany html.parser."""
+    global _parser
+    if _parser is None:
+        try:
+            import lxml  # noqa: F401
+
+            _parser = "lxml"
+        except ImportError:
+            logging.warning("Brak biblioteki 'lxml' – scraper używa wolniejszego 'html.parser'")
+            _parser = "html.parser"
+    return _parser
+
+
+def fetch_html(url: str, timeout: int = 10) -> str:
+    """
+    Pobiera stronę przez współdzieloną sesję.
+    Raises:
+        requests.HTTPError: Przy kodzie odpowiedzi błędu (po wyczerpaniu retry).
+    """
+    response = _get_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+def _classes(tag) -> List[str]:
+    return tag.get("class") or []
+
+
+def _key_data_label(tag, data: Dict, pending: List[str]) -> bool:
+    """
+    Rejestruje etykietę bloku "key data" (np. 'P/E Ratio'), która czeka na najbliższy następny element
+    wartości – odpowiednik `find(string=...)` + `find_next(...)` bez przeszukiwania dokumentu dla każdej etykiety.
+    Returns:
+        True, gdy znacznik jest etykietą.
+    """
+    key = KEY_DATA_LABELS.get(tag.get_text(strip=True))
+    if key is None:
+        return False
+    if key not in data and key not in pending:
+        pending.append(key)
+    return True
+
+
+def _key_data_value(tag, data: Dict, pending: List[str]) -> None:
+    """Przypisuje tekst elementu wartości wszystkim oczekującym etykietom."""
+    text = tag.get_text().strip()
+    for key in pending:
+        data[key] = text
+    pending.clear()
+
+
+def parse_marketwatch(html: str) -> Dict:
+    """
+    Parsuje stronę notowania MarketWatch w jednym przejściu.
+    Parsowane są tylko znaczniki nagłówka, ceny i bloku "key data" (SoupStrainer), reszta strony jest pomijana.
+    Args:
+        html: Treść strony.
+    Returns:
+        Słownik z kluczami company_name, current_price oraz (gdy obecne) sector, pe_ratio, eps.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, _get_parser(), parse_only=SoupStrainer(["h1", "bg-quote", "small", "span"]))
+    data: Dict = {"company_name": "", "current_price": ""}
+    found = set()
+    pending: List[str] = []
+    for tag in soup.find_all(["h1", "bg-quote", "small", "span"]):
+        if tag.name == "h1":
+            if "company_name" not in found and MARKETWATCH_NAME_CLASS in _classes(tag):
+                data["company_name"] = tag.get_text().strip()
+                found.add("company_name")
+        elif tag.name == "bg-quote":
+            if "current_price" not in found and "value" in _classes(tag):
+                data["current_price"] = tag.get_text().strip()
+                found.add("current_price")
+        elif tag.name == "small":
+            _key_data_label(tag, data, pending)
+        elif pending and "primary" in _classes(tag):
+            _key_data_value(tag, data, pending)
+    return data
+
+
+def _investing_strainer(name: str, attrs: Optional[Dict] = None) -> bool:
+    """
+    Filtr SoupStrainer dla Investing.com: nagłówek, blok ceny i wszystkie <span> (etykiety/wartości).
+    bs4 < 4.13 przekazuje także atrybuty (zostaje tylko <div> z ceną); nowsze wersje – samą nazwę znacznika.
+    """
+    if name in ("h1", "span"):
+        return True
+    if name != "div":
+        return False
+    return attrs is None or INVESTING_PRICE_CLASS in (attrs.get("class") or "")
+
+
+def parse_investing(html: str) -> Dict:
+    """
+    Parsuje stronę notowania Investing.com w jednym przejściu (parsowanie częściowe jak w parse_marketwatch).
+    Args:
+        html: Treść strony.
+    Returns:
+        Słownik z kluczami company_name, current_price oraz (gdy obecne) sector, pe_ratio, eps.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, _get_parser(), parse_only=SoupStrainer(_investing_strainer))
+    data: Dict = {"company_name": "", "current_price": ""}
+    found = set()
+    pending: List[str] = []
+    for tag in soup.find_all(["h1", "div", "span"]):
+        if tag.name == "h1":
+            if "company_name" not in found and INVESTING_NAME_CLASS in _classes(tag):
+                data["company_name"] = tag.get_text().strip()
+                found.add("company_name")
+        elif tag.name == "div":
+            if "current_price" not in found and INVESTING_PRICE_CLASS in _classes(tag):
+                data["current_price"] = tag.get_text().strip()
+                found.add("current_price")
+        elif not _key_data_label(tag, data, pending) and pending:
+            _key_data_value(tag, data, pending)
+    return data
 
-# Inicjalizacja logowania
-setup_logging()
 
 def scrape_marketwatch(ticker: str) -> dict:
     """
@@ -16,47 +195,14 @@ def scrape_marketwatch(ticker: str) -> dict:
         Słownik z danymi lub pusty słownik w przypadku błędu.
     """
     try:
-        url = f"https://www.marketwatch.com/investing/stock/{ticker}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        data = {}
-        # Nazwa spółki
-        name_elem = soup.find("h1", class_="company__name")
-        data["company_name"] = name_elem.text.strip() if name_elem else ""
-        
-        # Sektor
-        sector_elem = soup.find("small", string="Sector")
-        if sector_elem:
-            sector = sector_elem.find_next("span", class_="primary")
-            data["sector"] = sector.text.strip() if sector else ""
-        
-        # Cena
-        price_elem = soup.find("bg-quote", class_="value")
-        data["current_price"] = price_elem.text.strip() if price_elem else ""
-        
-        # PE Ratio
-        pe_elem = soup.find("small", string="P/E Ratio")
-        if pe_elem:
-            pe = pe_elem.find_next("span", class_="primary")
-            data["pe_ratio"] = pe.text.strip() if pe else ""
-        
-        # EPS
-        eps_elem = soup.find("small", string="EPS")
-        if eps_elem:
-            eps = eps_elem.find_next("span", class_="primary")
-            data["eps"] = eps.text.strip() if eps else ""
-        
+        data = parse_marketwatch(fetch_html(MARKETWATCH_URL.format(ticker=ticker)))
         logging.debug(f"Zescrapowano dane z MarketWatch dla {ticker}: {data}")
         return data
     except Exception as e:
         logging.error(f"Błąd scrapowania danych z MarketWatch dla {ticker}: {str(e)}")
         return {}
 
+
 def scrape_investing(ticker: str) -> dict:
     """
     Scrapuje dane z Investing.com dla podanego tickera.
@@ -66,43 +212,9 @@ def scrape_investing(ticker: str) -> dict:
         Słownik z danymi lub pusty słownik w przypadku błędu.
     """
     try:
-        url = f"https://www.investing.com/equities/{ticker.lower()}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        data = {}
-        # Nazwa spółki
-        name_elem = soup.find("h1", class_="instrument-header_title__GTWDv")
-        data["company_name"] = name_elem.text.strip() if name_elem else ""
-        
-        # Sektor
-        sector_elem = soup.find("span", string="Sector")
-        if sector_elem:
-            sector = sector_elem.find_next("span")
-            data["sector"] = sector.text.strip() if sector else ""
-        
-        # Cena
-        price_elem = soup.find("div", class_="instrument-price_instrument-price__3uw25")
-        data["current_price"] = price_elem.text.strip() if price_elem else ""
-        
-        # PE Ratio
-        pe_elem = soup.find("span", string="P/E Ratio")
-        if pe_elem:
-            pe = pe_elem.find_next("span")
-            data["pe_ratio"] = pe.text.strip() if pe else ""
-        
-        # EPS
-        eps_elem = soup.find("span", string="EPS")
-        if eps_elem:
-            eps = eps_elem.find_next("span")
-            data["eps"] = eps.text.strip() if eps else ""
-        
+        data = parse_investing(fetch_html(INVESTING_URL.format(ticker=ticker.lower())))
         logging.debug(f"Zescrapowano dane z Investing.com dla {ticker}: {data}")
         return data
     except Exception as e:
         logging.error(f"Błąd scrapowania danych z Investing.com dla {ticker}: {str(e)}")
-        return {}
\ No newline at end of file
+        return {}
@@ -0,0 +1,127 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\api\singleflight.py
+"""
+Deduplikacja równoczesnych wywołań (singleflight) z krótką pamięcią wyników.
+
+Gdy kilka wątków (GUI, zakładka makro, tryb wsadowy) równocześnie pyta o ten sam klucz,
+np. (dostawca, endpoint, ticker), wykonywane jest jedno wywołanie, a pozostałe czekają na jego
+wynik (lub wyjątek). Udane wyniki są dodatkowo pamiętane przez `ttl` sekund, więc wywołania
+tuż po sobie też nie generują ruchu do dostawcy.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_TTL = 30.0
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class _Call:
+    """Wywołanie w toku – uczestnicy czekają na `done`."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Współdzielenie wywołań w toku i pamięć udanych wyników (bezpieczne wątkowo)."""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            ttl: Czas pamiętania udanych wyników w sekundach (0 – tylko współdzielenie wywołań w toku).
+            max_entries: Maksymalna liczba zapamiętanych wyników (najstarsze są usuwane).
+            clock: Źródło czasu (podmieniane w testach).
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._memo: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._stats = {"calls": 0, "shared": 0, "memo_hits": 0}
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        memoize: Optional[Callable[[Any], bool]] = None,
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """
+        Wykonuje `fn` raz dla wszystkich równoczesnych wywołań z tym samym kluczem.
+        Args:
+            key: Klucz deduplikacji, np. ('FMP', 'profile', 'AAPL').
+            fn: Funkcja bez argumentów wykonująca właściwe wywołanie.
+            memoize: Czy zapamiętać wynik (domyślnie każdy wynik bez wyjątku).
+            ttl: Czas pamiętania dla tego wywołania (None – domyślny instancji).
+        Returns:
+            Wynik `fn` (własny, współdzielony albo zapamiętany); wyjątek `fn` jest przekazywany wszystkim uczestnikom.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo is not None:
+                if memo[0] > self._clock():
+                    self._stats["memo_hits"] += 1
+                    return memo[1]
+                del self._memo[key]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["calls"] += 1
+            else:
+                self._stats["shared"] += 1
+
+        if not leader:
+            logging.debug(f"Singleflight: dołączam do wywołania w toku {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                if call.error is None and ttl > 0 and (memoize is None or memoize(call.result)):
+                    self._memo[key] = (self._clock() + ttl, call.result)
+                    self._memo.move_to_end(key)
+                    while len(self._memo) > self.max_entries:
+                        self._memo.popitem(last=False)
+            call.done.set()
+        return call.result
+
+    def forget(self, key: Optional[Hashable] = None) -> None:
+        """Usuwa zapamiętany wynik klucza (None – wszystkie)."""
+        with self._lock:
+            if key is None:
+                self._memo.clear()
+            else:
+                self._memo.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Liczniki: wykonane wywołania, współdzielone, trafienia w pamięć."""
+        with self._lock:
+            return dict(self._stats)
+
+
+_FLIGHT = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    """Zwraca procesową instancję singleflight używaną przez api_fetcher."""
+    return _FLIGHT
@@ -0,0 +1,304 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\cli\batch.py
+"""
+Wsadowe (bezokienkowe) odświeżanie danych spółek: pobranie → faza → punktacja → zapis.
+
+Przeznaczone do uruchamiania z harmonogramu (np. nocą na serwerze bez ekranu).
+Moduł NIE importuje tkinter ani matplotlib.
+
+Przykład:
+    python -m src.cli.batch AAPL MSFT -f watchlist.txt -j 4 -o wyniki.json -r raport.json
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.api import api_fetcher  # import modułu (łatwy patch w testach)
+from src.api.fetch_metrics import FetchMetrics
+from src.core.company_data import CompanyData
+from src.core.logging_config import setup_logging
+from src.core.phase_classifier import classify_phase
+from src.core.profiling import enable_from_env
+from src.core.scoring_calculator import calculate_score
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+
+RESULT_FIELDS = ["ticker", "status", "nazwa", "sektor", "faza", "punkty", "missing_keys", "error", "fetch_seconds"]
+
+
+def read_ticker_file(path: str) -> List[str]:
+    """
+    Wczytuje tickery z pliku tekstowego.
+    Dopuszcza wiele tickerów w linii (oddzielonych przecinkiem lub spacją) oraz komentarze '#'.
+    Args:
+        path: Ścieżka do pliku z tickerami.
+    Returns:
+        Lista tickerów (wielkie litery, w kolejności wystąpienia).
+    """
+    tickers = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            for token in line.replace(",", " ").split():
+                tickers.append(token.strip().upper())
+    return tickers
+
+
+def collect_tickers(args: argparse.Namespace, company_data: CompanyData) -> List[str]:
+    """Zbiera tickery z argumentów, plików i (opcjonalnie) całego katalogu danych, bez duplikatów."""
+    tickers = [t.upper() for t in args.tickers]
+    for path in args.files:
+        tickers.extend(read_ticker_file(path))
+    if args.all:
+        tickers.extend(c["ticker"] for c in company_data.companies)
+    seen = set()
+    unique = []
+    for ticker in tickers:
+        if ticker and ticker not in seen:
+            seen.add(ticker)
+            unique.append(ticker)
+    return unique
+
+
+def _fetch_one(
+    ticker: str, data_type: str, refresh_mode: Optional[str] = None
+) -> Tuple[Dict, Dict, float, FetchMetrics]:
+    """Pobiera dane jednego tickera (wywoływane w wątku roboczym); pomiary wątku scala run_batch."""
+    metrics = FetchMetrics()
+    start = time.perf_counter()
+    results, missing = api_fetcher.fetch_data(
+        [ticker], data_type=data_type, refresh_mode=refresh_mode, metrics=metrics
+    )
+    return results, missing, time.perf_counter() - start, metrics
+
+
+def score_company(company_data: CompanyData, ticker: str) -> Tuple[Optional[str], Optional[float]]:
+    """
+    Klasyfikuje fazę i przelicza punktację spółki, respektując ręczną fazę, po czym zapisuje wynik.
+    Args:
+        company_data: Obiekt CompanyData.
+        ticker: Symbol giełdowy spółki.
+    Returns:
+        Krotka (faza, punkty) – elementy mogą być None.
+    """
+    company = company_data.get_company(ticker)
+    if not company:
+        raise KeyError(f"Nie znaleziono spółki {ticker}")
+    sector = company.get("sektor")
+    if not sector:
+        logging.warning(f"Brak sektora dla {ticker}, pomijam punktację")
+        company["faza"] = "None"
+        company["punkty"] = "None"
+        company_data.save_company_data(ticker, company)
+        return None, None
+    faza = company.get("faza")
+    if not company.get("is_manual_faza", False) or faza in [None, "", "None"]:
+        faza = classify_phase(sector, company)
+    company["faza"] = faza if faza is not None else "None"
+    score = None
+    if faza is not None:
+        score, _ = calculate_score(sector, faza, company, company_data)
+    company["punkty"] = str(round(float(score), 2)) if score is not None else "None"
+    company_data.save_company_data(ticker, company)
+    return faza, score
+
+
+def run_batch(
+    tickers: List[str],
+    company_data: CompanyData,
+    workers: int = 4,
+    data_type: str = "company",
+    skip_fetch: bool = False,
+    metrics: Optional[FetchMetrics] = None,
+    refresh_mode: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Uruchamia potok pobranie → faza → punktacja → zapis dla listy tickerów.
+
+    Pobieranie odbywa się równolegle (wątki), zapis i punktacja – sekwencyjnie w wątku głównym,
+    dzięki czemu średnie sektorowe liczone są na komplecie świeżych danych.
+    Args:
+        tickers: Lista tickerów.
+        company_data: Obiekt CompanyData (katalog danych).
+        workers: Liczba równoległych wątków pobierania.
+        data_type: Typ danych przekazywany do api_fetcher ('company', 'etf').
+        skip_fetch: Gdy True – tylko przeliczenie fazy i punktacji na zapisanych danych.
+        metrics: Pomiary pobierania (src.api.fetch_metrics) – scalone z pomiarów wątków, z czasem całego
+            etapu pobierania; podsumowanie logowane raz po zakończeniu pobierania.
+        refresh_mode: Tryb odświeżania przekazywany do api_fetcher ('full', 'incremental'; None – REFRESH_MODE).
+    Returns:
+        Lista słowników z wynikiem dla każdego tickera (kolejność jak w `tickers`).
+    """
+    outcomes = {t: {"ticker": t, "status": "ok", "nazwa": None, "sektor": None, "faza": None,
+                    "punkty": None, "missing_keys": [], "error": None, "fetch_seconds": None} for t in tickers}
+
+    to_fetch = []
+    for ticker in tickers:
+        try:
+            if not company_data.get_company(ticker):
+                if skip_fetch:
+                    raise KeyError(f"Spółka {ticker} nie istnieje w katalogu danych")
+                company_data.add_company(ticker)
+            to_fetch.append(ticker)
+        except Exception as e:
+            logging.error(f"Nie można przygotować tickera {ticker}: {str(e)}")
+            outcomes[ticker].update(status="failed", error=str(e))
+
+    if not skip_fetch and to_fetch:
+        fetch_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {executor.submit(_fetch_one, t, data_type, refresh_mode): t for t in to_fetch}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    results, missing, elapsed, fetch_metrics = future.result()
+                    if metrics is not None:
+                        metrics.merge(fetch_metrics)
+                    outcomes[ticker]["fetch_seconds"] = round(elapsed, 3)
+                    missing_keys = missing.get(ticker, [])
+                    outcomes[ticker]["missing_keys"] = missing_keys
+                    if ticker not in results or missing_keys == ["all"]:
+                        raise RuntimeError("Brak danych z API")
+                    company_data.store_fetched_data({ticker: results[ticker]}, data_type)
+                    logging.info(f"Zapisano dane wsadowe dla {ticker} ({elapsed:.2f}s)")
+                except Exception as e:
+                    logging.error(f"Błąd pobierania danych wsadowych dla {ticker}: {str(e)}")
+                    outcomes[ticker].update(status="failed", error=str(e))
+        if metrics is not None:
+            metrics.record_run(len(to_fetch), time.perf_counter() - fetch_start)
+            logging.info(metrics.format_summary())
+
+    for ticker in to_fetch:
+        if outcomes[ticker]["status"] != "ok":
+            continue
+        try:
+            faza, score = score_company(company_data, ticker)
+            company = company_data.get_company(ticker) or {}
+            outcomes[ticker].update(
+                nazwa=company.get("nazwa"),
+                sektor=company.get("sektor"),
+                faza=faza,
+                punkty=round(float(score), 2) if score is not None else None,
+            )
+        except Exception as e:
+            logging.error(f"Błąd punktacji wsadowej dla {ticker}: {str(e)}")
+            outcomes[ticker].update(status="failed", error=str(e))
+
+    return [outcomes[t] for t in tickers]
+
+
+def write_results(path: str, results: List[Dict]) -> None:
+    """Zapisuje wyniki do pliku JSON lub CSV (wg rozszerzenia)."""
+    if path.lower().endswith(".csv"):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            for row in results:
+                writer.writerow({**row, "missing_keys": ";".join(row["missing_keys"])})
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+
+
+def build_report(
+    results: List[Dict],
+    started: datetime,
+    duration: float,
+    args: argparse.Namespace,
+    metrics: Optional[FetchMetrics] = None,
+) -> Dict:
+    """Buduje raport z przebiegu (liczniki, czas, lista błędów, podsumowanie pomiarów pobierania)."""
+    failed = [r for r in results if r["status"] != "ok"]
+    report = {
+        "started": started.isoformat(timespec="seconds"),
+        "duration_seconds": round(duration, 3),
+        "tickers": len(results),
+        "succeeded": len(results) - len(failed),
+        "failed": len(failed),
+        "scored": sum(1 for r in results if r["punkty"] is not None),
+        "workers": args.workers,
+        "data_type": args.data_type,
+        "skip_fetch": args.skip_fetch,
+        "failures": {r["ticker"]: r["error"] for r in failed},
+    }
+    if metrics is not None:
+        report["fetch_metrics"] = metrics.summary()
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli.batch",
+        description="Wsadowe odświeżanie i punktacja spółek (bez GUI).",
+    )
+    parser.add_argument("tickers", nargs="*", help="Tickery do odświeżenia (np. AAPL MSFT)")
+    parser.add_argument("-f", "--file", dest="files", action="append", default=[],
+                        help="Plik z tickerami (można podać wielokrotnie)")
+    parser.add_argument("--all", action="store_true", help="Odśwież wszystkie spółki z katalogu danych")
+    parser.add_argument("-j", "--workers", type=int, default=4, help="Liczba równoległych pobrań (domyślnie 4)")
+    parser.add_argument("-o", "--output", help="Plik wyników (.json lub .csv)")
+    parser.add_argument("-r", "--report", help="Plik raportu z przebiegu (.json)")
+    parser.add_argument("--data-dir", default="data", help="Katalog danych spółek (domyślnie 'data')")
+    parser.add_argument("--data-type", default="company", choices=["company", "etf"], help="Typ danych")
+    parser.add_argument("--skip-fetch", action="store_true", help="Tylko przelicz fazę i punktację")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Odświeżanie przyrostowe: sprawozdania tylko po nowym okresie (REFRESH_MODE=incremental)")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Plik pomiarów pobierania (.json; .jsonl – dopisanie wiersza do śledzenia trendów)")
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    parser.add_argument("--log-profile", choices=["debug", "production"],
+                        help="Profil logowania (production – zapis w wątku tła); domyślnie LOG_PROFILE")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punkt wejścia CLI.
+    Returns:
+        Kod wyjścia: 0 – wszystkie tickery przetworzone, 1 – co najmniej jeden błąd.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    setup_logging(getattr(logging, args.log_level), profile=args.log_profile)
+    enable_from_env()  # PROFILE=cprofile|sampling; wyniki zapisywane przy zakończeniu procesu
+
+    started = datetime.now()
+    start = time.perf_counter()
+    company_data = CompanyData(data_dir=args.data_dir)
+    for path in args.files:
+        if not os.path.exists(path):
+            parser.error(f"Plik z tickerami nie istnieje: {path}")
+    tickers = collect_tickers(args, company_data)
+    if not tickers:
+        parser.error("Nie podano żadnych tickerów (argumenty, --file lub --all)")
+
+    logging.info(f"Start przebiegu wsadowego: {len(tickers)} tickerów, wątki: {args.workers}")
+    metrics = FetchMetrics()
+    results = run_batch(tickers, company_data, workers=args.workers, data_type=args.data_type,
+                        skip_fetch=args.skip_fetch, metrics=metrics,
+                        refresh_mode="incremental" if args.incremental else None)
+    report = build_report(results, started, time.perf_counter() - start, args, metrics)
+
+    if args.output:
+        write_results(args.output, results)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+    if args.metrics:
+        metrics.export_json(args.metrics, append=args.metrics.lower().endswith(".jsonl"))
+    logging.info(
+        f"Koniec przebiegu wsadowego: {report['succeeded']}/{report['tickers']} OK "
+        f"w {report['duration_seconds']}s"
+    )
+    return EXIT_FAILURES if report["failed"] else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\cli\screen.py
+"""
+Screening spółek z linii poleceń (bez GUI) na danych z katalogu spółek.
+
+Przykład:
+    python -m src.cli.screen "sektor = Technology and faza = Wzrost and roe > 15 and punkty > 70" --limit 20
+    python -m src.cli.screen "debt_equity < 1" --sort roe --fields ticker nazwa roe debt_equity -o wynik.csv
+"""
+import argparse
+import csv
+import json
+import logging
+import sys
+import time
+from typing import List, Optional
+
+from src.core.company_data import CompanyData
+from src.core.logging_config import setup_logging
+from src.core.screener import ScreenerError, screen
+
+EXIT_OK = 0
+EXIT_ERROR = 2
+
+DEFAULT_FIELDS = ["ticker", "nazwa", "sektor", "faza", "punkty"]
+
+
+def write_output(path: str, rows: List[dict], fields: List[str]) -> None:
+    """Zapisuje wyniki do pliku .csv lub .json (wybrane pola)."""
+    records = [{field: row.get(field) for field in fields} for row in rows]
+    if path.lower().endswith(".csv"):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(records)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=4, ensure_ascii=False)
+    logging.info(f"Zapisano {len(records)} wyników screeningu do {path}")
+
+
+def format_table(rows: List[dict], fields: List[str]) -> str:
+    """Tabela tekstowa wyników."""
+    cells = [[("" if row.get(field) is None else str(row.get(field))) for field in fields] for row in rows]
+    widths = [max([len(field)] + [len(line[i]) for line in cells]) for i, field in enumerate(fields)]
+    lines = ["  ".join(field.ljust(width) for field, width in zip(fields, widths))]
+    lines.extend("  ".join(value.ljust(width) for value, width in zip(line, widths)) for line in cells)
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Screening spółek (zapytania na wskaźnikach, sektorze i fazie)")
+    parser.add_argument("query", help="Zapytanie, np. \"sektor = Technology and roe > 15 and punkty > 70\"")
+    parser.add_argument("--data-dir", default="data", help="Katalog danych spółek (domyślnie 'data')")
+    parser.add_argument("--sort", default="punkty", help="Pole sortowania (domyślnie punkty, malejąco)")
+    parser.add_argument("--ascending", action="store_true", help="Sortowanie rosnące")
+    parser.add_argument("--limit", type=int, help="Maksymalna liczba wyników")
+    parser.add_argument("--fields", nargs="+", default=DEFAULT_FIELDS, help="Wyświetlane/zapisywane pola")
+    parser.add_argument("-o", "--output", help="Plik wyników (.json lub .csv)")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Punkt wejścia CLI.
+    Returns:
+        Kod wyjścia: 0 – zapytanie wykonane, 2 – błąd zapytania.
+    """
+    args = build_parser().parse_args(argv)
+    setup_logging(getattr(logging, args.log_level))
+    company_data = CompanyData(data_dir=args.data_dir)
+    start = time.perf_counter()
+    try:
+        rows = screen(company_data, args.query, sort_by=args.sort, descending=not args.ascending, limit=args.limit)
+    except ScreenerError as e:
+        print(f"Błąd zapytania: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    elapsed_ms = (time.perf_counter() - start) * 1e3
+    print(format_table(rows, args.fields))
+    print(f"\n{len(rows)} z {len(company_data.companies)} spółek ({elapsed_ms:.1f} ms)")
+    if args.output:
+        write_output(args.output, rows, args.fields)
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
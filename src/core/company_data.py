@@ -1,22 +1,49 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\Analizator\src\core\company_data.py
+import itertools
 import json
 import os
 import logging
 from datetime import datetime
 from src.api.api_fetcher import fetch_data
-from src.core.logging_config import setup_logging
+from src.core.profiling import profiled
+from src.core.score_cache import get_score_cache, input_fingerprint
 from src.core.sector_mapping import normalize_sector
 from typing import Dict, List, Tuple, Optional
 
-setup_logging()
+# Wersje danych są unikalne w całym procesie, więc klucze pamięci punktacji różnych instancji nie kolidują
+_VERSIONS = itertools.count(1)
+
+# pola danych spółki zapisywane w historii (z flagami is_manual_* i indicator_color_*)
+COMPANY_KEYS = [
+    "nazwa", "sektor", "faza", "cena", "pe_ratio", "forward_pe",
+    "peg_ratio", "revenue_growth", "gross_margin", "debt_equity",
+    "current_ratio", "roe", "free_cash_flow_margin", "eps_ttm",
+    "price_to_book_ratio", "price_to_sales_ratio", "operating_margin",
+    "profit_margin", "quick_ratio", "cash_ratio",
+    "cash_flow_to_debt_ratio", "earnings_growth", "analyst_target_price",
+    "analyst_rating", "punkty", "market_cap", "revenue",
+    "ebitda_margin", "roic", "user_growth", "interest_coverage",
+    "net_debt_ebitda", "inventory_turnover", "asset_turnover",
+    "operating_cash_flow", "free_cash_flow", "ffo", "ltv", "rnd_sales",
+    "cac_ltv", "quarterly_revenue", "yearly_revenue"
+]
+
 
 class CompanyData:
-    def __init__(self):
+    def __init__(self, data_dir: str = "data"):
         """
         Inicjalizuje obiekt przechowujący dane spółek.
+        Args:
+            data_dir: Katalog z plikami JSON spółek (domyślnie 'data').
         """
         self.companies = []
-        self.data_dir = "data"
+        self.data_dir = data_dir
+        # wersja danych zbiorczych (średnie sektorowe) i wersje historii tickerów – części klucza pamięci punktacji
+        self.version = next(_VERSIONS)
+        self._saved_fingerprints: Dict[str, Tuple] = {}
+        self._history_versions: Dict[str, int] = {}
+        self._sector_versions: Dict[str, int] = {}
+        self._load_version = self.version
         if not os.path.exists(self.data_dir):
             try:
                 os.makedirs(self.data_dir)
@@ -205,7 +232,7 @@ class CompanyData:
                                             latest[key] = value
                                     company.update(latest)
                                     self.companies.append(company)
-                                    logging.info(f"Wczytano spółkę {ticker} z {file_path}")
+                                    logging.info("Wczytano spółkę %s z %s", ticker, file_path)
                                 else:
                                     logging.warning(f"Nieprawidłowy format pliku JSON dla {ticker}: brak pola 'ticker'")
                             else:
@@ -215,6 +242,30 @@ class CompanyData:
             logging.info(f"Wczytano {len(self.companies)} spółek z folderu data/")
         except Exception as e:
             logging.error(f"Błąd podczas wczytywania wszystkich spółek: {str(e)}")
+        finally:
+            self._saved_fingerprints = {c["ticker"]: self._aggregate_fingerprint(c) for c in self.companies}
+            self._history_versions = {}
+            self._sector_versions = {}
+            self.version = self._load_version = next(_VERSIONS)
+
+    @staticmethod
+    def _aggregate_fingerprint(data: dict) -> Tuple:
+        """Odcisk pól spółki, od których zależą średnie sektorowe i ogólne innych spółek."""
+        return input_fingerprint(data), data.get("sektor"), data.get("faza"), data.get("punkty")
+
+    def sector_version(self, sector: str) -> int:
+        """Wersja danych sektora (zmienia się, gdy zapis zmienia wskaźniki, sektor lub fazę spółki sektora)."""
+        return self._sector_versions.get(sector, self._load_version)
+
+    def _touch_sectors(self, *sectors) -> None:
+        version = next(_VERSIONS)
+        for sector in sectors:
+            if sector:
+                self._sector_versions[sector] = version
+
+    def history_version(self, ticker: str) -> int:
+        """Wersja historii tickera (zmienia się, gdy zapis zmienia dane trendów przychodów)."""
+        return self._history_versions.get(ticker.upper(), 0)
 
     def add_company(self, ticker: str):
         """
@@ -374,6 +425,7 @@ class CompanyData:
             logging.error(f"Błąd podczas pobierania danych dla {ticker}: {str(e)}")
             return None
 
+    @profiled("save_company_data")
     def save_company_data(self, ticker: str, data: dict):
         """
         Zapisuje dane spółki do pliku JSON z walidacją formatu i nadpisywaniem danych dla tego samego dnia.
@@ -460,19 +512,7 @@ class CompanyData:
                 "date": today,
                 "is_in_portfolio": data.get("is_in_portfolio", False)
             }
-            required_keys = [
-                "nazwa", "sektor", "faza", "cena", "pe_ratio", "forward_pe",
-                "peg_ratio", "revenue_growth", "gross_margin", "debt_equity",
-                "current_ratio", "roe", "free_cash_flow_margin", "eps_ttm",
-                "price_to_book_ratio", "price_to_sales_ratio", "operating_margin",
-                "profit_margin", "quick_ratio", "cash_ratio",
-                "cash_flow_to_debt_ratio", "earnings_growth", "analyst_target_price",
-                "analyst_rating", "punkty", "market_cap", "revenue",
-                "ebitda_margin", "roic", "user_growth", "interest_coverage",
-                "net_debt_ebitda", "inventory_turnover", "asset_turnover",
-                "operating_cash_flow", "free_cash_flow", "ffo", "ltv", "rnd_sales",
-                "cac_ltv", "quarterly_revenue", "yearly_revenue"
-            ]
+            required_keys = COMPANY_KEYS
             for key in required_keys:
                 data_copy[key] = data.get(key, None)
                 data_copy[f"is_manual_{key}"] = data.get(f"is_manual_{key}", False)
@@ -489,14 +529,16 @@ class CompanyData:
                 except json.JSONDecodeError as e:
                     logging.error(f"Błąd dekodowania JSON dla {ticker}: {str(e)}")
                     history = []
+            replaced = next((entry for entry in history if entry.get("date") == today), None)
             history = [entry for entry in history if entry.get("date") != today]
             history.append(data_copy)
             history = sorted(history, key=lambda x: x.get("date", ""))
             try:
                 with open(file_path, "w", encoding="utf-8") as f:
                     json.dump(history, f, indent=4)
-                logging.info(f"Zapisano dane dla {ticker} do {file_path}")
-                logging.debug(f"Zapisane dane: {data_copy}")
+                logging.info("Zapisano dane dla %s do %s", ticker, file_path)
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    logging.debug("Zapisane dane: %s", data_copy)
             except PermissionError as e:
                 logging.error(f"Brak uprawnień do zapisu pliku {file_path}: {str(e)}")
                 raise
@@ -509,6 +551,19 @@ class CompanyData:
                 company.update(data_copy)
             else:
                 self.companies.append(data_copy)
+            # Nowe wersje tylko przy zmianie danych wpływających na punktację (zapis samego wyniku ich nie zmienia)
+            if replaced is None or any(
+                replaced.get(key) != data_copy.get(key) for key in ("quarterly_revenue", "yearly_revenue")
+            ):
+                self._history_versions[ticker] = next(_VERSIONS)
+            fingerprint = self._aggregate_fingerprint(data_copy)
+            previous = self._saved_fingerprints.get(ticker)
+            if previous != fingerprint:
+                self._saved_fingerprints[ticker] = fingerprint
+                self.version = next(_VERSIONS)
+                # punkty nie wpływają na progi – wersja sektora tylko przy zmianie wskaźników, sektora lub fazy
+                if previous is None or previous[:3] != fingerprint[:3]:
+                    self._touch_sectors(fingerprint[1], previous[1] if previous else None)
         except Exception as e:
             logging.error(f"Błąd podczas zapisywania danych dla {ticker}: {str(e)}")
             raise
@@ -522,6 +577,12 @@ class CompanyData:
         try:
             ticker = ticker.upper()
             self.companies = [c for c in self.companies if c["ticker"] != ticker]
+            previous = self._saved_fingerprints.pop(ticker, None)
+            self._history_versions.pop(ticker, None)
+            self.version = next(_VERSIONS)
+            if previous:
+                self._touch_sectors(previous[1])
+            get_score_cache().invalidate(ticker)
             file_path = os.path.join(self.data_dir, f"{ticker}.json")
             if os.path.exists(file_path):
                 os.remove(file_path)
@@ -588,53 +649,50 @@ class CompanyData:
             Krotka (wyniki, brakujące tickery).
         """
         try:
-            valid_sectors = {f.replace(".json", "").lower() for f in os.listdir(os.path.join("src", "core", "sectors")) if f.endswith(".json")}
-            required_keys = [
-                "nazwa", "sektor", "faza", "cena", "pe_ratio", "forward_pe",
-                "peg_ratio", "revenue_growth", "gross_margin", "debt_equity",
-                "current_ratio", "roe", "free_cash_flow_margin", "eps_ttm",
-                "price_to_book_ratio", "price_to_sales_ratio", "operating_margin",
-                "profit_margin", "quick_ratio", "cash_ratio",
-                "cash_flow_to_debt_ratio", "earnings_growth", "analyst_target_price",
-                "analyst_rating", "punkty", "market_cap", "revenue",
-                "ebitda_margin", "roic", "user_growth", "interest_coverage",
-                "net_debt_ebitda", "inventory_turnover", "asset_turnover",
-                "operating_cash_flow", "free_cash_flow", "ffo", "ltv", "rnd_sales",
-                "cac_ltv", "quarterly_revenue", "yearly_revenue"
-            ] if data_type != "macro" else ["nazwa", "value"]
             results, missing_tickers = fetch_data(tickers, parent, data_type)
-            for ticker in results:
-                ticker = ticker.upper()
-                existing_company = self.get_company(ticker)
-                updated_data = {
-                    "ticker": ticker,
-                    "date": datetime.now().strftime("%Y-%m-%d"),
-                    "is_in_portfolio": existing_company.get("is_in_portfolio", False) if existing_company else False
-                }
-                # Dynamicznie kopiuj wszystkie klucze z wyników API
-                for key, value in results[ticker].items():
-                    updated_data[key] = value
-                    updated_data[f"is_manual_{key}"] = existing_company.get(f"is_manual_{key}", False) if existing_company else False
-                    updated_data[f"indicator_color_{key}"] = existing_company.get(f"indicator_color_{key}", "black") if existing_company else "black"
-                # Zachowaj ręczne dane z istniejącej spółki
-                if existing_company:
-                    for key in required_keys:
-                        if existing_company.get(f"is_manual_{key}", False):
-                            updated_data[key] = existing_company.get(key)
-                            updated_data[f"is_manual_{key}"] = True
-                            updated_data[f"indicator_color_{key}"] = existing_company.get(f"indicator_color_{key}", "black")
-                # Uzupełnij sektor z historii, jeśli brak danych z API i nie jest ręczny
-                if not updated_data.get("sektor") and not updated_data.get("is_manual_sektor", False):
-                    history = self.load_company_history(ticker)
-                    if history:
-                        last_entry = history[-1]
-                        last_sector = last_entry.get("sektor")
-                        if last_sector and last_sector.lower() in valid_sectors:
-                            updated_data["sektor"] = last_sector
-                            logging.info(f"Uzupełniono sektor dla {ticker} z historii: {last_sector}")
-                self.save_company_data(ticker, updated_data)
+            self.store_fetched_data(results, data_type)
             logging.info(f"Pobrano dane dla {tickers}, brakujące: {missing_tickers.keys()}")
             return results, missing_tickers
         except Exception as e:
             logging.error(f"Błąd podczas pobierania danych z API dla {tickers}: {str(e)}")
-            return {}, {ticker: ["all"] for ticker in tickers}
\ No newline at end of file
+            return {}, {ticker: ["all"] for ticker in tickers}
+
+    def store_fetched_data(self, results: Dict, data_type: str = "company") -> None:
+        """
+        Zapisuje wyniki z api_fetcher.fetch_data, zachowując ręczne dane i sektor z historii.
+        Args:
+            results: Słownik ticker -> dane zwrócone przez api_fetcher.fetch_data.
+            data_type: Typ danych ('company' lub 'macro').
+        """
+        valid_sectors = {f.replace(".json", "").lower() for f in os.listdir(os.path.join("src", "core", "sectors")) if f.endswith(".json")}
+        required_keys = COMPANY_KEYS if data_type != "macro" else ["nazwa", "value"]
+        for ticker in results:
+            ticker = ticker.upper()
+            existing_company = self.get_company(ticker)
+            updated_data = {
+                "ticker": ticker,
+                "date": datetime.now().strftime("%Y-%m-%d"),
+                "is_in_portfolio": existing_company.get("is_in_portfolio", False) if existing_company else False
+            }
+            # Dynamicznie kopiuj wszystkie klucze z wyników API
+            for key, value in results[ticker].items():
+                updated_data[key] = value
+                updated_data[f"is_manual_{key}"] = existing_company.get(f"is_manual_{key}", False) if existing_company else False
+                updated_data[f"indicator_color_{key}"] = existing_company.get(f"indicator_color_{key}", "black") if existing_company else "black"
+            # Zachowaj ręczne dane z istniejącej spółki
+            if existing_company:
+                for key in required_keys:
+                    if existing_company.get(f"is_manual_{key}", False):
+                        updated_data[key] = existing_company.get(key)
+                        updated_data[f"is_manual_{key}"] = True
+                        updated_data[f"indicator_color_{key}"] = existing_company.get(f"indicator_color_{key}", "black")
+            # Uzupełnij sektor z historii, jeśli brak danych z API i nie jest ręczny
+            if not updated_data.get("sektor") and not updated_data.get("is_manual_sektor", False):
+                history = self.load_company_history(ticker)
+                if history:
+                    last_entry = history[-1]
+                    last_sector = last_entry.get("sektor")
+                    if last_sector and last_sector.lower() in valid_sectors:
+                        updated_data["sektor"] = last_sector
+                        logging.info(f"Uzupełniono sektor dla {ticker} z historii: {last_sector}")
+            self.save_company_data(ticker, updated_data)
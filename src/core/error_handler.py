@@ -1,9 +1,6 @@
 import logging
 from typing import Any, Optional
-from src.core.logging_config import setup_logging
 
-# Inicjalizacja logowania
-setup_logging()
 
 class ErrorHandler:
     """
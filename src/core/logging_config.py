@@ -1,11 +1,15 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\core\logging_config.py
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
 _IS_CONFIGURED = False
+_LISTENER: Optional[QueueListener] = None
 
 def _resolve_paths():
     """
@@ -29,13 +33,36 @@ def _resolve_paths():
     return cwd / "error.log", cwd / "errors_only.log"
 
 
-def setup_logging(level: int = logging.DEBUG):
-    """Konfiguracja logowania (wywołuj wielokrotnie bez efektu ubocznego)."""
-    global _IS_CONFIGURED
+def _parse_level(level) -> int:
+    """'DEBUG'/'INFO'/... lub liczba → poziom logging."""
+    if isinstance(level, str):
+        value = logging.getLevelName(level.upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Nieznany poziom logowania: {level}")
+        return value
+    return int(level)
+
+
+def setup_logging(level=None, profile: Optional[str] = None):
+    """
+    Konfiguracja logowania (wywołuj wielokrotnie bez efektu ubocznego; zmiana poziomu – set_log_level).
+    Args:
+        level: Poziom loggera głównego (liczba lub nazwa, np. 'INFO'); None – DEBUG w profilu 'debug',
+            INFO w profilu 'production' (rekordy DEBUG odrzucane przed formatowaniem w wątku wywołującym).
+        profile: 'debug' (domyślnie) – handlery synchroniczne, konsola od DEBUG;
+            'production' – zapis do plików i konsoli w wątku tła (QueueHandler/QueueListener),
+            konsola od WARNING, więc logowanie nie blokuje punktacji ani zapisu.
+            Gdy None – zmienna środowiskowa LOG_PROFILE.
+    """
+    global _IS_CONFIGURED, _LISTENER
     if _IS_CONFIGURED:
         logging.getLogger(__name__).debug("Logger już skonfigurowany, pomijam konfigurację")
         return
 
+    profile = (profile or os.getenv("LOG_PROFILE") or "debug").lower()
+    if level is None:
+        level = logging.INFO if profile == "production" else logging.DEBUG
+    level = _parse_level(level)
     logger = logging.getLogger()
     logger.setLevel(level)
 
@@ -54,32 +81,53 @@ def setup_logging(level: int = logging.DEBUG):
 
     # Konsola
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
+    console_handler.setLevel(logging.WARNING if profile == "production" else logging.DEBUG)
 
     formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-    for h in (file_handler_all, file_handler_errors, console_handler):
+    handlers = (file_handler_all, file_handler_errors, console_handler)
+    for h in handlers:
         h.setFormatter(formatter)
-        logger.addHandler(h)
-
-    # Weryfikacja (tworzy pliki natychmiast)
-    try:
-        with open(error_log, "a", encoding="utf-8") as f:
-            f.write("")
-        print(f"Zweryfikowano uprawnienia do zapisu dla {error_log.name}")
-    except Exception:
-        pass
-    try:
-        with open(errors_only_log, "a", encoding="utf-8") as f:
-            f.write("")
-        print(f"Zweryfikowano uprawnienia do zapisu dla {errors_only_log.name}")
-    except Exception:
-        pass
-
-    # Krótkie wpisy testowe – pozwalają testom sprawdzić obecność rekordów
+    if profile == "production":
+        # Wątek wywołujący tylko wkłada rekord do kolejki; formatowanie i zapis odbywa się w tle
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+        _LISTENER = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _LISTENER.start()
+        atexit.register(shutdown_logging)
+    else:
+        for h in handlers:
+            logger.addHandler(h)
+
+    # Utworzenie plików natychmiast (bez wypisywania na stdout – moduły importowane są także w trybie wsadowym)
+    for path in (error_log, errors_only_log):
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("")
+        except Exception:
+            pass
+
     logging.getLogger(__name__).debug(
-        "Test debug: Konfiguracja handlerów zakończona: %s (DEBUG, INFO), %s (ERROR, CRITICAL), konsola (DEBUG)",
-        error_log.name, errors_only_log.name
+        "Konfiguracja handlerów zakończona (profil %s): %s (DEBUG, INFO), %s (ERROR, CRITICAL), konsola (%s)",
+        profile, error_log.name, errors_only_log.name, logging.getLevelName(console_handler.level)
     )
-    logging.getLogger(__name__).error("Test error: Weryfikacja zapisu do errors_only.log")
 
     _IS_CONFIGURED = True
+
+
+def set_log_level(level) -> None:
+    """
+    Zmienia poziom logowania w działającej aplikacji (logger główny; handlery zachowują własne progi).
+    Args:
+        level: Poziom (liczba lub nazwa, np. 'DEBUG').
+    """
+    level = _parse_level(level)
+    logging.getLogger().setLevel(level)
+    logging.getLogger(__name__).info("Zmieniono poziom logowania na %s", logging.getLevelName(level))
+
+
+def shutdown_logging() -> None:
+    """Zatrzymuje wątek logowania profilu 'production', zapisując rekordy pozostałe w kolejce."""
+    global _LISTENER
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        _LISTENER = None
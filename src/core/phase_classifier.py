@@ -1,11 +1,8 @@
 import logging
 import os
 from src.core.utils import load_sector_config
-from src.core.logging_config import setup_logging
 from typing import Optional
 
-# Inicjalizacja logowania
-setup_logging()
 
 def classify_phase(sector: str, data: dict) -> Optional[str]:
     """
@@ -76,7 +73,7 @@ def classify_phase(sector: str, data: dict) -> Optional[str]:
         if phase_scores[best_phase] == 0:
             logging.warning(f"Żadna faza nie zdobyła punktów dla sektora {sector}, zwracam None")
             return None
-        logging.info(f"Spółka sklasyfikowana w fazie {best_phase} dla sektora {sector} z punktami {phase_scores[best_phase]}")
+        logging.info("Spółka sklasyfikowana w fazie %s dla sektora %s z punktami %s", best_phase, sector, phase_scores[best_phase])
         return best_phase
     except Exception as e:
         logging.error(f"Błąd klasyfikacji fazy dla sektora {sector}: {str(e)}")
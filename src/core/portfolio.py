@@ -0,0 +1,203 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\core\portfolio.py
+"""
+Analityka portfela – spółki oznaczone `is_in_portfolio`.
+
+Metryki: ważona punktacja, ekspozycja sektorowa, agregaty wycen (średnie harmoniczne ważone P/E, P/B,
+P/S itd., łączna kapitalizacja) i podsumowanie trendów przychodów (ważona dynamika r/r i k/k, liczba spółek
+z rosnącymi i spadającymi przychodami). Wagi równe lub wg kapitalizacji.
+
+Każda pozycja wnosi do sum portfela swój wkład; `update_holding` odejmuje poprzedni wkład spółki
+i dodaje nowy, a `sync` porównuje odciski danych pozycji z CompanyData i przelicza tylko zmienione,
+więc odświeżenie po zmianie ceny jednej spółki nie przelicza całego portfela.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.core.score_cache import input_fingerprint
+from src.core.sector_stats import to_float
+
+WEIGHTINGS = ("equal", "market_cap")
+VALUATION_FIELDS = ("pe_ratio", "forward_pe", "peg_ratio", "price_to_book_ratio", "price_to_sales_ratio")
+
+
+def revenue_growth(series) -> Optional[float]:
+    """Dynamika (%) ostatniego przychodu względem poprzedniego w szeregu [{'date', 'revenue'}, ...]."""
+    if not isinstance(series, list):
+        return None
+    values = sorted(
+        (item.get("date", ""), to_float(item.get("revenue")))
+        for item in series
+        if isinstance(item, dict)
+    )
+    values = [value for _, value in values if not np.isnan(value)]
+    if len(values) < 2 or values[-2] == 0:
+        return None
+    return (values[-1] - values[-2]) / abs(values[-2]) * 100
+
+
+def holding_contribution(company: dict, weighting: str = "equal") -> Dict[str, float]:
+    """
+    Wkład spółki do sum portfela (tylko sumy – portfel składa je dodawaniem i odejmowaniem).
+    Args:
+        company: Dane spółki.
+        weighting: 'equal' (waga 1) lub 'market_cap' (waga = kapitalizacja; brak kapitalizacji – 0).
+    """
+    market_cap = to_float(company.get("market_cap"))
+    if weighting == "market_cap":
+        weight = market_cap if not np.isnan(market_cap) and market_cap > 0 else 0.0
+    else:
+        weight = 1.0
+    sums = {"weight": weight}
+    if not np.isnan(market_cap):
+        sums["market_cap"] = market_cap
+    score = to_float(company.get("punkty"))
+    if not np.isnan(score):
+        sums["score_w"] = weight * score
+        sums["score_weight"] = weight
+    sums[f"sector:{company.get('sektor') or 'Brak'}"] = weight
+    for field in VALUATION_FIELDS:
+        value = to_float(company.get(field))
+        if not np.isnan(value) and value > 0:  # średnia harmoniczna: Σw / Σ(w / wartość)
+            sums[f"{field}:w"] = weight
+            sums[f"{field}:inv"] = weight / value
+    for name, series in (("yearly", company.get("yearly_revenue")), ("quarterly", company.get("quarterly_revenue"))):
+        growth = revenue_growth(series)
+        if growth is not None:
+            sums[f"{name}:w"] = weight
+            sums[f"{name}:growth_w"] = weight * growth
+            sums[f"{name}:up" if growth > 0 else f"{name}:down"] = 1.0
+    return sums
+
+
+class PortfolioAnalytics:
+    """Metryki portfela aktualizowane przyrostowo (bezpieczne wątkowo)."""
+
+    def __init__(self, weighting: str = "equal"):
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Nieznany sposób ważenia portfela: {weighting}")
+        self.weighting = weighting
+        self._lock = threading.Lock()
+        self._holdings: Dict[str, Dict[str, float]] = {}
+        self._fingerprints: Dict[str, tuple] = {}
+        self._totals: Dict[str, float] = {}
+        self.updates = 0
+
+    def _apply(self, sums: Dict[str, float], sign: float) -> None:
+        for key, value in sums.items():
+            total = self._totals.get(key, 0.0) + sign * value
+            if abs(total) < 1e-9:
+                self._totals.pop(key, None)
+            else:
+                self._totals[key] = total
+
+    def update_holding(self, company: dict) -> None:
+        """Aktualizuje wkład spółki (usuwa go, jeśli spółka nie jest już w portfelu)."""
+        ticker = company["ticker"]
+        if not company.get("is_in_portfolio", False):
+            self.remove_holding(ticker)
+            return
+        sums = holding_contribution(company, self.weighting)
+        with self._lock:
+            previous = self._holdings.get(ticker)
+            if previous:
+                self._apply(previous, -1.0)
+            self._apply(sums, 1.0)
+            self._holdings[ticker] = sums
+            self._fingerprints[ticker] = (input_fingerprint(company), company.get("punkty"))
+            self.updates += 1
+
+    def remove_holding(self, ticker: str) -> None:
+        """Usuwa spółkę z portfela."""
+        with self._lock:
+            previous = self._holdings.pop(ticker, None)
+            self._fingerprints.pop(ticker, None)
+            if previous:
+                self._apply(previous, -1.0)
+                self.updates += 1
+            if not self._holdings:
+                self._totals.clear()  # bez reszt zaokrągleń po usunięciu ostatniej pozycji
+
+    def sync(self, companies: Iterable[dict]) -> int:
+        """
+        Uzgadnia portfel z listą spółek (np. CompanyData.companies) – przelicza tylko pozycje nowe, usunięte
+        i te, których dane się zmieniły.
+        Returns:
+            Liczba zaktualizowanych pozycji.
+        """
+        holdings = {c["ticker"]: c for c in companies if c.get("is_in_portfolio", False)}
+        changed = 0
+        for ticker in [t for t in self._holdings if t not in holdings]:
+            self.remove_holding(ticker)
+            changed += 1
+        for ticker, company in holdings.items():
+            if self._fingerprints.get(ticker) != (input_fingerprint(company), company.get("punkty")):
+                self.update_holding(company)
+                changed += 1
+        if changed:
+            logging.debug("Zaktualizowano %d pozycji portfela", changed)
+        return changed
+
+    def rebuild(self, companies: Iterable[dict]) -> None:
+        """Przelicza portfel od zera (np. po zmianie sposobu ważenia)."""
+        with self._lock:
+            self._holdings.clear()
+            self._fingerprints.clear()
+            self._totals.clear()
+        self.sync(companies)
+
+    def tickers(self) -> List[str]:
+        """Tickery pozycji portfela."""
+        with self._lock:
+            return sorted(self._holdings)
+
+    def summary(self) -> Dict:
+        """Metryki portfela wyliczone z sum pozycji."""
+        with self._lock:
+            totals = dict(self._totals)
+            count = len(self._holdings)
+        weight = totals.get("weight", 0.0)
+
+        def ratio(numerator: str, denominator: str) -> Optional[float]:
+            value = totals.get(denominator, 0.0)
+            return round(totals.get(numerator, 0.0) / value, 2) if value > 0 else None
+
+        exposure = {
+            key.split(":", 1)[1]: round(value / weight * 100, 2)
+            for key, value in sorted(totals.items(), key=lambda item: -item[1])
+            if key.startswith("sector:") and weight > 0
+        }
+        valuation = {field: ratio(f"{field}:w", f"{field}:inv") for field in VALUATION_FIELDS}
+        valuation["market_cap"] = totals.get("market_cap")
+        trends = {
+            name: {
+                "growth": ratio(f"{name}:growth_w", f"{name}:w"),
+                "growing": int(round(totals.get(f"{name}:up", 0))),
+                "declining": int(round(totals.get(f"{name}:down", 0))),
+            }
+            for name in ("yearly", "quarterly")
+        }
+        return {
+            "holdings": count,
+            "weighting": self.weighting,
+            "weighted_score": ratio("score_w", "score_weight"),
+            "sector_exposure": exposure,
+            "valuation": valuation,
+            "revenue_trends": trends,
+        }
+
+    def format_summary(self) -> str:
+        """Jednowierszowe podsumowanie do wyświetlenia w GUI."""
+        summary = self.summary()
+        if not summary["holdings"]:
+            return "Portfel: brak spółek"
+        sectors = ", ".join(f"{sector} {share:.0f}%" for sector, share in list(summary["sector_exposure"].items())[:3])
+        pe = summary["valuation"]["pe_ratio"]
+        growth = summary["revenue_trends"]["yearly"]["growth"]
+        return (
+            f"Portfel: {summary['holdings']} spółek | punkty: {summary['weighted_score'] if summary['weighted_score'] is not None else '-'}"
+            f" | P/E: {pe if pe is not None else '-'} | przychody r/r: {f'{growth:+.1f}%' if growth is not None else '-'}"
+            f" | {sectors}"
+        )
@@ -0,0 +1,279 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\core\profiling.py
+"""
+Profilowanie wybranych operacji aplikacji (update_table, fetch_data, calculate_score, save_company_data).
+
+Funkcje oznaczone dekoratorem `profiled` działają bez narzutu (poza jednym sprawdzeniem flagi), dopóki
+profilowanie jest wyłączone. Po włączeniu (zakładka Ustawienia lub zmienna środowiskowa PROFILE)
+każde wywołanie jest mierzone, a w trybie:
+  - 'cprofile' – najbardziej zewnętrzne wywołanie w wątku jest profilowane przez cProfile,
+  - 'sampling' – wątek tła co PROFILE_INTERVAL sekund próbkuje stosy wszystkich wątków (mały narzut).
+Po zakończeniu sesji do katalogu PROFILE_DIR (domyślnie 'profiles') zapisywany jest zrzut
+(<sesja>.prof dla pstats / snakeviz) i podsumowanie <sesja>.txt: czasy operacji i top-N funkcji.
+
+Przykład (tryb wsadowy):
+    PROFILE=cprofile python -m src.cli.batch AAPL MSFT
+"""
+import atexit
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROFILE_ENV = "PROFILE"
+MODES = ("cprofile", "sampling")
+DEFAULT_DIR = "profiles"
+DEFAULT_TOP_N = 25
+DEFAULT_INTERVAL = 0.005
+
+
+class _Sampler:
+    """Próbkowanie stosów wszystkich wątków w wątku tła."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self.own: Dict[Tuple[str, int, str], int] = {}
+        self.cumulative: Dict[Tuple[str, int, str], int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.samples += 1
+                seen = set()
+                leaf = True
+                while frame is not None:
+                    code = frame.f_code
+                    key = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if leaf:
+                        self.own[key] = self.own.get(key, 0) + 1
+                        leaf = False
+                    if key not in seen:
+                        seen.add(key)
+                        self.cumulative[key] = self.cumulative.get(key, 0) + 1
+                    frame = frame.f_back
+
+
+class ProfilingSession:
+    """Sesja profilowania: czasy operacji, dane cProfile lub próbki stosów, zapis wyników."""
+
+    def __init__(
+        self,
+        mode: str = "cprofile",
+        output_dir: str = DEFAULT_DIR,
+        top_n: int = DEFAULT_TOP_N,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        """
+        Args:
+            mode: 'cprofile' lub 'sampling'.
+            output_dir: Katalog zrzutów i podsumowań.
+            top_n: Liczba funkcji w podsumowaniu.
+            interval: Odstęp próbkowania w sekundach (tryb 'sampling').
+        """
+        if mode not in MODES:
+            raise ValueError(f"Nieznany tryb profilowania: {mode}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.started = datetime.now()
+        self.name = f"profile_{self.started.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self.timings: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = None
+        self._sampler: Optional[_Sampler] = None
+        if mode == "sampling":
+            self._sampler = _Sampler(interval)
+            self._sampler.start()
+
+    def run(self, name: str, func: Callable, *args, **kwargs):
+        """Wywołuje `func`, mierząc czas; w trybie cProfile profiluje najbardziej zewnętrzne wywołanie w wątku."""
+        depth = getattr(self._local, "depth", 0)
+        profiler = None
+        if self.mode == "cprofile" and depth == 0:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # inny wątek już profiluje (jeden profiler na proces od Pythona 3.12)
+                profiler = None
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.depth = depth
+            if profiler is not None:
+                profiler.disable()
+                self._add_stats(profiler)
+            with self._lock:
+                self.timings.setdefault(name, []).append(elapsed)
+
+    def _add_stats(self, profiler) -> None:
+        import pstats
+
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+
+    def timing_rows(self) -> List[Tuple[str, int, float, float, float]]:
+        """(operacja, wywołania, suma s, średnia ms, maks. ms) – od największej sumy."""
+        with self._lock:
+            rows = [
+                (name, len(values), sum(values), sum(values) / len(values) * 1e3, max(values) * 1e3)
+                for name, values in self.timings.items()
+            ]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def hotspot_rows(self) -> List[Tuple[str, int, float, float]]:
+        """Top-N funkcji: (funkcja, wywołania/próbki własne, czas własny s / udział %, skumulowany s / udział %)."""
+        if self._sampler is not None:
+            total = max(self._sampler.samples, 1)
+            ranked = sorted(self._sampler.cumulative.items(), key=lambda item: item[1], reverse=True)[: self.top_n]
+            return [
+                (
+                    f"{os.path.basename(key[0])}:{key[1]}({key[2]})",
+                    self._sampler.own.get(key, 0),
+                    round(self._sampler.own.get(key, 0) / total * 100, 2),
+                    round(count / total * 100, 2),
+                )
+                for key, count in ranked
+            ]
+        with self._lock:
+            if self._stats is None:
+                return []
+            stats = self._stats.stats
+            ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[: self.top_n]
+        return [
+            (f"{os.path.basename(key[0])}:{key[1]}({key[2]})", values[1], values[2], values[3])
+            for key, values in ranked
+        ]
+
+    def summary_text(self) -> str:
+        """Tabela czasów operacji i top-N funkcji."""
+        lines = [f"Sesja {self.name} (tryb {self.mode}, od {self.started.isoformat(timespec='seconds')})", ""]
+        lines.append(f"{'operacja':28} {'wywołania':>10} {'suma [s]':>10} {'śr. [ms]':>10} {'maks. [ms]':>10}")
+        for name, calls, total, avg_ms, max_ms in self.timing_rows():
+            lines.append(f"{name:28} {calls:>10} {total:>10.3f} {avg_ms:>10.2f} {max_ms:>10.2f}")
+        lines.append("")
+        if self._sampler is not None:
+            lines.append(f"Top {self.top_n} funkcji ({self._sampler.samples} próbek)")
+            lines.append(f"{'próbki własne':>14} {'własne %':>9} {'skumul. %':>9}  funkcja")
+        else:
+            lines.append(f"Top {self.top_n} funkcji wg czasu skumulowanego")
+            lines.append(f"{'wywołania':>14} {'własny [s]':>9} {'skumul. [s]':>9}  funkcja")
+        for function, calls, own, cumulative in self.hotspot_rows():
+            lines.append(f"{calls:>14} {own:>9.3f} {cumulative:>9.3f}  {function}")
+        return "\n".join(lines)
+
+    def stop(self) -> Optional[str]:
+        """
+        Kończy sesję i zapisuje zrzut (.prof w trybie cProfile) oraz podsumowanie (.txt).
+        Returns:
+            Ścieżka podsumowania lub None w razie błędu zapisu.
+        """
+        if self._sampler is not None:
+            self._sampler.stop()
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            base = os.path.join(self.output_dir, self.name)
+            with self._lock:
+                if self._stats is not None:
+                    self._stats.dump_stats(f"{base}.prof")
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                f.write(self.summary_text() + "\n")
+            logging.info(f"Zapisano wyniki profilowania: {base}.txt")
+            return f"{base}.txt"
+        except Exception as e:
+            logging.error(f"Błąd zapisu wyników profilowania do {self.output_dir}: {str(e)}")
+            return None
+
+
+_SESSION: Optional[ProfilingSession] = None
+_SESSION_LOCK = threading.Lock()
+_ATEXIT_REGISTERED = False
+
+
+def is_enabled() -> bool:
+    """Czy trwa sesja profilowania."""
+    return _SESSION is not None
+
+
+def enable(
+    mode: str = "cprofile",
+    output_dir: Optional[str] = None,
+    top_n: int = DEFAULT_TOP_N,
+    interval: float = DEFAULT_INTERVAL,
+) -> ProfilingSession:
+    """Rozpoczyna sesję profilowania (jeśli już trwa – zwraca bieżącą)."""
+    global _SESSION, _ATEXIT_REGISTERED
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = ProfilingSession(mode, output_dir or os.getenv("PROFILE_DIR", DEFAULT_DIR), top_n, interval)
+            logging.info(f"Włączono profilowanie (tryb {mode})")
+            if not _ATEXIT_REGISTERED:
+                atexit.register(disable)
+                _ATEXIT_REGISTERED = True
+        return _SESSION
+
+
+def disable() -> Optional[str]:
+    """Kończy sesję profilowania i zapisuje wyniki; zwraca ścieżkę podsumowania (None, gdy sesji nie było)."""
+    global _SESSION
+    with _SESSION_LOCK:
+        session, _SESSION = _SESSION, None
+    return session.stop() if session is not None else None
+
+
+def current_session() -> Optional[ProfilingSession]:
+    """Bieżąca sesja profilowania (None, gdy wyłączone)."""
+    return _SESSION
+
+
+def enable_from_env() -> Optional[ProfilingSession]:
+    """Włącza profilowanie, gdy ustawiono PROFILE ('1'/'cprofile' lub 'sampling') – dla uruchomień bez GUI."""
+    value = os.getenv(PROFILE_ENV, "").strip().lower()
+    if value in ("", "0", "false", "no"):
+        return None
+    mode = value if value in MODES else "cprofile"
+    return enable(
+        mode,
+        top_n=int(os.getenv("PROFILE_TOP_N", DEFAULT_TOP_N)),
+        interval=float(os.getenv("PROFILE_INTERVAL", DEFAULT_INTERVAL)),
+    )
+
+
+def profiled(name: str) -> Callable[[Callable], Callable]:
+    """Dekorator: wywołania funkcji są mierzone/profilowane w trakcie sesji profilowania."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            session = _SESSION
+            if session is None:
+                return func(*args, **kwargs)
+            return session.run(name, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
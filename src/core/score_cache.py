@@ -0,0 +1,126 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\core\score_cache.py
+"""
+Pamięć wyników calculate_score.
+
+Klucz wyniku to: ticker, sektor, faza, odcisk wartości wejściowych spółki (wskaźniki, przychody),
+wersja konfiguracji sektora (czas modyfikacji i rozmiar pliku), wersja danych zbiorczych CompanyData
+(średnie sektorowe i ogólne zależą od wszystkich spółek) oraz wersja historii tickera (trendy).
+Zmiana którejkolwiek części daje nowy klucz, więc niezmienione spółki nie są ponownie punktowane,
+a zmienione – zawsze. Rozmiar jest ograniczony (LRU); `invalidate` usuwa wpisy jawnie.
+
+Osobna pamięć progów przechowuje średnie sektorowe i dynamiczne progi dla pary (sektor, faza) – liczone
+raz na wersję danych sektora i konfiguracji, wspólne dla wszystkich punktowanych spółek tej grupy.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 4096
+
+# pola, które nie wpływają na punktację spółki (wynik, flagi edycji, kolory, data zapisu)
+IGNORED_KEYS = {"punkty", "faza", "date", "is_in_portfolio", "momentum"}
+IGNORED_PREFIXES = ("is_manual_", "indicator_color_")
+
+
+def input_fingerprint(data: Dict) -> str:
+    """Odcisk wartości spółki używanych w punktacji (niezależny od kolejności kluczy)."""
+    items = sorted(
+        (key, value)
+        for key, value in data.items()
+        if key not in IGNORED_KEYS and not key.startswith(IGNORED_PREFIXES)
+    )
+    return hashlib.blake2b(repr(items).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def config_version(sector: str) -> Optional[Tuple[int, int]]:
+    """Wersja pliku konfiguracji sektora (czas modyfikacji, rozmiar); None – brak pliku."""
+    try:
+        stat = os.stat(os.path.join("src", "core", "sectors", f"{sector.lower()}.json"))
+        return stat.st_mtime_ns, stat.st_size
+    except (OSError, AttributeError):
+        return None
+
+
+def score_key(sector: str, phase: str, data: Dict, company_data=None) -> Optional[Tuple]:
+    """
+    Klucz pamięci dla wywołania calculate_score.
+    Returns:
+        Krotka klucza lub None, gdy wyniku nie można bezpiecznie zapamiętać (brak obiektu danych z wersją –
+        bez niego punktacja nie liczy średnich ani trendów i jest tania).
+    """
+    aggregates = getattr(company_data, "version", None)
+    if not isinstance(aggregates, int):
+        return None
+    ticker = str(data.get("ticker", "")).upper()
+    history = company_data.history_version(ticker)
+    return ticker, sector, phase, input_fingerprint(data), config_version(sector), aggregates, history
+
+
+def threshold_key(sector: str, phase: str, company_data) -> Optional[Tuple]:
+    """Klucz pamięci progów (None – obiekt danych bez wersji sektorów)."""
+    version_of = getattr(company_data, "sector_version", None)
+    version = version_of(sector) if callable(version_of) else None
+    if not isinstance(version, int):
+        return None
+    return str(sector).upper(), phase, config_version(sector), version
+
+
+class ScoreCache:
+    """Ograniczona pamięć LRU wyników punktacji (bezpieczna wątkowo)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Zapamiętany wynik (None – brak) – trafienie przesuwa wpis na koniec kolejki LRU."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Zapamiętuje wynik, usuwając najdawniej używane wpisy ponad limit."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, ticker: Optional[str] = None) -> None:
+        """Usuwa wyniki tickera lub sektora (pierwsza część klucza; None – wszystkie)."""
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+                return
+            ticker = ticker.upper()
+            for key in [k for k in self._entries if k[0] == ticker]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Liczniki trafień, chybień i usunięć oraz bieżący rozmiar."""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+
+_CACHE = ScoreCache(int(os.getenv("SCORE_CACHE_SIZE", DEFAULT_MAX_ENTRIES)))
+_THRESHOLD_CACHE = ScoreCache(256)
+
+
+def get_score_cache() -> ScoreCache:
+    """Zwraca procesową pamięć wyników punktacji."""
+    return _CACHE
+
+
+def get_threshold_cache() -> ScoreCache:
+    """Zwraca procesową pamięć dynamicznych progów (sektor, faza)."""
+    return _THRESHOLD_CACHE
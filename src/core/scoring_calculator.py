@@ -1,12 +1,16 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\Analizator\src\core\scoring_calculator.py
+import copy
 import logging
 from typing import Tuple, Dict, Union, Optional
 from src.core.utils import load_sector_config
-from src.core.logging_config import setup_logging
 from src.core.company_data import CompanyData
+from src.core.profiling import profiled
+from src.core.sector_stats import get_sector_stats
+from src.core.score_cache import get_score_cache, get_threshold_cache, score_key, threshold_key
+
+# Maksymalna punktacja bazowa w trybie percentylowym (jak w progach: 91 pkt + bonusy i trendy)
+PERCENTILE_MAX_POINTS = 91.0
 
-# Inicjalizacja logowania
-setup_logging()
 
 def calculate_sector_phase_average(sector: str, phase: str, company_data: CompanyData) -> float:
     """
@@ -29,7 +33,7 @@ def calculate_sector_phase_average(sector: str, phase: str, company_data: Compan
             logging.warning(f"Niewystarczająca liczba spółek ({len(scores)}) dla sektora {sector}, faza {phase}. Zwracam 0.0")
             return 0.0
         avg = sum(scores) / len(scores)
-        logging.info(f"Średnia punktacja dla sektora {sector}, faza {phase}: {avg:.2f}")
+        logging.info("Średnia punktacja dla sektora %s, faza %s: %.2f", sector, phase, avg)
         return avg
     except Exception as e:
         logging.error(f"Błąd obliczania średniej dla sektora {sector}, faza {phase}: {str(e)}")
@@ -55,7 +59,7 @@ def calculate_sector_average(sector: str, company_data: CompanyData) -> float:
             logging.warning(f"Niewystarczająca liczba spółek ({len(scores)}) dla sektora {sector}. Zwracam 0.0")
             return 0.0
         avg = sum(scores) / len(scores)
-        logging.info(f"Średnia punktacja dla sektora {sector}: {avg:.2f}")
+        logging.info("Średnia punktacja dla sektora %s: %.2f", sector, avg)
         return avg
     except Exception as e:
         logging.error(f"Błąd obliczania średniej dla sektora {sector}: {str(e)}")
@@ -76,7 +80,7 @@ def calculate_overall_average(company_data: CompanyData) -> float:
             if score not in [None, "", "-", "NA", "N/A", "None", "nan"]:
                 scores.append(float(score))
         avg = sum(scores) / len(scores) if scores else 0.0
-        logging.info(f"Ogólna średnia punktacja: {avg:.2f}")
+        logging.info("Ogólna średnia punktacja: %.2f", avg)
         return avg
     except Exception as e:
         logging.error(f"Błąd obliczania ogólnej średniej: {str(e)}")
@@ -85,7 +89,7 @@ def calculate_overall_average(company_data: CompanyData) -> float:
 def calculate_sector_averages(sector: str, phase: str, company_data: CompanyData, indicators: list) -> Dict[str, float]:
     """
     Oblicza średnie sektorowe dla podanych wskaźników w danej fazie i sektorze, wymagając minimum 3 danych.
-    Ujemne wartości są traktowane jako 0 w obliczeniach średniej.
+    Ujemne wartości są traktowane jako 0 w obliczeniach średniej (statystyki z SectorStatsEngine).
     Args:
         sector: Nazwa sektora.
         phase: Faza rozwoju.
@@ -95,38 +99,86 @@ def calculate_sector_averages(sector: str, phase: str, company_data: CompanyData
         Słownik z średnimi sektorowymi dla każdego wskaźnika.
     """
     try:
-        averages = {}
         config = load_sector_config(sector)
         if not config or phase not in config["indicators"]:
             logging.warning(f"Brak konfiguracji dla sektora {sector} lub fazy {phase}")
             return {indicator: None for indicator in indicators}
-        main_indicators = config["indicators"][phase]["main"]
-        for indicator in indicators:
-            if indicator not in main_indicators:
-                averages[indicator] = None
-                continue
-            values = []
-            for company in company_data.companies:
-                if company.get("sektor") == sector and company.get("faza") == phase:
-                    value = company.get(indicator)
-                    if value not in [None, "", "-", "NA", "N/A", "None", "nan"]:
-                        try:
-                            float_value = float(value)
-                            values.append(max(float_value, 0))  # Zamiana ujemnych na 0
-                        except (ValueError, TypeError):
-                            continue
-            if len(values) >= 3:
-                avg = sum(values) / len(values)
-                averages[indicator] = round(avg, 2)
-                logging.info(f"Średnia sektorowa dla {indicator} w sektorze {sector}, faza {phase}: {avg:.2f}")
-            else:
-                averages[indicator] = None
-                logging.warning(f"Niewystarczająca liczba danych ({len(values)}) dla {indicator} w sektorze {sector}, faza {phase}")
+        main_indicators = [indicator for indicator in indicators if indicator in config["indicators"][phase]["main"]]
+        averages = {indicator: None for indicator in indicators}
+        means = get_sector_stats().baselines(sector, phase, company_data, main_indicators, "mean")
+        averages.update({indicator: round(avg, 2) for indicator, avg in means.items() if avg is not None})
         return averages
     except Exception as e:
         logging.error(f"Błąd obliczania średnich sektorowych dla sektora {sector}, faza {phase}: {str(e)}")
         return {indicator: None for indicator in indicators}
 
+def calculate_dynamic_thresholds(sector: str, phase: str, config: dict, company_data: CompanyData) -> Tuple[Dict[str, Optional[float]], Dict[str, list]]:
+    """
+    Oblicza wartości bazowe sektora (średnia, mediana, percentyl lub średnia winsoryzowana – klucz
+    "baseline_statistic" konfiguracji) i dynamiczne progi (progi statyczne przesunięte o różnicę wartości
+    bazowej i progu środkowego).
+    Args:
+        sector: Nazwa sektora.
+        phase: Faza rozwoju.
+        config: Konfiguracja sektora.
+        company_data: Obiekt CompanyData.
+    Returns:
+        Krotka (wartości bazowe wskaźników głównych i zastępczych, progi dla każdego wskaźnika).
+    """
+    phase_config = config["indicators"][phase]
+    thresholds = config.get("scoring_thresholds", {}).get(phase, {})
+    all_indicators = phase_config["main"] + [fb["indicator"] for ind in phase_config["fallback"] for fb in phase_config["fallback"][ind]]
+    # Wartości bazowe tylko dla wskaźników głównych; statystyka wg konfiguracji (domyślnie średnia)
+    statistic = phase_config.get("baseline_statistic", config.get("baseline_statistic", "mean"))
+    sector_averages = {indicator: None for indicator in all_indicators}
+    sector_averages.update(get_sector_stats().baselines(sector, phase, company_data, phase_config["main"], statistic))
+    dynamic_thresholds = {}
+    for indicator in all_indicators:
+        avg = sector_averages.get(indicator)
+        if avg is not None and indicator in phase_config["main"]:
+            static_thresholds = thresholds.get(indicator, [])
+            dynamic_thresholds[indicator] = []
+            for thresh in static_thresholds:
+                if thresh["condition"] in [">", ">="]:
+                    new_threshold = thresh["threshold"] + (avg - static_thresholds[len(static_thresholds)//2]["threshold"])
+                else:
+                    new_threshold = thresh["threshold"] - (avg - static_thresholds[len(static_thresholds)//2]["threshold"])
+                dynamic_thresholds[indicator].append({
+                    "threshold": round(new_threshold, 2),
+                    "points": thresh["points"],
+                    "condition": thresh["condition"]
+                })
+            logging.debug("Dynamiczne progi dla %s: %s", indicator, dynamic_thresholds[indicator])
+        else:
+            dynamic_thresholds[indicator] = thresholds.get(indicator, [])
+    return sector_averages, dynamic_thresholds
+
+def sector_thresholds(sector: str, phase: str, config: dict, company_data: CompanyData) -> Tuple[Dict[str, Optional[float]], Dict[str, list]]:
+    """
+    Średnie sektorowe i dynamiczne progi dla sektora i fazy z pamięci progów – liczone raz na wersję danych
+    sektora (CompanyData.sector_version) i konfiguracji; wynik jest współdzielony i tylko do odczytu.
+    Argumenty i wynik jak w calculate_dynamic_thresholds.
+    """
+    key = threshold_key(sector, phase, company_data)
+    if key is None:
+        return calculate_dynamic_thresholds(sector, phase, config, company_data)
+    cache = get_threshold_cache()
+    cached = cache.get(key)
+    if cached is None:
+        cached = calculate_dynamic_thresholds(sector, phase, config, company_data)
+        cache.put(key, cached)
+    return cached
+
+def is_lower_better(indicator: str, thresholds: dict, phase_config: dict) -> bool:
+    """
+    Czy niższa wartość wskaźnika jest lepsza: lista "lower_is_better" konfiguracji fazy
+    lub wyłącznie warunki '<'/'<=' w progach wskaźnika.
+    """
+    if indicator in phase_config.get("lower_is_better", []):
+        return True
+    conditions = {t["condition"] for t in thresholds.get(indicator, [])}
+    return bool(conditions) and conditions <= {"<", "<="}
+
 def calculate_trend(ticker: str, company_data: CompanyData, sector: str, phase: str) -> Tuple[Optional[float], Dict]:
     """
     Oblicza punkty za trendy przychodów (roczne i kwartalne) dla danej spółki.
@@ -215,11 +267,11 @@ def calculate_trend(ticker: str, company_data: CompanyData, sector: str, phase:
                 if all(g > 0 for g in last_three):
                     trend_points += 5.0
                     trend_details["revenue_trend"]["points"] += 5.0
-                    logging.info(f"Dodano +5 pkt za 3 kolejne kwartały wzrostu przychodów dla {ticker}")
+                    logging.info("Dodano +5 pkt za 3 kolejne kwartały wzrostu przychodów dla %s", ticker)
                 elif len(growth_sequence) >= 2 and all(g < 0 for g in growth_sequence[-2:]):
                     trend_points -= 10.0
                     trend_details["revenue_trend"]["points"] -= 10.0
-                    logging.info(f"Odjęto -10 pkt za 2 kolejne kwartały spadku przychodów dla {ticker}")
+                    logging.info("Odjęto -10 pkt za 2 kolejne kwartały spadku przychodów dla %s", ticker)
             else:
                 logging.warning(f"Niewystarczająca liczba ważnych kwartałów ({valid_quarters}) dla {ticker} do analizy trendów")
                 trend_points = None
@@ -231,11 +283,34 @@ def calculate_trend(ticker: str, company_data: CompanyData, sector: str, phase:
         logging.error(f"Błąd obliczania trendów dla {ticker}: {str(e)}")
         return None, {"revenue_trend": {"yearly": [], "quarterly": [], "points": 0.0, "warnings": []}}
 
+@profiled("calculate_score")
 def calculate_score(sector: str, phase: str, data: dict, company_data: Optional[CompanyData] = None) -> Tuple[Union[float, None], Dict]:
+    """
+    Oblicza punktację spółki, korzystając z pamięci wyników (src.core.score_cache).
+    Wynik jest liczony ponownie tylko wtedy, gdy zmieniły się dane spółki, sektor, faza, konfiguracja
+    sektora, dane zbiorcze CompanyData lub historia tickera. Argumenty i wynik jak w _calculate_score.
+    """
+    key = score_key(sector, phase, data, company_data)
+    if key is None:
+        return _calculate_score(sector, phase, data, company_data)
+    cache = get_score_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        logging.debug("Punktacja dla %s z pamięci", data.get("ticker"))
+        return copy.deepcopy(cached)
+    result = _calculate_score(sector, phase, data, company_data)
+    if result[0] is not None:
+        cache.put(key, copy.deepcopy(result))
+    return result
+
+
+def _calculate_score(sector: str, phase: str, data: dict, company_data: Optional[CompanyData] = None) -> Tuple[Union[float, None], Dict]:
     """
     Oblicza punktację (0-100) dla spółki w danym sektorze i fazie z bonusami i trendami.
     Ujemne wartości wskaźników są traktowane jako 0 w punktacji, ale zapisywane jako ujemne w danych.
-    Wartości powyżej najwyższego progu są nagradzane proporcjonalnie.
+    Wartości powyżej najwyższego progu są nagradzane proporcjonalnie. W trybie "scoring_mode": "percentile"
+    (konfiguracja sektora lub fazy) wskaźnik dostaje punkty wg pozycji w grupie (sektor, faza); przy grupie
+    mniejszej niż 3 spółki używane są progi.
     Args:
         sector: Nazwa sektora (np. 'Technology').
         phase: Faza rozwoju (np. 'Wzrost').
@@ -271,7 +346,7 @@ def calculate_score(sector: str, phase: str, data: dict, company_data: Optional[
                     weight = fallback["weight"]
                     value = safe_float(data.get(fallback_indicator))
                     if value is not None:
-                        logging.info(f"Użyto zastępczego wskaźnika {fallback_indicator}={value} dla {indicator} w sektorze {sector}, faza {phase}")
+                        logging.info("Użyto zastępczego wskaźnika %s=%s dla %s w sektorze %s, faza %s", fallback_indicator, value, indicator, sector, phase)
                         return value, {"indicator": fallback_indicator, "value": value, "weight": weight}
             return None, None
 
@@ -285,33 +360,19 @@ def calculate_score(sector: str, phase: str, data: dict, company_data: Optional[
             "trend_details": {}
         }
         phase_config = config["indicators"][phase]
-        thresholds = config["scoring_thresholds"][phase]
+        thresholds = config.get("scoring_thresholds", {}).get(phase, {})
         weights = phase_config.get("weights", {indicator: 1.0 / len(phase_config["main"]) for indicator in phase_config["main"]})
+        scoring_mode = phase_config.get("scoring_mode", config.get("scoring_mode", "thresholds"))
 
-        # Obliczanie dynamicznych progów dla wszystkich wskaźników
+        # Dynamiczne progi są wspólne dla wszystkich spółek sektora i fazy (pamięć progów)
         dynamic_thresholds = {}
         sector_averages = {}
         if company_data:
+            sector_averages, dynamic_thresholds = sector_thresholds(sector, phase, config, company_data)
+        peer_stats = None
+        if company_data and scoring_mode == "percentile":
             all_indicators = phase_config["main"] + [fb["indicator"] for ind in phase_config["fallback"] for fb in phase_config["fallback"][ind]]
-            sector_averages = calculate_sector_averages(sector, phase, company_data, all_indicators)
-            for indicator in all_indicators:
-                avg = sector_averages.get(indicator)
-                if avg is not None and indicator in phase_config["main"]:
-                    static_thresholds = thresholds.get(indicator, [])
-                    dynamic_thresholds[indicator] = []
-                    for thresh in static_thresholds:
-                        if thresh["condition"] in [">", ">="]:
-                            new_threshold = thresh["threshold"] + (avg - static_thresholds[len(static_thresholds)//2]["threshold"])
-                        else:
-                            new_threshold = thresh["threshold"] - (avg - static_thresholds[len(static_thresholds)//2]["threshold"])
-                        dynamic_thresholds[indicator].append({
-                            "threshold": round(new_threshold, 2),
-                            "points": thresh["points"],
-                            "condition": thresh["condition"]
-                        })
-                    logging.info(f"Dynamiczne progi dla {indicator}: {dynamic_thresholds[indicator]}")
-                else:
-                    dynamic_thresholds[indicator] = thresholds.get(indicator, [])
+            peer_stats = get_sector_stats().sector(sector, company_data, all_indicators)
 
         any_indicator_available = False
         for orig_indicator in phase_config["main"]:
@@ -330,6 +391,21 @@ def calculate_score(sector: str, phase: str, data: dict, company_data: Optional[
                     score_details["indicators"][orig_indicator] = {"points": 0, "value": None, "weight": indicator_weight, "dynamic_thresholds": sector_averages.get(orig_indicator) is not None}
                     continue
             any_indicator_available = True
+            rank = peer_stats.percentile_rank(phase, indicator, value) if peer_stats is not None else None
+            if rank is not None:
+                # Tryb percentylowy: punkty = pozycja w grupie (sektor, faza), odwrócona dla wskaźników "im mniej, tym lepiej"
+                if is_lower_better(indicator, thresholds, phase_config):
+                    rank = 100.0 - rank
+                weighted_points = rank / 100 * phase_config.get("percentile_max_points", PERCENTILE_MAX_POINTS) * indicator_weight
+                score += weighted_points
+                score_details["indicators"][orig_indicator] = {
+                    "points": weighted_points,
+                    "value": value,
+                    "weight": indicator_weight,
+                    "dynamic_thresholds": False,
+                    "percentile": rank
+                }
+                continue
             current_thresholds = dynamic_thresholds.get(indicator, thresholds.get(indicator, []))
             if not current_thresholds:
                 logging.warning(f"Brak progów dla {indicator} w sektorze {sector}, faza {phase}")
@@ -442,16 +518,17 @@ def calculate_score(sector: str, phase: str, data: dict, company_data: Optional[
             if score_details["sector_avg"] > 0 and score > score_details["sector_avg"]:
                 score += 5
                 score_details["bonuses"]["sector"] = 5
-                logging.info(f"Dodano +5 punktów za przekroczenie średniej sektora {sector} ({score_details['sector_avg']})")
+                logging.info("Dodano +5 punktów za przekroczenie średniej sektora %s (%s)", sector, score_details["sector_avg"])
             overall_avg = calculate_overall_average(company_data)
             if overall_avg > 0 and score > overall_avg:
                 score += 2
                 score_details["bonuses"]["overall"] = 2
-                logging.info(f"Dodano +2 punkty za przekroczenie ogólnej średniej ({overall_avg})")
+                logging.info("Dodano +2 punkty za przekroczenie ogólnej średniej (%s)", overall_avg)
 
         # Ograniczenie końcowej punktacji do 100
         score = min(max(score, 0), 100.0)
-        logging.debug(f"Punktacja dla {data.get('ticker')}: {score} (bazowa + trendy + bonusy), szczegóły: {score_details}")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Punktacja dla %s: %s (bazowa + trendy + bonusy), szczegóły: %s", data.get("ticker"), score, score_details)
         return score, score_details
     except Exception as e:
         logging.error(f"Błąd obliczania punktacji dla sektora {sector}, faza {phase}: {str(e)}")
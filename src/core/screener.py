@@ -0,0 +1,278 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\core\screener.py
+"""
+Screening spółek: zapytania typu
+    sektor = Technology and faza = Wzrost and roe > 15 and debt_equity < 1 and punkty > 70
+
+Składnia: warunki `pole operator wartość` łączone słowem `and` lub przecinkiem; operatory
+>, >=, <, <=, = (==), != oraz `in (a, b, ...)`. Pola tekstowe (ticker, nazwa, sektor, faza) porównywane
+są bez rozróżniania wielkości liter, pozostałe jako liczby (brak danych nie spełnia warunku).
+Aliasy: score → punkty, sector → sektor, phase → faza, name → nazwa, portfolio → is_in_portfolio.
+
+Zapytania wykonywane są na kolumnowym indeksie spółek (tablice numpy per wskaźnik, budowane przy
+pierwszym użyciu, i indeksy wierszy per sektor i faza), odbudowywanym po zmianie CompanyData.version;
+kolumny pól spoza wersji (VOLATILE_FIELDS, m.in. punkty aktualizowane w miejscu) budowane są przy każdym zapytaniu.
+Używane w GUI (pole „Filtr” w zakładce Główna) i w trybie wsadowym (python -m src.cli.screen).
+"""
+import re
+import threading
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.core.company_data import COMPANY_KEYS
+from src.core.sector_stats import to_float
+
+TEXT_FIELDS = {"ticker", "nazwa", "sektor", "faza"}
+INDEXED_FIELDS = ("sektor", "faza")
+# pola pomijane w CompanyData.version albo zmieniane w miejscu (punkty – table_model.build_table_rows)
+# – kolumny budowane przy każdym zapytaniu
+VOLATILE_FIELDS = {"is_in_portfolio", "momentum", "date", "punkty"}
+# pola dostępne w zapytaniach niezależnie od wczytanych spółek (także przy pustym katalogu)
+KNOWN_FIELDS = set(COMPANY_KEYS) | {"ticker", "date"} | TEXT_FIELDS | VOLATILE_FIELDS
+ALIASES = {"score": "punkty", "sector": "sektor", "phase": "faza", "name": "nazwa", "portfolio": "is_in_portfolio"}
+OPERATORS = (">=", "<=", "!=", "==", "=", ">", "<")
+BOOLEANS = {"true": 1.0, "tak": 1.0, "false": 0.0, "nie": 0.0}
+
+_TOKEN = re.compile(r"""\s*(?:(?P<op>>=|<=|!=|==|=|>|<)|(?P<quoted>"[^"]*"|'[^']*')|(?P<punct>[(),])|(?P<word>[^\s,()<>=!"']+))""")
+
+
+class ScreenerError(ValueError):
+    """Błąd składni lub nieznane pole w zapytaniu."""
+
+
+class Condition:
+    """Warunek zapytania: pole, operator ('>', '>=', '<', '<=', '=', '!=', 'in') i wartość (lista dla 'in')."""
+
+    def __init__(self, field: str, op: str, value):
+        field = ALIASES.get(field.lower(), field.lower())
+        op = "=" if op == "==" else op
+        if op not in OPERATORS + ("in",):
+            raise ScreenerError(f"Nieznany operator: {op}")
+        values = value if op == "in" else [value]
+        if field in TEXT_FIELDS:
+            if op not in ("=", "!=", "in"):
+                raise ScreenerError(f"Pole tekstowe {field} obsługuje tylko =, != i in")
+            values = [str(v).lower() for v in values]
+        else:
+            values = [self._number(field, v) for v in values]
+        self.field = field
+        self.op = op
+        self.value = values if op == "in" else values[0]
+
+    @staticmethod
+    def _number(field: str, value) -> float:
+        if isinstance(value, str) and value.lower() in BOOLEANS:
+            return BOOLEANS[value.lower()]
+        number = to_float(value)
+        if np.isnan(number):
+            raise ScreenerError(f"Wartość {value!r} dla pola {field} nie jest liczbą")
+        return number
+
+    def __repr__(self) -> str:
+        return f"Condition({self.field!r}, {self.op!r}, {self.value!r})"
+
+
+def parse_query(query: str) -> List[Condition]:
+    """
+    Parsuje zapytanie tekstowe na listę warunków (łączonych koniunkcją).
+    Raises:
+        ScreenerError: Błąd składni.
+    """
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _TOKEN.match(query, position)
+        if not match or match.end() == position:
+            raise ScreenerError(f"Niezrozumiały fragment zapytania: {query[position:]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        text = match.group(kind)
+        tokens.append(("word", text[1:-1]) if kind == "quoted" else (kind, text))
+
+    conditions = []
+    i = 0
+    while i < len(tokens):
+        if tokens[i][0] != "word":
+            raise ScreenerError(f"Oczekiwano nazwy pola, otrzymano {tokens[i][1]!r}")
+        field = tokens[i][1]
+        if i + 2 > len(tokens):
+            raise ScreenerError(f"Niepełny warunek dla pola {field}")
+        kind, op = tokens[i + 1]
+        if kind == "word" and op.lower() == "in":
+            if i + 2 >= len(tokens) or tokens[i + 2] != ("punct", "("):
+                raise ScreenerError(f"Po 'in' oczekiwano listy w nawiasach dla pola {field}")
+            values = []
+            i += 3
+            while i < len(tokens) and tokens[i] != ("punct", ")"):
+                if tokens[i][0] == "word":
+                    values.append(tokens[i][1])
+                elif tokens[i] != ("punct", ","):
+                    raise ScreenerError(f"Nieprawidłowy element listy: {tokens[i][1]!r}")
+                i += 1
+            if i >= len(tokens) or not values:
+                raise ScreenerError(f"Niezamknięta lub pusta lista dla pola {field}")
+            conditions.append(Condition(field, "in", values))
+            i += 1
+        elif kind == "op":
+            if i + 2 >= len(tokens) or tokens[i + 2][0] != "word":
+                raise ScreenerError(f"Brak wartości dla warunku {field} {op}")
+            conditions.append(Condition(field, op, tokens[i + 2][1]))
+            i += 3
+        else:
+            raise ScreenerError(f"Oczekiwano operatora po polu {field}, otrzymano {op!r}")
+        if i < len(tokens):
+            if tokens[i] == ("punct", ",") or (tokens[i][0] == "word" and tokens[i][1].lower() == "and"):
+                i += 1
+                if i >= len(tokens):
+                    raise ScreenerError("Zapytanie kończy się spójnikiem")
+            else:
+                raise ScreenerError(f"Oczekiwano 'and' lub ',' zamiast {tokens[i][1]!r}")
+    return conditions
+
+
+class UniverseIndex:
+    """Kolumnowy widok spółek: tablice numpy per pole (budowane leniwie) i indeksy wierszy per sektor i faza."""
+
+    def __init__(self, companies: Sequence[dict]):
+        self.companies = list(companies)
+        self._lock = threading.Lock()
+        self._columns: Dict[str, np.ndarray] = {}
+        self._fields = set(KNOWN_FIELDS)
+        for company in self.companies:
+            self._fields.update(company)
+        self._indexes: Dict[str, Dict[str, np.ndarray]] = {}
+        for field in INDEXED_FIELDS:
+            groups: Dict[str, List[int]] = {}
+            for row, company in enumerate(self.companies):
+                groups.setdefault(str(company.get(field)).lower(), []).append(row)
+            self._indexes[field] = {key: np.array(rows, dtype=np.intp) for key, rows in groups.items()}
+
+    def __len__(self) -> int:
+        return len(self.companies)
+
+    def _check(self, field: str) -> None:
+        if field not in self._fields:
+            raise ScreenerError(f"Nieznane pole: {field}")
+
+    def column(self, field: str) -> np.ndarray:
+        """Kolumna pola: float64 (NaN – brak) lub tekst małymi literami dla pól tekstowych."""
+        self._check(field)
+        if field in VOLATILE_FIELDS:
+            return self._build(field)
+        with self._lock:
+            column = self._columns.get(field)
+        if column is None:
+            column = self._build(field)
+            with self._lock:
+                self._columns[field] = column
+        return column
+
+    def _build(self, field: str) -> np.ndarray:
+        if field in TEXT_FIELDS:
+            return np.array([str(c.get(field)).lower() for c in self.companies], dtype=object)
+        return np.array([to_float(c.get(field)) for c in self.companies], dtype=float)
+
+    def rows(self, field: str, values: List[str]) -> np.ndarray:
+        """Numery wierszy z indeksu sektora lub fazy dla podanych wartości."""
+        index = self._indexes[field]
+        parts = [index[v] for v in values if v in index]
+        return np.unique(np.concatenate(parts)) if parts else np.array([], dtype=np.intp)
+
+    def _mask(self, condition: Condition, rows: np.ndarray) -> np.ndarray:
+        column = self.column(condition.field)[rows]
+        if condition.field in TEXT_FIELDS:
+            if condition.op == "in":
+                return np.isin(column, condition.value)
+            equal = column == condition.value
+            return equal if condition.op == "=" else ~equal
+        present = ~np.isnan(column)
+        if condition.op == "in":
+            return np.isin(column, condition.value)
+        compare = {
+            ">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal,
+            "=": np.equal, "!=": np.not_equal,
+        }[condition.op]
+        return present & compare(column, condition.value)
+
+    def select(self, conditions: Sequence[Condition]) -> np.ndarray:
+        """Numery wierszy spełniających wszystkie warunki (najpierw indeksy sektora i fazy, potem filtry wektorowe)."""
+        rows = None
+        filters = []
+        for condition in conditions:
+            self._check(condition.field)  # nieznane pole jest błędem także przy pustym wyniku
+            if condition.field in INDEXED_FIELDS and condition.op in ("=", "in"):
+                values = condition.value if condition.op == "in" else [condition.value]
+                matched = self.rows(condition.field, values)
+                rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            else:
+                filters.append(condition)
+        if rows is None:
+            rows = np.arange(len(self.companies))
+        for condition in filters:
+            if not len(rows):
+                break
+            rows = rows[self._mask(condition, rows)]
+        return rows
+
+    def order(self, rows: np.ndarray, sort_by: Optional[str], descending: bool = True) -> np.ndarray:
+        """Sortuje wiersze wg pola (brak danych na końcu)."""
+        if not sort_by:
+            return rows
+        field = ALIASES.get(sort_by.lower(), sort_by.lower())
+        self._check(field)
+        if not len(rows):
+            return rows
+        column = self.column(field)[rows]
+        if column.dtype == object:
+            order = sorted(range(len(rows)), key=lambda i: column[i], reverse=descending)
+            return rows[np.array(order, dtype=np.intp)]
+        missing = np.isnan(column)
+        keys = np.where(missing, 0.0, -column if descending else column)
+        return rows[np.lexsort((keys, missing))]
+
+
+_INDEX_LOCK = threading.Lock()
+_INDEX_CACHE: Dict[str, Union[int, UniverseIndex, None]] = {"version": None, "index": None}
+
+
+def universe_index(company_data) -> UniverseIndex:
+    """Indeks spółek – z pamięci, dopóki CompanyData.version się nie zmieni."""
+    version = getattr(company_data, "version", None)
+    if not isinstance(version, int):
+        return UniverseIndex(company_data.companies)
+    with _INDEX_LOCK:
+        if _INDEX_CACHE["version"] == version:
+            return _INDEX_CACHE["index"]
+    index = UniverseIndex(company_data.companies)
+    with _INDEX_LOCK:
+        _INDEX_CACHE["version"], _INDEX_CACHE["index"] = version, index
+    return index
+
+
+def screen(
+    company_data,
+    query: Union[str, Sequence[Condition]],
+    sort_by: Optional[str] = "punkty",
+    descending: bool = True,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    """
+    Zwraca spółki spełniające zapytanie.
+    Args:
+        company_data: Obiekt CompanyData.
+        query: Zapytanie tekstowe lub lista warunków (Condition).
+        sort_by: Pole sortowania (None – kolejność wczytania).
+        descending: Sortowanie malejące.
+        limit: Maksymalna liczba wyników.
+    Returns:
+        Lista słowników spółek (obiekty z CompanyData.companies).
+    Raises:
+        ScreenerError: Błąd składni lub nieznane pole.
+    """
+    conditions = parse_query(query) if isinstance(query, str) else list(query)
+    index = universe_index(company_data)
+    rows = index.order(index.select(conditions), sort_by, descending)
+    if limit is not None:
+        rows = rows[:limit]
+    return [index.companies[row] for row in rows]
@@ -0,0 +1,164 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\core\sector_stats.py
+"""
+Statystyki wskaźników per (sektor, faza, wskaźnik): średnia, mediana, percentyle i średnia winsoryzowana.
+
+Dla sektora budowana jest jedna macierz spółki × wskaźniki (NaN – brak danych, wartości ujemne liczone
+jako 0), a statystyki wszystkich faz i wskaźników liczone są wektorowo
+w numpy. Wynik jest zapamiętywany dla wersji danych sektora (CompanyData.sector_version), więc zmiana
+spółki przelicza tylko jej sektor. Statystyka bazowa dynamicznych progów wybierana jest w konfiguracji
+sektora kluczem "baseline_statistic" (globalnie lub w konfiguracji fazy), domyślnie "mean".
+
+Posortowane wartości każdej grupy (sektor, faza, wskaźnik) służą też do punktacji percentylowej
+("scoring_mode": "percentile") – pozycja spółki w grupie jest wyszukiwana binarnie w O(log n).
+Z tych samych statystyk korzystają calculate_dynamic_thresholds i calculate_sector_averages (scoring_calculator).
+"""
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+MIN_COUNT = 3
+PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+WINSOR_LIMITS = (5, 95)
+# statystyki dostępne jako wartość bazowa progów
+STATISTICS = ("mean", "median", "winsorized_mean") + tuple(f"p{p}" for p in PERCENTILES)
+MISSING = {None, "", "-", "NA", "N/A", "None", "nan"}
+
+
+def to_float(value) -> float:
+    """Wartość liczbowa wskaźnika (NaN – brak lub nieliczbowa)."""
+    if isinstance(value, (list, dict)) or value in MISSING:
+        return np.nan
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def column_stats(values: np.ndarray) -> List[Optional[Dict[str, float]]]:
+    """
+    Statystyki kolumn macierzy (wiersze – spółki, kolumny – wskaźniki; NaN – brak danych).
+    Returns:
+        Lista słowników statystyk (None dla kolumn z mniej niż MIN_COUNT wartościami).
+    """
+    result: List[Optional[Dict[str, float]]] = [None] * values.shape[1]
+    counts = np.count_nonzero(~np.isnan(values), axis=0)
+    columns = np.flatnonzero(counts >= MIN_COUNT)
+    if not len(columns):
+        return result
+    data = values[:, columns]
+    percentiles = np.nanpercentile(data, PERCENTILES, axis=0)
+    low = np.nanpercentile(data, WINSOR_LIMITS[0], axis=0)
+    high = np.nanpercentile(data, WINSOR_LIMITS[1], axis=0)
+    means = np.nanmean(data, axis=0)
+    winsorized = np.nanmean(np.clip(data, low, high), axis=0)
+    for i, column in enumerate(columns):
+        stats = {
+            "count": int(counts[column]),
+            "mean": round(float(means[i]), 2),
+            "winsorized_mean": round(float(winsorized[i]), 2),
+        }
+        for p, value in zip(PERCENTILES, percentiles[:, i]):
+            stats[f"p{p}"] = round(float(value), 2)
+        stats["median"] = stats["p50"]
+        result[column] = stats
+    return result
+
+
+class SectorStats:
+    """Statystyki wszystkich faz i wskaźników jednego sektora."""
+
+    def __init__(self, sector: str, companies: Iterable[dict], indicators: Iterable[str]):
+        self.sector = sector
+        self.indicators: Tuple[str, ...] = tuple(dict.fromkeys(indicators))
+        rows = [c for c in companies if c.get("sektor") == sector]
+        phases = np.array([str(c.get("faza")) for c in rows], dtype=object)
+        matrix = np.array(
+            [[to_float(c.get(indicator)) for indicator in self.indicators] for c in rows], dtype=float
+        ).reshape(len(rows), len(self.indicators))
+        matrix = np.where(matrix < 0, 0.0, matrix)  # ujemne jak 0 (NaN pozostaje NaN)
+        self._stats: Dict[Tuple[str, str], Optional[Dict[str, float]]] = {}
+        self._sorted: Dict[Tuple[str, str], np.ndarray] = {}
+        for phase in set(phases.tolist()):
+            group = matrix[phases == phase]
+            for i, (indicator, stats) in enumerate(zip(self.indicators, column_stats(group))):
+                self._stats[(phase, indicator)] = stats
+                column = group[:, i]
+                self._sorted[(phase, indicator)] = np.sort(column[~np.isnan(column)])
+
+    def get(self, phase: str, indicator: str) -> Optional[Dict[str, float]]:
+        """Statystyki wskaźnika w fazie (None – mniej niż MIN_COUNT wartości)."""
+        return self._stats.get((str(phase), indicator))
+
+    def percentile_rank(self, phase: str, indicator: str, value: float) -> Optional[float]:
+        """
+        Pozycja wartości w grupie (sektor, faza) w skali 0–100 (wyszukiwanie binarne, remisy – ranga środkowa).
+        Returns:
+            0 dla najmniejszej, 100 dla największej wartości grupy; None – mniej niż MIN_COUNT wartości.
+        """
+        values = self._sorted.get((str(phase), indicator))
+        if values is None or len(values) < MIN_COUNT:
+            return None
+        value = max(float(value), 0.0)
+        left = np.searchsorted(values, value, side="left")
+        right = np.searchsorted(values, value, side="right")
+        rank = (left + right - 1) / 2 / (len(values) - 1)
+        return round(min(max(rank, 0.0), 1.0) * 100, 2)
+
+
+class SectorStatsEngine:
+    """Pamięć statystyk sektorów przeliczanych po zmianie wersji danych sektora (bezpieczna wątkowo)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sectors: Dict[str, Tuple[int, SectorStats]] = {}
+
+    def sector(self, sector: str, company_data, indicators: Iterable[str]) -> SectorStats:
+        """Statystyki sektora – z pamięci, jeśli dane sektora i zestaw wskaźników się nie zmieniły."""
+        indicators = tuple(indicators)
+        version_of = getattr(company_data, "sector_version", None)
+        version = version_of(sector) if callable(version_of) else None
+        if not isinstance(version, int):
+            return SectorStats(sector, company_data.companies, indicators)
+        with self._lock:
+            cached = self._sectors.get(sector)
+        if cached and cached[0] == version and set(indicators) <= set(cached[1].indicators):
+            return cached[1]
+        known = cached[1].indicators if cached and cached[0] == version else ()
+        stats = SectorStats(sector, company_data.companies, known + indicators)
+        with self._lock:
+            self._sectors[sector] = (version, stats)
+        logging.debug("Przeliczono statystyki sektora %s (%d wskaźników)", sector, len(stats.indicators))
+        return stats
+
+    def baselines(
+        self, sector: str, phase: str, company_data, indicators: Iterable[str], statistic: str = "mean"
+    ) -> Dict[str, Optional[float]]:
+        """Wartość bazowa (wybrana statystyka) dla każdego wskaźnika; None przy zbyt małej liczbie danych."""
+        if statistic not in STATISTICS:
+            logging.warning(f"Nieznana statystyka bazowa {statistic}, używam średniej")
+            statistic = "mean"
+        indicators = list(indicators)
+        stats = self.sector(sector, company_data, indicators)
+        result = {}
+        for indicator in indicators:
+            values = stats.get(phase, indicator)
+            result[indicator] = values[statistic] if values else None
+        return result
+
+    def invalidate(self, sector: Optional[str] = None) -> None:
+        """Usuwa statystyki sektora (None – wszystkie)."""
+        with self._lock:
+            if sector is None:
+                self._sectors.clear()
+            else:
+                self._sectors.pop(sector, None)
+
+
+_ENGINE = SectorStatsEngine()
+
+
+def get_sector_stats() -> SectorStatsEngine:
+    """Zwraca procesową pamięć statystyk sektorów."""
+    return _ENGINE
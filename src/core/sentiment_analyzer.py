@@ -1,29 +1,333 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\Analizator\src\core\sentiment_analyzer.py
+import hashlib
 import logging
-from typing import Dict, Optional
-from transformers import pipeline
-from src.core.logging_config import setup_logging
+import math
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-# Inicjalizacja logowania
-setup_logging()
 
 logger = logging.getLogger(__name__)
 
-class SentimentAnalyzer:
-    """Analizuje sentyment postów z platformy X dla danej spółki."""
+DEFAULT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+DEFAULT_BACKEND = "transformers"
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_CACHE_SIZE = 4096
+MAX_LENGTH = 512
 
-    def __init__(self):
-        """Inicjalizuje model ML do analizy sentymentu."""
+# Jeden model na proces (ładowanie DistilBERT trwa sekundy) – współdzielony przez wszystkie instancje
+_PIPELINES: Dict[str, object] = {}
+_PIPELINE_LOCK = threading.Lock()
+
+
+def _get_pipeline(model: str, quantized: bool = False):
+    """
+    Zwraca (tworząc przy pierwszym użyciu) pipeline sentymentu dla modelu.
+    Args:
+        model: Nazwa modelu Hugging Face.
+        quantized: Gdy True – warstwy Linear kwantyzowane dynamicznie do int8 (szybsze CPU, mniej RAM).
+    Raises:
+        Exception: Gdy nie można załadować transformers lub modelu.
+    """
+    cache_key = f"{model}#int8" if quantized else model
+    classifier = _PIPELINES.get(cache_key)
+    if classifier is None:
+        with _PIPELINE_LOCK:
+            classifier = _PIPELINES.get(cache_key)
+            if classifier is None:
+                # transformers (i torch) ładujemy dopiero przy pierwszym użyciu – import modułu jest tani
+                from transformers import pipeline
+
+                if quantized:
+                    import torch
+                    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+                    hf_model = AutoModelForSequenceClassification.from_pretrained(model)
+                    hf_model = torch.quantization.quantize_dynamic(hf_model, {torch.nn.Linear}, dtype=torch.qint8)
+                    tokenizer = AutoTokenizer.from_pretrained(model)
+                    classifier = pipeline("sentiment-analysis", model=hf_model, tokenizer=tokenizer)
+                else:
+                    classifier = pipeline("sentiment-analysis", model=model)
+                _PIPELINES[cache_key] = classifier
+                logger.info(f"Model sentymentu {cache_key} załadowany")
+    return classifier
+
+
+class _ResultCache:
+    """Bezpieczny wątkowo cache LRU: skrót treści posta → (etykieta, wynik)."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Tuple[str, float]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_RESULT_CACHE = _ResultCache()
+
+
+def _post_key(backend: str, post: str) -> str:
+    """Klucz cache: nazwa backendu (z modelem) + skrót SHA-1 treści posta."""
+    return f"{backend}:{hashlib.sha1(post.encode('utf-8')).hexdigest()}"
+
+
+class SentimentBackend:
+    """
+    Interfejs backendu sentymentu: klasyfikacja partii postów na (etykieta, wynik).
+    Etykiety: 'positive', 'negative', 'neutral'; wynik to pewność z przedziału [0, 1].
+    """
+
+    name = "base"
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def classify(self, batch: List[str]) -> List[Tuple[str, float]]:
+        """Klasyfikuje partię postów. Może rzucić wyjątek – analizator przejdzie wtedy na posty pojedynczo."""
+        raise NotImplementedError
+
+
+class TransformersBackend(SentimentBackend):
+    """DistilBERT (SST-2) przez pipeline Hugging Face – wariant bazowy, najdokładniejszy i najcięższy."""
+
+    quantized = False
+
+    def __init__(self, model: str = DEFAULT_MODEL):
+        self.model = model
+        self.name = f"{'quantized' if self.quantized else 'transformers'}/{model}"
         try:
-            self.classifier = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
-            logger.info("Model sentymentu zainicjalizowany pomyślnie")
+            self.classifier = _get_pipeline(model, quantized=self.quantized)
         except Exception as e:
             logger.error(f"Błąd inicjalizacji modelu sentymentu: {e}")
             self.classifier = None
 
+    @property
+    def available(self) -> bool:
+        return self.classifier is not None
+
+    def classify(self, batch: List[str]) -> List[Tuple[str, float]]:
+        outputs = self.classifier(batch, batch_size=len(batch), truncation=True, max_length=MAX_LENGTH)
+        return [(out["label"].lower(), float(out["score"])) for out in outputs]
+
+
+class QuantizedBackend(TransformersBackend):
+    """Ten sam model po dynamicznej kwantyzacji int8 (torch) – ok. 2x szybszy na CPU, ~4x mniejsze wagi."""
+
+    quantized = True
+
+
+class LexiconBackend(SentimentBackend):
+    """
+    Słownikowy backend CPU bez zależności: suma wag słów (z negacją i wzmacniaczami)
+    normalizowana do [-1, 1] jak w VADER. Ładuje się natychmiast; dokładność niższa niż DistilBERT.
+    """
+
+    name = "lexicon"
+
+    POSITIVE = {
+        "good": 1.5, "great": 2.5, "excellent": 3.0, "amazing": 2.8, "awesome": 2.8, "love": 2.5, "like": 1.0,
+        "strong": 1.8, "beat": 2.0, "beats": 2.0, "record": 1.5, "growth": 1.5, "grow": 1.2, "growing": 1.2,
+        "profit": 1.5, "profitable": 1.8, "gain": 1.5, "gains": 1.5, "up": 0.8, "rally": 2.0, "rallies": 2.0,
+        "surge": 2.2, "surges": 2.2, "soar": 2.5, "soars": 2.5, "bullish": 2.5, "bull": 1.5, "buy": 1.2,
+        "upgrade": 2.0, "upgraded": 2.0, "outperform": 2.0, "win": 1.8, "winning": 2.0, "killing": 1.5,
+        "impressive": 2.3, "impressed": 2.0, "solid": 1.5, "optimistic": 2.0, "positive": 1.8, "happy": 2.0, "best": 2.5,
+        "breakout": 2.0, "moon": 2.0, "undervalued": 1.5, "recovery": 1.5, "rebound": 1.5, "higher": 1.0,
+        "exceeded": 2.0, "exceeds": 2.0, "robust": 1.8, "boost": 1.8, "innovative": 1.5, "dividend": 0.8,
+        "🚀": 2.5, "📈": 2.0, "💰": 1.5, "🔥": 1.5,
+    }
+    NEGATIVE = {
+        "bad": -2.0, "terrible": -3.0, "awful": -3.0, "hate": -2.8, "weak": -1.8, "miss": -2.0,
+        "missed": -2.0, "misses": -2.0, "loss": -2.0, "losses": -2.0, "lose": -1.8, "losing": -1.8,
+        "down": -0.8, "drop": -1.8, "drops": -1.8, "fall": -1.5, "falls": -1.5, "plunge": -2.8,
+        "plunges": -2.8, "crash": -3.0, "crashes": -3.0, "tank": -2.5, "tanking": -2.5, "dump": -2.0,
+        "bearish": -2.5, "bear": -1.5, "sell": -1.2, "downgrade": -2.2, "downgraded": -2.2,
+        "underperform": -2.0, "disappointed": -2.3, "disappointing": -2.3, "disappointment": -2.3,
+        "worst": -3.0, "worried": -1.8, "worry": -1.8, "concern": -1.5, "concerns": -1.5, "risk": -1.0,
+        "risky": -1.5, "lawsuit": -2.0, "fraud": -3.0, "overvalued": -1.8, "bankrupt": -3.0,
+        "bankruptcy": -3.0, "layoffs": -2.0, "decline": -1.8, "declines": -1.8, "lower": -1.0,
+        "negative": -1.8, "ugly": -2.0, "scam": -3.0, "bubble": -1.8, "expensive": -1.2, "recall": -1.5, "cut": -1.2,
+        "📉": -2.0, "💀": -2.0,
+    }
+    NEGATIONS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without",
+                 "isn't", "isnt", "wasn't", "wasnt", "don't", "dont", "doesn't", "doesnt", "didn't", "didnt",
+                 "can't", "cant", "won't", "wont", "aren't", "arent", "hardly"}
+    INTENSIFIERS = {"very": 1.3, "really": 1.3, "extremely": 1.5, "super": 1.4, "so": 1.2, "huge": 1.4,
+                    "massive": 1.5, "totally": 1.3, "absolutely": 1.4, "slightly": 0.6, "somewhat": 0.7}
+    NEGATION_WINDOW = 3
+    NEUTRAL_BAND = 0.05
+    ALPHA = 4.0
+
+    _TOKEN_RE = re.compile(r"\$?[a-z']+|[\U0001F300-\U0001FAFF]")
+
+    def __init__(self):
+        self._lexicon = {**self.POSITIVE, **self.NEGATIVE}
+
+    def polarity(self, post: str) -> float:
+        """Znormalizowana polaryzacja posta z przedziału [-1, 1]."""
+        tokens = self._TOKEN_RE.findall(post.lower())
+        total = 0.0
+        negate_left = 0
+        boost = 1.0
+        for token in tokens:
+            if token.startswith("$"):  # cashtagi ($AAPL) są neutralne
+                continue
+            if token in self.NEGATIONS:
+                negate_left = self.NEGATION_WINDOW
+                continue
+            if token in self.INTENSIFIERS:
+                boost *= self.INTENSIFIERS[token]
+                continue
+            valence = self._lexicon.get(token)
+            if valence is not None:
+                if negate_left:
+                    valence *= -0.74  # negacja odwraca i osłabia wydźwięk
+                total += valence * boost
+            boost = 1.0
+            negate_left = max(0, negate_left - 1)
+        if post.count("!") and total:
+            total += math.copysign(0.3 * min(post.count("!"), 4), total)
+        return total / math.sqrt(total * total + self.ALPHA)
+
+    def classify(self, batch: List[str]) -> List[Tuple[str, float]]:
+        results = []
+        for post in batch:
+            compound = self.polarity(post)
+            if compound > self.NEUTRAL_BAND:
+                results.append(("positive", 0.5 + compound / 2))
+            elif compound < -self.NEUTRAL_BAND:
+                results.append(("negative", 0.5 - compound / 2))
+            else:
+                results.append(("neutral", 1.0 - abs(compound)))
+        return results
+
+
+BACKENDS = {
+    "transformers": TransformersBackend,
+    "quantized": QuantizedBackend,
+    "lexicon": LexiconBackend,
+}
+
+
+def create_backend(name: Optional[str] = None, model: str = DEFAULT_MODEL) -> SentimentBackend:
+    """
+    Tworzy backend po nazwie; bez nazwy – wg zmiennej środowiskowej SENTIMENT_BACKEND (domyślnie 'transformers').
+    Nieznana nazwa jest logowana i zastępowana backendem domyślnym.
+    """
+    name = (name or os.getenv("SENTIMENT_BACKEND") or DEFAULT_BACKEND).strip().lower()
+    backend_cls = BACKENDS.get(name)
+    if backend_cls is None:
+        logger.error(f"Nieznany backend sentymentu '{name}', używam '{DEFAULT_BACKEND}'")
+        backend_cls = BACKENDS[DEFAULT_BACKEND]
+    if issubclass(backend_cls, TransformersBackend):
+        return backend_cls(model)
+    return backend_cls()
+
+
+class SentimentAnalyzer:
+    """Analizuje sentyment postów z platformy X dla danej spółki."""
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        model: str = DEFAULT_MODEL,
+        backend: Optional[object] = None,
+    ):
+        """
+        Inicjalizuje backend do analizy sentymentu.
+        Args:
+            batch_size: Liczba postów przetwarzanych w jednym wywołaniu modelu.
+            model: Nazwa modelu Hugging Face (backendy 'transformers' i 'quantized').
+            backend: Nazwa backendu ('transformers', 'quantized', 'lexicon'), gotowa instancja
+                SentimentBackend lub None (wtedy SENTIMENT_BACKEND z otoczenia).
+        """
+        self.batch_size = max(1, int(batch_size))
+        self.model = model
+        self.cache = _RESULT_CACHE
+        self.backend = backend if isinstance(backend, SentimentBackend) else create_backend(backend, model)
+        if self.backend.available:
+            logger.info(f"Backend sentymentu {self.backend.name} zainicjalizowany pomyślnie")
+
+    @property
+    def classifier(self):
+        """Dostępny backend lub None (zgodność wsteczna z atrybutem `classifier`)."""
+        return self.backend if self.backend.available else None
+
+    def _classify_batch(self, batch: List[str]) -> List[Optional[Tuple[str, float]]]:
+        """
+        Klasyfikuje partię postów jednym wywołaniem backendu (dopełnienie do najdłuższego posta w partii).
+        Przy błędzie partii przechodzi na posty pojedynczo, by jeden wadliwy post nie psuł reszty.
+        """
+        try:
+            return list(self.backend.classify(batch))
+        except Exception as e:
+            logger.warning(f"Błąd analizy partii {len(batch)} postów, analizuję pojedynczo: {e}")
+        results: List[Optional[Tuple[str, float]]] = []
+        for post in batch:
+            try:
+                results.append(self.backend.classify([post])[0])
+            except Exception as e:
+                logger.error(f"Błąd analizy posta: {e}")
+                results.append(None)
+        return results
+
+    def classify_posts(self, posts: List[str]) -> List[Optional[Tuple[str, float]]]:
+        """
+        Zwraca (etykieta, wynik) dla każdego posta w kolejności wejściowej (None przy błędzie).
+        Posty z cache nie trafiają do modelu; pozostałe są deduplikowane, sortowane po długości
+        (mniej dopełniania w partii) i klasyfikowane partiami po `batch_size`.
+        """
+        keys = [_post_key(self.backend.name, post) for post in posts]
+        labels: Dict[str, Optional[Tuple[str, float]]] = {}
+        pending: Dict[str, str] = {}
+        for key, post in zip(keys, posts):
+            if key in labels or key in pending:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                labels[key] = cached
+            else:
+                pending[key] = post
+
+        if pending:
+            order = sorted(pending, key=lambda k: len(pending[k]))
+            for i in range(0, len(order), self.batch_size):
+                chunk = order[i:i + self.batch_size]
+                for key, result in zip(chunk, self._classify_batch([pending[k] for k in chunk])):
+                    labels[key] = result
+                    if result is not None:
+                        self.cache.put(key, result)
+            logger.debug(f"Sentyment: {len(pending)} nowych postów, {len(posts) - len(pending)} z cache/duplikatów")
+
+        return [labels[key] for key in keys]
+
     def analyze_posts(self, posts: list[str]) -> Dict[str, float]:
         """Analizuje sentyment listy postów i zwraca średni wynik."""
-        if not self.classifier:
+        if not self.backend.available:
             logger.warning("Model sentymentu nie jest dostępny")
             return {"positive": 0.0, "negative": 0.0, "neutral": 0.0}
 
@@ -34,20 +338,16 @@ class SentimentAnalyzer:
             logger.warning("Brak postów do analizy")
             return results
 
-        for post in posts:
-            try:
-                result = self.classifier(post, truncation=True, max_length=512)[0]
-                label = result["label"].lower()
-                score = result["score"]
-
-                if label == "positive":
-                    results["positive"] += score
-                elif label == "negative":
-                    results["negative"] += score
-                else:
-                    results["neutral"] += score
-            except Exception as e:
-                logger.error(f"Błąd analizy posta: {e}")
+        for result in self.classify_posts(posts):
+            if result is None:
+                continue
+            label, score = result
+            if label == "positive":
+                results["positive"] += score
+            elif label == "negative":
+                results["negative"] += score
+            else:
+                results["neutral"] += score
 
         # Normalizacja wyników
         results = {k: v / total if total > 0 else 0.0 for k, v in results.items()}
@@ -65,6 +365,95 @@ class SentimentAnalyzer:
         logger.info(f"Punktacja sentymentu dla {ticker}: {score}")
         return round(score, 2)
 
+
+# --- Tryb wieloprocesowy (przebiegi nocne na setkach tickerów) ---
+
+# Analizator procesu roboczego – tworzony raz w inicjalizatorze puli, model ładowany raz na proces
+_WORKER_ANALYZER: Optional[SentimentAnalyzer] = None
+
+
+def _init_worker(backend: Optional[str], model: str, batch_size: int, threads_per_worker: int) -> None:
+    """Inicjalizator procesu roboczego: ogranicza wątki BLAS/torch i ładuje backend."""
+    global _WORKER_ANALYZER
+    # Bez limitu każdy proces uruchomiłby tyle wątków, ile rdzeni – nadsubskrypcja zamiast skalowania
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads_per_worker)
+    if "torch" in sys.modules:
+        sys.modules["torch"].set_num_threads(threads_per_worker)
+    _WORKER_ANALYZER = SentimentAnalyzer(batch_size=batch_size, model=model, backend=backend)
+
+
+def _score_work_item(ticker: str, posts: List[str]) -> Tuple[str, Optional[float]]:
+    """Zadanie procesu roboczego: punktacja sentymentu jednego tickera."""
+    return ticker, _WORKER_ANALYZER.get_sentiment_score(ticker, posts)
+
+
+def score_tickers_parallel(
+    items: Iterable[Tuple[str, List[str]]],
+    workers: Optional[int] = None,
+    backend: Optional[str] = None,
+    model: str = DEFAULT_MODEL,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_in_flight: Optional[int] = None,
+    max_tasks_per_child: Optional[int] = None,
+    threads_per_worker: int = 1,
+) -> Iterator[Tuple[str, Optional[float]]]:
+    """
+    Punktuje sentyment wielu tickerów w puli procesów; wyniki zwraca w kolejności ukończenia.
+    Args:
+        items: Iterowalna sekwencja (ticker, posty) – może być generatorem, czytana leniwie.
+        workers: Liczba procesów (domyślnie liczba rdzeni).
+        backend: Nazwa backendu sentymentu (jak w SentimentAnalyzer; None – SENTIMENT_BACKEND).
+        model: Model Hugging Face dla backendów transformers.
+        batch_size: Rozmiar partii inferencji w procesie roboczym.
+        max_in_flight: Maks. liczba zleconych, nieodebranych zadań (domyślnie 2 x workers) –
+            ogranicza pamięć zajmowaną przez kolejkę postów.
+        max_tasks_per_child: Po ilu zadaniach proces jest odtwarzany (Python 3.11+) – limit wycieków
+            pamięci kosztem ponownego ładowania modelu.
+        threads_per_worker: Liczba wątków obliczeniowych torch/BLAS na proces.
+    Yields:
+        Krotki (ticker, punktacja lub None przy błędzie).
+    """
+    import multiprocessing
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    max_in_flight = max(1, max_in_flight or 2 * workers)
+    pool_kwargs = {
+        "max_workers": workers,
+        # spawn: bezpieczny z torch i wątkami (fork po załadowaniu modelu potrafi się zakleszczyć)
+        "mp_context": multiprocessing.get_context("spawn"),
+        "initializer": _init_worker,
+        "initargs": (backend, model, batch_size, threads_per_worker),
+    }
+    if max_tasks_per_child and sys.version_info >= (3, 11):
+        pool_kwargs["max_tasks_per_child"] = max_tasks_per_child
+
+    work = iter(items)
+    with ProcessPoolExecutor(**pool_kwargs) as executor:
+        pending = {}
+
+        def submit_next() -> bool:
+            item = next(work, None)
+            if item is None:
+                return False
+            ticker, posts = item
+            pending[executor.submit(_score_work_item, ticker, list(posts))] = ticker
+            return True
+
+        while len(pending) < max_in_flight and submit_next():
+            pass
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticker = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception as e:
+                    logger.error(f"Błąd punktacji sentymentu dla {ticker} w procesie roboczym: {e}")
+                    yield ticker, None
+                submit_next()
+
+
 if __name__ == "__main__":
     # Przykład użycia
     analyzer = SentimentAnalyzer()
@@ -0,0 +1,176 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\core\table_model.py
+"""
+Model tabeli spółek z zakładki głównej – bez tkinter.
+
+build_table_rows wykonuje to, co MainWindow.update_table robi przed wstawieniem wierszy do Treeview:
+normalizację sektora, klasyfikację fazy, przeliczenie punktacji, zapis spółki, kolor wiersza
+(brakujące wskaźniki główne/zastępcze) i tekst komórek z podpowiedziami. Dzięki temu ten sam kod
+może działać w GUI, w benchmarkach i testach.
+"""
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.core.company_data import CompanyData
+from src.core.phase_classifier import classify_phase
+from src.core.scoring_calculator import calculate_score
+from src.core.sector_mapping import normalize_sector
+from src.core.utils import load_sector_config
+
+MISSING_VALUES = [None, "", "-", "NA", "N/A", "None", "nan"]
+
+
+def empty_score_details() -> Dict:
+    """Szczegóły punktacji spółki, której nie przeliczano."""
+    return {"used_fallbacks": {}, "bonuses": {}, "indicators": {}, "sector_phase_avg": 0.0, "sector_avg": 0.0, "trend_details": {}}
+
+
+def valid_sector_names() -> set:
+    """Nazwy sektorów (małe litery) z plików konfiguracyjnych src/core/sectors."""
+    return {f.replace(".json", "").lower() for f in os.listdir(os.path.join("src", "core", "sectors")) if f.endswith(".json")}
+
+
+def refresh_company(company: Dict, company_data: CompanyData, valid_sectors: set) -> Dict:
+    """
+    Normalizuje sektor oraz przelicza fazę i punktację spółki (z pominięciem ręcznych wartości).
+    Returns:
+        Szczegóły punktacji (puste, gdy punktacji nie przeliczano).
+    """
+    score_details = empty_score_details()
+    sector = company.get("sektor", None)
+    is_manual_sektor = company.get("is_manual_sektor", False)
+    is_manual_faza = company.get("is_manual_faza", False)
+    if not is_manual_sektor and sector:
+        try:
+            normalized_sector = normalize_sector(sector)
+            if normalized_sector.lower() in valid_sectors:
+                company["sektor"] = normalized_sector
+            else:
+                logging.warning(f"Nieprawidłowy sektor {sector} dla {company['ticker']}, ustawiono None")
+                company["sektor"] = None
+                company["faza"] = "None"
+                company["punkty"] = "None"
+        except AttributeError as e:
+            logging.error(f"Błąd normalizacji sektora dla {company['ticker']}: {str(e)}")
+            company["sektor"] = None
+            company["faza"] = "None"
+            company["punkty"] = "None"
+    if not is_manual_faza and company["sektor"]:
+        faza = classify_phase(company["sektor"], company)
+        company["faza"] = faza if faza is not None else "None"
+        if faza != "None":
+            score_result = calculate_score(company["sektor"], faza, company, company_data)
+            if score_result:
+                score, score_details = score_result
+                company["punkty"] = str(round(float(score), 2)) if score is not None else "None"
+            else:
+                company["punkty"] = "None"
+        else:
+            company["punkty"] = "None"
+    return score_details
+
+
+def row_tag(company: Dict) -> str:
+    """
+    Kolor wiersza: 'red_row' – brak wskaźnika głównego i jego zastępczych, 'orange_row' – brak
+    wskaźnika głównego (są zastępcze), 'green_row' – komplet.
+    """
+    sector_config = load_sector_config(company["sektor"]) if company["sektor"] else None
+    if not sector_config or company["faza"] not in sector_config["indicators"]:
+        return "green_row"
+    phase_config = sector_config["indicators"][company["faza"]]
+    missing_main = [ind for ind in phase_config["main"] if company.get(ind) in MISSING_VALUES]
+    missing_fallback = [
+        main_ind
+        for main_ind in missing_main
+        if not any(company.get(fb["indicator"]) not in MISSING_VALUES for fb in phase_config["fallback"].get(main_ind, []))
+    ]
+    if missing_fallback:
+        return "red_row"
+    if missing_main:
+        return "orange_row"
+    return "green_row"
+
+
+def _score_tooltip(display_value: str, value, score_details: Dict) -> str:
+    tooltip_lines = [f"Punkty: {display_value}"]
+    base_score = min(float(value) - sum(score_details["bonuses"].values()), 91.0)
+    tooltip_lines.append(f"Bazowa punktacja: {base_score:.2f}/91")
+    for indicator, info in score_details["indicators"].items():
+        if info["points"] != 0:
+            penalty = " (kara za ujemną wartość)" if info.get("penalty") else ""
+            percentile = f", percentyl: {info['percentile']:.0f}" if info.get("percentile") is not None else ""
+            tooltip_lines.append(
+                f"{indicator.replace('_', ' ').title()}: {info['points']:.2f} pkt "
+                f"(wartość: {info['value']}, waga: {info['weight']}{percentile}){penalty}"
+            )
+    for bonus, points in score_details["bonuses"].items():
+        bonus_name = "Sektor" if bonus == "sector" else "Ogólna średnia" if bonus == "overall" else "Trendy"
+        tooltip_lines.append(f"Bonus za {bonus_name}: {'+' if points > 0 else ''}{points} pkt")
+    if score_details["sector_phase_avg"] == 0.0:
+        tooltip_lines.append("Ostrzeżenie: Niewystarczająca liczba spółek dla średniej sektorowej")
+    for indicator, info in score_details["indicators"].items():
+        if info.get("dynamic_thresholds"):
+            tooltip_lines.append(f"Użyto dynamicznych progów dla {indicator.replace('_', ' ').title()}")
+    if score_details["trend_details"].get("revenue_trend", {}).get("warnings"):
+        tooltip_lines.extend(score_details["trend_details"]["revenue_trend"]["warnings"])
+    tooltip_lines.append(
+        f"Podsumowanie: {base_score:.2f}/91 + {sum(score_details['bonuses'].values())} bonusy = {display_value}"
+    )
+    return "\n".join(tooltip_lines)
+
+
+def format_row(
+    company: Dict, columns: Sequence[str], col_to_json: Dict[str, str], score_details: Dict
+) -> Tuple[List[str], Dict[str, str]]:
+    """Tekst komórek wiersza i podpowiedzi (kolumna → tekst) dla spółki."""
+    values = []
+    tooltips = {}
+    for col in columns:
+        if col == "więcej":
+            display_value = "Pokaż"
+        else:
+            value = company.get(col_to_json.get(col, col))
+            if col in ["ticker", "nazwa", "sektor", "faza"]:
+                display_value = str(value) if value not in [None, "-", "NA", "N/A", "None", "nan"] else ""
+            elif col == "punkty" and value not in MISSING_VALUES:
+                display_value = f"{float(value):.2f}"
+                tooltips[col] = _score_tooltip(display_value, value, score_details)
+            else:
+                display_value = ""
+                tooltips[col] = f"Brak danych dla {col.replace('_', ' ').title()}"
+        values.append(display_value)
+    return values, tooltips
+
+
+def build_table_rows(
+    company_data: CompanyData,
+    columns: Sequence[str],
+    col_to_json: Optional[Dict[str, str]] = None,
+    save: bool = True,
+) -> List[Dict]:
+    """
+    Przelicza spółki i buduje wiersze tabeli (spółki z portfela na początku).
+    Args:
+        company_data: Obiekt CompanyData.
+        columns: Kolumny tabeli (jak MainWindow.columns).
+        col_to_json: Mapowanie kolumna → klucz danych spółki.
+        save: Czy zapisywać przeliczone spółki (jak update_table); spółka, której zapis się nie powiódł, jest pomijana.
+    Returns:
+        Lista słowników {'ticker', 'values', 'tag', 'tooltips'}.
+    """
+    col_to_json = col_to_json or {}
+    valid_sectors = valid_sector_names()
+    companies = sorted(company_data.companies, key=lambda c: c.get("is_in_portfolio", False), reverse=True)
+    rows = []
+    for company in companies:
+        score_details = refresh_company(company, company_data, valid_sectors)
+        if save and (not company.get("is_manual_sektor", False) or not company.get("is_manual_faza", False)):
+            try:
+                company_data.save_company_data(company["ticker"], company)
+            except Exception as e:
+                logging.error(f"Błąd zapisywania danych dla {company['ticker']}: {str(e)}")
+                continue
+        values, tooltips = format_row(company, columns, col_to_json, score_details)
+        rows.append({"ticker": company["ticker"], "values": values, "tag": row_tag(company), "tooltips": tooltips})
+    return rows
@@ -1,12 +1,9 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\src\core\utils.py
 import json
 import os
-from src.core.logging_config import setup_logging
 import logging
 import re
 
-setup_logging()
-
 
 def load_sector_config(sector):
     """
@@ -14,12 +14,7 @@ from src.core.utils import (
     format_float_for_editor,
 )
 from src.core.phase_classifier import classify_phase
-from src.core.logging_config import setup_logging
 from src.core.sector_mapping import normalize_sector
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-setup_logging()
 
 
 def get_sectors():
@@ -259,6 +254,9 @@ class EditWindow:
             self.history_window = tk.Toplevel(self.window)
             self.history_window.title(f"Historia: {field} ({self.company['ticker']})")
             self.history_window.geometry("600x400")
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
             fig, ax = plt.subplots(figsize=(6, 4))
             dates = [entry["date"] for entry in history]
             values = []
@@ -1,12 +1,9 @@
 # Lokalizacja: C:\Users\Msi\Desktop\Analizator\src\gui\indicator_calculator.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-from src.core.logging_config import setup_logging
 import logging
 import re
 
-# Inicjalizacja logowania
-setup_logging()
 
 def calculate_indicator(parent, indicator, fields):
     try:
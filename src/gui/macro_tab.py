@@ -2,11 +2,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from src.api.api_fetcher import fetch_data
-from src.core.logging_config import setup_logging
 import logging
 
-# Inicjalizacja logowania
-setup_logging()
 
 class MacroTab:
     def __init__(self, parent, company_data):
@@ -1,8 +1,6 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\Analizator\src\gui\main_window.py
 import tkinter as tk
 from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from src.gui.edit_window import EditWindow
 from src.gui.momentum_tab import MomentumTab
 from src.gui.macro_tab import MacroTab
@@ -10,17 +8,22 @@ from src.gui.settings_tab import SettingsTab
 from src.core.company_data import CompanyData
 from src.core.phase_classifier import classify_phase
 from src.core.scoring_calculator import calculate_score
-from src.core.utils import load_sector_config, format_number, parse_number
-from src.core.sector_mapping import normalize_sector
+from src.core.portfolio import PortfolioAnalytics
+from src.core.profiling import profiled
+from src.core.screener import ScreenerError, screen
+from src.core.table_model import build_table_rows
+from src.core.utils import format_number, parse_number
 import logging
 import json
 import os
-from typing import Optional, Dict
-from src.core.logging_config import setup_logging
+from typing import TYPE_CHECKING, Optional, Dict
 from datetime import datetime
 import re
 
-setup_logging()
+if TYPE_CHECKING:  # matplotlib ładowany leniwie – dopiero przy otwarciu wykresu
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
 
 class MainWindow:
     def __init__(self, root: tk.Tk) -> None:
@@ -62,6 +65,17 @@ class MainWindow:
         self.ticker_entry.pack(pady=10)
         self.add_button = ttk.Button(self.main_frame, text="Dodaj", command=self.add_tickers)
         self.add_button.pack(pady=5)
+        screen_frame = ttk.Frame(self.main_frame)
+        screen_frame.pack(pady=5)
+        ttk.Label(screen_frame, text="Filtr:").pack(side="left")
+        self.screen_entry = ttk.Entry(screen_frame, width=60)
+        self.screen_entry.pack(side="left", padx=5)
+        self.screen_entry.bind("<Return>", lambda event: self.apply_screen())
+        self.screen_button = ttk.Button(screen_frame, text="Filtruj", command=self.apply_screen)
+        self.screen_button.pack(side="left", padx=5)
+        self.clear_screen_button = ttk.Button(screen_frame, text="Wyczyść filtr", command=self.clear_screen)
+        self.clear_screen_button.pack(side="left", padx=5)
+        self.screen_query = ""
         self.columns = ("ticker", "nazwa", "sektor", "faza", "punkty", "więcej")
         self.tree = ttk.Treeview(self.main_frame, columns=self.columns, show="headings", selectmode="extended")
         for col in self.columns:
@@ -84,6 +98,9 @@ class MainWindow:
         style.configure("red_row.Treeview", background="red")
         style.configure("orange_row.Treeview", background="orange")
         style.configure("green_row.Treeview", background="lightgreen")
+        self.portfolio = PortfolioAnalytics()
+        self.portfolio_label = ttk.Label(self.main_frame, text="")
+        self.portfolio_label.pack(pady=2)
         button_frame = ttk.Frame(self.main_frame)
         button_frame.pack(pady=5)
         self.edit_button = ttk.Button(button_frame, text="Edytuj dane", command=self.open_edit_window)
@@ -118,8 +135,8 @@ class MainWindow:
             self.financial_inputs[field] = entry
         self.save_financial_button = ttk.Button(self.financial_frame, text="Zapisz dane", command=self.save_financial_data)
         self.save_financial_button.pack(pady=10)
-        self.fig: Optional[plt.Figure] = None
-        self.canvas: Optional[FigureCanvasTkAgg] = None
+        self.fig: Optional["Figure"] = None
+        self.canvas: Optional["FigureCanvasTkAgg"] = None
         self.current_ticker: Optional[str] = None
         self.tooltip: Optional[tk.Toplevel] = None
         self.price_plot_window: Optional[tk.Toplevel] = None
@@ -312,6 +329,7 @@ class MainWindow:
         except Exception as e:
             logging.error(f"Błąd podczas przeliczania punktacji dla {ticker}: {str(e)}")
 
+    @profiled("update_table")
     def update_table(self) -> None:
         """
         Aktualizuje tabelkę z danymi spółek, respektując ręczne zmiany sektora i fazy.
@@ -324,121 +342,20 @@ class MainWindow:
                 with open(self.column_widths_file, "r", encoding="utf-8") as f:
                     col_widths.update(json.load(f))
             self.tooltips.clear()
-            valid_sectors = {f.replace(".json", "").lower() for f in os.listdir(os.path.join("src", "core", "sectors")) if f.endswith(".json")}
-            companies = sorted(
-                self.company_data.companies,
-                key=lambda c: c.get("is_in_portfolio", False),
-                reverse=True
-            )
-            for company in companies:
-                score_details = {"used_fallbacks": {}, "bonuses": {}, "indicators": {}, "sector_phase_avg": 0.0, "sector_avg": 0.0, "trend_details": {}}
-                sector = company.get("sektor", None)
-                faza = company.get("faza", None)
-                is_manual_sektor = company.get("is_manual_sektor", False)
-                is_manual_faza = company.get("is_manual_faza", False)
-                if not is_manual_sektor and sector:
-                    try:
-                        normalized_sector = normalize_sector(sector)
-                        if normalized_sector.lower() in valid_sectors:
-                            company["sektor"] = normalized_sector
-                        else:
-                            logging.warning(f"Nieprawidłowy sektor {sector} dla {company['ticker']}, ustawiono None")
-                            company["sektor"] = None
-                            company["faza"] = "None"
-                            company["punkty"] = "None"
-                    except AttributeError as e:
-                        logging.error(f"Błąd normalizacji sektora dla {company['ticker']}: {str(e)}")
-                        company["sektor"] = None
-                        company["faza"] = "None"
-                        company["punkty"] = "None"
-                if not is_manual_faza and company["sektor"]:
-                    faza = classify_phase(company["sektor"], company)
-                    company["faza"] = faza if faza is not None else "None"
-                    if faza != "None":
-                        score_result = calculate_score(company["sektor"], faza, company, self.company_data)
-                        if score_result:
-                            score, score_details = score_result
-                            company["punkty"] = str(round(float(score), 2)) if score is not None else "None"
-                        else:
-                            company["punkty"] = "None"
-                    else:
-                        company["punkty"] = "None"
-                if not is_manual_sektor or not is_manual_faza:
-                    try:
-                        self.company_data.save_company_data(company["ticker"], company)
-                    except Exception as e:
-                        logging.error(f"Błąd zapisywania danych dla {company['ticker']}: {str(e)}")
-                        continue
-                row_tag = "green_row"
-                missing_main = []
-                missing_fallback = []
-                sector_config = load_sector_config(company["sektor"]) if company["sektor"] else None
-                main_indicators = []
-                fallback_indicators = []
-                if sector_config and company["faza"] in sector_config["indicators"]:
-                    phase_config = sector_config["indicators"][company["faza"]]
-                    main_indicators = phase_config["main"]
-                    for ind in phase_config["fallback"]:
-                        fallback_indicators.extend(fb["indicator"] for fb in phase_config["fallback"][ind])
-                for ind in main_indicators:
-                    if company.get(ind) in [None, "", "-", "NA", "N/A", "None", "nan"]:
-                        missing_main.append(ind)
-                for main_ind in missing_main:
-                    has_fallback = False
-                    for fb in phase_config["fallback"].get(main_ind, []):
-                        fb_ind = fb["indicator"]
-                        if company.get(fb_ind) not in [None, "", "-", "NA", "N/A", "None", "nan"]:
-                            has_fallback = True
-                            break
-                    if not has_fallback:
-                        missing_fallback.append(main_ind)
-                if missing_fallback:
-                    row_tag = "red_row"
-                elif missing_main:
-                    row_tag = "orange_row"
-                values = []
-                ticker = company["ticker"]
-                self.tooltips[ticker] = {}
-                for col in self.columns:
-                    if col == "więcej":
-                        display_value = "Pokaż"
-                    else:
-                        json_key = self.col_to_json.get(col, col)
-                        value = company.get(json_key)
-                        if col in ["ticker", "nazwa", "sektor", "faza"]:
-                            display_value = str(value) if value not in [None, "-", "NA", "N/A", "None", "nan"] else ""
-                        elif col == "punkty" and value not in [None, "", "-", "NA", "N/A", "None", "nan"]:
-                            display_value = f"{float(value):.2f}"
-                            tooltip_lines = [f"Punkty: {display_value}"]
-                            base_score = min(float(value) - sum(score_details["bonuses"].values()), 91.0)
-                            tooltip_lines.append(f"Bazowa punktacja: {base_score:.2f}/91")
-                            for indicator, info in score_details["indicators"].items():
-                                if info["points"] != 0:
-                                    penalty = " (kara za ujemną wartość)" if info.get("penalty") else ""
-                                    tooltip_lines.append(
-                                        f"{indicator.replace('_', ' ').title()}: {info['points']:.2f} pkt "
-                                        f"(wartość: {info['value']}, waga: {info['weight']}){penalty}"
-                                    )
-                            for bonus, points in score_details["bonuses"].items():
-                                bonus_name = "Sektor" if bonus == "sector" else "Ogólna średnia" if bonus == "overall" else "Trendy"
-                                tooltip_lines.append(f"Bonus za {bonus_name}: {'+' if points > 0 else ''}{points} pkt")
-                            if score_details["sector_phase_avg"] == 0.0:
-                                tooltip_lines.append("Ostrzeżenie: Niewystarczająca liczba spółek dla średniej sektorowej")
-                            for indicator, info in score_details["indicators"].items():
-                                if info.get("dynamic_thresholds"):
-                                    tooltip_lines.append(f"Użyto dynamicznych progów dla {indicator.replace('_', ' ').title()}")
-                            if score_details["trend_details"].get("revenue_trend", {}).get("warnings"):
-                                tooltip_lines.extend(score_details["trend_details"]["revenue_trend"]["warnings"])
-                            tooltip_lines.append(f"Podsumowanie: {base_score:.2f}/91 + {sum(score_details['bonuses'].values())} bonusy = {display_value}")
-                            self.tooltips[ticker][col] = "\n".join(tooltip_lines)
-                        else:
-                            display_value = ""
-                            self.tooltips[ticker][col] = f"Brak danych dla {col.replace('_', ' ').title()}"
-                    values.append(display_value)
-                item_id = self.tree.insert("", tk.END, values=values, tags=row_tag)
-                logging.debug(f"Wstawiono dane do tabelki dla {company.get('ticker')}: {values}, tag: {row_tag}")
-                for col in self.columns:
-                    self.tree.column(col, width=col_widths.get(col, 100))
+            rows = build_table_rows(self.company_data, self.columns, self.col_to_json)
+            if self.screen_query:
+                matched = {company["ticker"] for company in screen(self.company_data, self.screen_query, sort_by=None)}
+                rows = [row for row in rows if row["ticker"] in matched]
+            debug = logging.getLogger().isEnabledFor(logging.DEBUG)  # wartości wierszy logujemy tylko w trybie DEBUG
+            for row in rows:
+                self.tooltips[row["ticker"]] = row["tooltips"]
+                self.tree.insert("", tk.END, values=row["values"], tags=row["tag"])
+                if debug:
+                    logging.debug("Wstawiono dane do tabelki dla %s: %s, tag: %s", row["ticker"], row["values"], row["tag"])
+            for col in self.columns:
+                self.tree.column(col, width=col_widths.get(col, 100))
+            self.portfolio.sync(self.company_data.companies)
+            self.portfolio_label.config(text=self.portfolio.format_summary())
             self.update_ticker_combobox()
             logging.info(f"Zaktualizowano tabelkę z {len(self.company_data.companies)} spółkami")
         except Exception as e:
@@ -448,6 +365,25 @@ class MainWindow:
             else:
                 messagebox.showerror("Błąd", "Nie udało się zaktualizować tabelki!")
 
+    def apply_screen(self) -> None:
+        """Filtruje tabelkę zapytaniem z pola „Filtr” (np. 'sektor = Technology and roe > 15 and punkty > 70')."""
+        query = self.screen_entry.get().strip()
+        if query:
+            try:
+                screen(self.company_data, query, sort_by=None)
+            except ScreenerError as e:
+                logging.warning(f"Nieprawidłowe zapytanie filtra '{query}': {str(e)}")
+                messagebox.showerror("Błąd", f"Nieprawidłowe zapytanie: {str(e)}")
+                return
+        self.screen_query = query
+        self.update_table()
+
+    def clear_screen(self) -> None:
+        """Usuwa filtr tabelki."""
+        self.screen_entry.delete(0, tk.END)
+        self.screen_query = ""
+        self.update_table()
+
     def on_tab_change(self, event: tk.Event) -> None:
         """Ukrywa tooltip i okna wykresów przy zmianie zakładki."""
         self.hide_tooltip()
@@ -714,6 +650,9 @@ class MainWindow:
             self.price_plot_window.wm_geometry("600x200+100+100")
             self.price_plot_window.title(f"Wykres cenowy: {self.current_ticker}")
             self.price_plot_window.bind("<Button-1>", self.hide_price_plot_window)
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
             self.fig, self.ax = plt.subplots(figsize=(6, 2))
             history = self.company_data.load_company_history(self.current_ticker)
             dates = [entry["date"] for entry in history]
@@ -752,6 +691,9 @@ class MainWindow:
             self.score_plot_window.wm_geometry("600x200+100+100")
             self.score_plot_window.title(f"Wykres punktacji: {self.current_ticker}")
             self.score_plot_window.bind("<Button-1>", self.hide_score_plot_window)
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
             self.fig, self.ax = plt.subplots(figsize=(6, 2))
             history = self.company_data.load_company_history(self.current_ticker)
             dates = [entry["date"] for entry in history]
@@ -799,6 +741,9 @@ class MainWindow:
                 "revenue", "market_cap", "free_cash_flow_margin", "roe",
                 "debt_equity", "profit_margin", "cash_ratio"
             ]
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
             fig, axes = plt.subplots(len(indicators), 1, figsize=(8, len(indicators) * 2))
             if len(indicators) == 1:
                 axes = [axes]
@@ -3,9 +3,7 @@ import tkinter as tk
 from tkinter import ttk
 import logging
 from src.core.scoring_calculator import calculate_score
-from src.core.logging_config import setup_logging
 
-setup_logging()
 
 class MomentumTab:
     def __init__(self, parent: ttk.Frame, company_data, update_table_callback):
@@ -4,7 +4,8 @@ from tkinter import ttk, messagebox
 import os
 from dotenv import load_dotenv, find_dotenv
 from dotenv import set_key
-from src.core.logging_config import setup_logging
+from src.core import profiling
+from src.core.logging_config import set_log_level
 import logging
 
 class SettingsTab:
@@ -25,6 +26,14 @@ class SettingsTab:
         self.log_level_combo = ttk.Combobox(self.parent, values=["DEBUG", "INFO", "ERROR"], state="readonly", textvariable=self.log_level_var)
         self.log_level_combo.pack(pady=5)
         self.log_level_combo.bind("<<ComboboxSelected>>", self.update_log_level)
+
+        # Profilowanie (update_table, fetch_data, calculate_score, save_company_data)
+        self.profiling_mode_var = tk.StringVar(value="cprofile")
+        self.profiling_mode_combo = ttk.Combobox(self.parent, values=list(profiling.MODES), state="readonly", textvariable=self.profiling_mode_var)
+        self.profiling_mode_combo.pack(pady=5)
+        self.profiling_var = tk.BooleanVar(value=profiling.is_enabled())
+        self.profiling_check = ttk.Checkbutton(self.parent, text="Profilowanie", variable=self.profiling_var, command=self.toggle_profiling)
+        self.profiling_check.pack(pady=5)
         
         # Limity requestów
         self.request_limit_entry = ttk.Entry(self.parent, width=50)
@@ -48,12 +57,26 @@ class SettingsTab:
     def update_log_level(self, event):
         try:
             level = self.log_level_var.get()
-            setup_logging(level)
+            set_log_level(level)
             messagebox.showinfo("Sukces", f"Poziom logowania zmieniony na {level}!")
         except Exception as e:
             logging.error(f"Błąd zmiany poziomu logowania: {str(e)}")
             messagebox.showerror("Błąd", f"Nie udało się zmienić poziomu logowania: {str(e)}")
     
+    def toggle_profiling(self):
+        try:
+            if self.profiling_var.get():
+                profiling.enable(self.profiling_mode_var.get())
+                self.profiling_mode_combo.configure(state="disabled")
+                messagebox.showinfo("Sukces", f"Włączono profilowanie ({self.profiling_mode_var.get()})")
+            else:
+                path = profiling.disable()
+                self.profiling_mode_combo.configure(state="readonly")
+                messagebox.showinfo("Sukces", f"Zapisano wyniki profilowania: {path}" if path else "Wyłączono profilowanie")
+        except Exception as e:
+            logging.error(f"Błąd przełączania profilowania: {str(e)}")
+            messagebox.showerror("Błąd", f"Nie udało się przełączyć profilowania: {str(e)}")
+
     def save_request_limit(self):
         try:
             input_str = self.request_limit_entry.get()
@@ -0,0 +1,23 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\conftest.py
+import pytest
+
+from src.api.singleflight import get_singleflight
+from src.core.score_cache import get_score_cache, get_threshold_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_singleflight_memo():
+    """Odpowiedzi HTTP zapamiętane w jednym teście nie mogą zastąpić mocków w kolejnym."""
+    get_singleflight().forget()
+    yield
+    get_singleflight().forget()
+
+
+@pytest.fixture(autouse=True)
+def _clear_score_cache():
+    """Wyniki punktacji i progi zapamiętane w jednym teście nie mogą zastąpić mocków w kolejnym."""
+    get_score_cache().invalidate()
+    get_threshold_cache().invalidate()
+    yield
+    get_score_cache().invalidate()
+    get_threshold_cache().invalidate()
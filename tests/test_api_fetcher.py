@@ -1,5 +1,6 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\Analizator\tests\test_api_fetcher.py
 import pytest
+import pandas as pd
 from unittest.mock import patch, Mock
 from src.api.api_fetcher import (
     fetch_from_yfinance,
@@ -47,8 +48,13 @@ def test_fetch_from_yfinance_success():
             "operatingCashflow": 1000000000
         }
         mock_ticker.return_value.history.return_value = Mock(empty=False, __getitem__=lambda x, y: {"Close": [150.0]})
-        mock_ticker.return_value.quarterly_financials = Mock(empty=False, iterrows=lambda: [(None, {"Total Revenue": 1000000000})])
-        mock_ticker.return_value.financials = Mock(empty=False, iterrows=lambda: [(None, {"Total Revenue": 2000000000})])
+        # układ yfinance: pozycje w indeksie, okresy w kolumnach
+        mock_ticker.return_value.quarterly_financials = pd.DataFrame(
+            {pd.Timestamp("2023-12-31"): [1000000000, 400000000]}, index=["Total Revenue", "Gross Profit"]
+        )
+        mock_ticker.return_value.financials = pd.DataFrame(
+            {pd.Timestamp("2023-09-30"): [2000000000, 800000000]}, index=["Total Revenue", "Gross Profit"]
+        )
         result = fetch_from_yfinance("AAPL")
         assert result["nazwa"] == "Apple Inc."
         assert result["sektor"] == "Technology"
@@ -56,8 +62,8 @@ def test_fetch_from_yfinance_success():
         assert result["revenue_growth"] == "20.00"
         assert result["ebitda_margin"] == "30.00"
         assert result["market_cap"] == "2000.00B"
-        assert result["revenue"] == "2000.00B"
-        assert result["quarterly_revenue"][0]["revenue"] == "1000.00m"
+        assert result["revenue"] == "2000000000.00"
+        assert result["quarterly_revenue"][0]["revenue"] == 1000000000.0
 
 def test_fetch_from_alpha_vantage_success():
     """Testuje pobieranie danych z Alpha Vantage dla wszystkich pól."""
@@ -180,29 +186,31 @@ def test_fetch_from_finnhub_success():
 def test_fetch_from_yahooquery_success():
     """Testuje pobieranie danych z YahooQuery dla wszystkich pól."""
     with patch("yahooquery.Ticker") as mock_ticker:
-        mock_ticker.return_value.summary_profile = {"AAPL": {"sector": "Technology"}}
-        mock_ticker.return_value.financial_data = {"AAPL": {
-            "marketCap": 2000000000000,
-            "ebitdaMargin": 0.3,
-            "returnOnInvestedCapital": 0.15,
-            "currentPrice": 150.0,
-            "trailingPE": 25.0,
-            "forwardPE": 20.0,
-            "quickRatio": 1.0,
-            "cashRatio": 0.5,
-            "cashFlowToDebtRatio": 0.3,
-            "earningsGrowth": 0.15,
-            "interestCoverage": 10.0
-        }}
-        mock_ticker.return_value.key_stats = {"AAPL": {
-            "priceToBook": 10.0,
-            "priceToSales": 5.0,
-            "trailingEps": 5.0
+        mock_ticker.return_value.get_modules.return_value = {"AAPL": {
+            "summaryProfile": {"sector": "Technology"},
+            "financialData": {
+                "marketCap": 2000000000000,
+                "ebitdaMargin": 0.3,
+                "returnOnInvestedCapital": 0.15,
+                "currentPrice": 150.0,
+                "trailingPE": 25.0,
+                "forwardPE": 20.0,
+                "quickRatio": 1.0,
+                "cashRatio": 0.5,
+                "cashFlowToDebtRatio": 0.3,
+                "earningsGrowth": 0.15,
+                "interestCoverage": 10.0
+            },
+            "defaultKeyStatistics": {
+                "priceToBook": 10.0,
+                "priceToSales": 5.0,
+                "trailingEps": 5.0
+            },
         }}
-        mock_ticker.return_value.income_statement.return_value = Mock(
-            empty=False,
-            iterrows=lambda: [(("AAPL", "2023-12-31"), {"TotalRevenue": 1000000000})],
-            __getitem__=lambda x, y: [1000000000]
+        # układ yahooquery: okresy w wierszach
+        mock_ticker.return_value.get_financial_data.return_value = pd.DataFrame(
+            {"asOfDate": [pd.Timestamp("2023-12-31")], "periodType": ["3M"], "TotalRevenue": [1000000000]},
+            index=["AAPL"],
         )
         result = fetch_from_yahooquery("AAPL")
         assert result["nazwa"] is None
@@ -210,7 +218,7 @@ def test_fetch_from_yahooquery_success():
         assert result["cena"] == "150.00"
         assert result["ebitda_margin"] == "30.00"
         assert result["market_cap"] == "2000.00B"
-        assert result["quarterly_revenue"][0]["revenue"] == "1000.00m"
+        assert result["quarterly_revenue"][0]["revenue"] == 1000000000.0
 
 def test_fetch_from_marketwatch_failure():
     """Testuje błąd pobierania danych z MarketWatch."""
@@ -224,4 +232,23 @@ def test_fetch_from_investing_failure():
     with patch("src.api.scraper.scrape_investing") as mock_scrape:
         mock_scrape.side_effect = Exception("Błąd scrapowania")
         result = fetch_from_investing("AAPL")
-        assert result == {}
\ No newline at end of file
+        assert result == {}
+
+
+def test_statement_revenue_reads_only_needed_periods():
+    """Przychody bez iterrows: układ yfinance (pozycje w indeksie) i yahooquery (okresy w wierszach, bez TTM)."""
+    from src.api.api_fetcher import _statement_revenue
+
+    dates = pd.to_datetime(["2024-06-30", "2024-03-31", "2023-12-31", "2023-09-30", "2023-06-30"])
+    yf_frame = pd.DataFrame([[5.0, 4.0, None, 2.0, 1.0], [9.0] * 5], index=["Total Revenue", "Net Income"], columns=dates)
+    result = _statement_revenue(yf_frame, "Total Revenue", 3)
+    assert [r["revenue"] for r in result] == [5.0, 4.0, 2.0]
+    assert result[0]["date"].startswith("2024-06-30")
+
+    yq_frame = pd.DataFrame({
+        "asOfDate": pd.to_datetime(["2023-12-31", "2024-03-31", "2024-06-30", "2024-06-30"]),
+        "periodType": ["3M", "3M", "3M", "TTM"],
+        "TotalRevenue": [1.0, 2.0, 3.0, 6.0],
+    })
+    assert [r["revenue"] for r in _statement_revenue(yq_frame, "TotalRevenue", 2)] == [3.0, 2.0]
+    assert _statement_revenue(None, "Total Revenue", 4) == []
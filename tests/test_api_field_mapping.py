@@ -1,6 +1,6 @@
 # ŚCIEŻKA: C:\Users\Msi\Desktop\Analizator\tests\test_api_field_mapping.py
 import pytest
-from src.api.api_field_mapping import map_api_fields
+from src.api.api_field_mapping import map_api_fields, map_api_fields_batch
 from src.core.logging_config import setup_logging
 
 @pytest.fixture
@@ -67,4 +67,25 @@ def test_map_api_fields_invalid_data(setup_logging_fixture):
     result = map_api_fields("yfinance", data)
     assert result["nazwa"] is None
     assert result["sektor"] is None
-    assert result["cena"] is None
\ No newline at end of file
+    assert result["cena"] is None
+
+def test_map_api_fields_batch_matches_single_calls():
+    """Wariant wsadowy zwraca to samo co pojedyncze wywołania, w kolejności wejścia."""
+    payloads = [
+        ("yfinance", {"longName": "Apple Inc.", "sector": "Technology", "revenueGrowth": 0.2, "marketCap": 2e12}),
+        ("FMP", {"companyName": "Microsoft", "price": 410.5, "revenue": 2e11, "freeCashFlow": 5e10}),
+        ("Finnhub", {"c": "N/A", "ebitdaMarginTTM": 35}),
+        ("yfinance", None),
+    ]
+    results = map_api_fields_batch(payloads)
+    assert results == [map_api_fields(name, data) for name, data in payloads]
+    assert results[1]["free_cash_flow_margin"] == "25.00"
+    assert results[2]["cena"] is None and results[2]["ebitda_margin"] == "35.00"
+    assert results[3] == {}
+
+
+def test_map_api_fields_returns_fresh_revenue_lists():
+    """Listy przychodów nie mogą być współdzielone między wynikami (szablon kompilowany raz)."""
+    first = map_api_fields("yfinance", {})
+    first["quarterly_revenue"].append({"date": "2024-06-30", "revenue": 1.0})
+    assert map_api_fields("yfinance", {})["quarterly_revenue"] == []
@@ -0,0 +1,151 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_async_scraper.py
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.api import async_scraper
+from src.api.async_scraper import AsyncScraper, parse_retry_after
+from src.api.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from src.api.provider_health import ProviderHealthRegistry
+from src.api.provider_planner import ProviderPlanner
+from tests.test_scraper import MARKETWATCH_HTML
+
+
+def _response(status, text="", headers=None):
+    return MagicMock(status_code=status, text=text, headers=headers or {})
+
+
+class FakeSession:
+    """Sesja zwracająca odpowiedzi z kolejki (lub funkcji) i mierząca współbieżność per domena."""
+
+    def __init__(self, responder, delay=0.0):
+        self.responder = responder
+        self.delay = delay
+        self.calls = []
+        self.active = {}
+        self.max_active = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        domain = url.split("/")[2]
+        with self._lock:
+            self.calls.append(url)
+            self.active[domain] = self.active.get(domain, 0) + 1
+            self.max_active[domain] = max(self.max_active.get(domain, 0), self.active[domain])
+        time.sleep(self.delay)
+        with self._lock:
+            self.active[domain] -= 1
+        return self.responder(url)
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412500.0) == pytest.approx(10.0)
+
+
+def test_circuit_breaker_opens_and_probes_half_open():
+    now = [0.0]
+    breaker = CircuitBreaker("x", failure_threshold=2, recovery_timeout=30, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow_request()
+    now[0] = 31.0
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() and not breaker.allow_request()  # tylko jedno żądanie próbne
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    now[0] = 62.0
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_fetch_honors_retry_after_then_succeeds():
+    responses = iter([_response(429, headers={"Retry-After": "0.2"}), _response(200, MARKETWATCH_HTML)])
+    session = FakeSession(lambda url: next(responses))
+    scraper = AsyncScraper(min_delay=0, jitter=0, session=session)
+    start = time.perf_counter()
+    data = asyncio.run(scraper.scrape("AAPL", "marketwatch"))
+    assert data["company_name"] == "Apple Inc."
+    assert len(session.calls) == 2
+    assert time.perf_counter() - start >= 0.2
+
+
+def test_long_retry_after_opens_domain_breaker_for_remaining_tickers():
+    """Zablokowana domena nie jest odpytywana dla kolejnych tickerów; druga domena działa dalej."""
+    def responder(url):
+        if "marketwatch" in url:
+            return _response(429, headers={"Retry-After": "3600"})
+        return _response(200, "<h1 class='instrument-header_title__GTWDv'>X</h1>")
+
+    session = FakeSession(responder)
+    scraper = AsyncScraper(max_per_domain=1, min_delay=0, jitter=0, session=session)
+    results = asyncio.run(scraper.scrape_many(["A", "B", "C", "D"]))
+    assert sum("marketwatch" in url for url in session.calls) == 1
+    assert all(results[t]["marketwatch"] == {} for t in "ABCD")
+    assert all(results[t]["investing"]["company_name"] == "X" for t in "ABCD")
+
+
+def test_concurrency_is_limited_per_domain():
+    session = FakeSession(lambda url: _response(200, MARKETWATCH_HTML), delay=0.05)
+    scraper = AsyncScraper(max_per_domain=2, min_delay=0, jitter=0, session=session)
+    asyncio.run(scraper.scrape_many([f"T{i}" for i in range(8)]))
+    assert max(session.max_active.values()) <= 2
+    assert len(session.calls) == 16
+
+
+def test_fetch_data_async_mode_uses_prefetched_pages():
+    """W trybie async fetch_data pobiera strony raz, współbieżnie, zamiast fetch_from_marketwatch/investing."""
+    from src.api import api_fetcher
+
+    scraped = {"AAPL": {"marketwatch": {"company_name": "Apple Inc.", "pe_ratio": "30"}, "investing": {}}}
+    providers = ["fetch_from_yfinance", "fetch_from_fmp", "fetch_from_alpha_vantage",
+                 "fetch_from_finnhub", "fetch_from_yahooquery"]
+    patches = [patch(f"src.api.api_fetcher.{name}", return_value={}) for name in providers]
+    for p in patches:
+        p.start()
+    try:
+        with patch.object(async_scraper, "scrape_tickers", return_value=scraped) as mock_scrape, \
+                patch("src.api.scraper.scrape_marketwatch") as mock_sync:
+            results, _ = api_fetcher.fetch_data(
+                ["AAPL"], scrape_mode="async", health_registry=ProviderHealthRegistry(),
+                planner=ProviderPlanner(path=None),
+            )
+    finally:
+        for p in patches:
+            p.stop()
+    mock_scrape.assert_called_once()
+    mock_sync.assert_not_called()
+    assert results["AAPL"]["nazwa"] == "Apple Inc."
+
+
+def test_scrape_tickers_shares_breakers_between_calls():
+    """Kolejne wywołania scrape_tickers (np. fetch_data per ticker w trybie wsadowym) dzielą bezpieczniki domen."""
+    session = FakeSession(lambda url: _response(500))
+    shared = AsyncScraper(max_retries=0, failure_threshold=1, min_delay=0, jitter=0, session=session)
+    with patch.object(async_scraper, "_SCRAPER", shared):
+        async_scraper.scrape_tickers(["AAPL"], sources=["marketwatch"])
+        assert async_scraper.scrape_tickers(["MSFT"], sources=["marketwatch"]) == {"MSFT": {"marketwatch": {}}}
+    assert len(session.calls) == 1
+    assert shared.breakers[session.calls[0].split("/")[2]].state == OPEN
+
+
+def test_not_found_in_half_open_does_not_leak_probe():
+    """404 dla tickera w stanie półotwartym zamyka obwód domeny – kolejne tickery są pobierane."""
+    session = FakeSession(lambda url: _response(404) if "BAD" in url.upper() else _response(200, MARKETWATCH_HTML))
+    scraper = AsyncScraper(max_retries=0, min_delay=0, jitter=0, session=session)
+    url = async_scraper.SOURCES["marketwatch"][0]
+    now = [0.0]
+    breaker = CircuitBreaker("mw", failure_threshold=1, recovery_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 11.0
+    scraper.breakers[url.format(ticker="X").split("/")[2]] = breaker
+    assert asyncio.run(scraper.scrape("BAD", "marketwatch")) == {}
+    assert breaker.state == CLOSED
+    assert asyncio.run(scraper.scrape("AAPL", "marketwatch"))
@@ -0,0 +1,90 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_batch_cli.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from unittest.mock import patch
+from src.cli import batch
+from src.core.logging_config import setup_logging
+
+
+@pytest.fixture
+def setup_logging_fixture():
+    setup_logging()
+
+
+def _fake_fetch(tickers, parent=None, data_type="company", **kwargs):
+    t = tickers[0].upper()
+    if t == "FAIL":
+        return {}, {t: ["all"]}
+    return {t: {"ticker": t, "nazwa": f"{t} Inc.", "sektor": None, "cena": "10.00"}}, {t: ["roe"]}
+
+
+def test_read_ticker_file(tmp_path):
+    path = tmp_path / "tickers.txt"
+    path.write_text("aapl, msft\n# komentarz\nnvda  # trailing\n", encoding="utf-8")
+    assert batch.read_ticker_file(str(path)) == ["AAPL", "MSFT", "NVDA"]
+
+
+def test_batch_success_writes_results_and_report(setup_logging_fixture, tmp_path):
+    out = tmp_path / "wyniki.json"
+    report = tmp_path / "raport.json"
+    with patch("src.api.api_fetcher.fetch_data", side_effect=_fake_fetch):
+        code = batch.main(["AAPL", "MSFT", "--data-dir", str(tmp_path / "data"),
+                           "-j", "2", "-o", str(out), "-r", str(report)])
+    assert code == 0
+    results = json.loads(out.read_text(encoding="utf-8"))
+    assert [r["ticker"] for r in results] == ["AAPL", "MSFT"]
+    assert results[0]["nazwa"] == "AAPL Inc."
+    assert results[0]["missing_keys"] == ["roe"]
+    summary = json.loads(report.read_text(encoding="utf-8"))
+    assert summary["succeeded"] == 2 and summary["failed"] == 0
+    saved = json.loads((tmp_path / "data" / "AAPL.json").read_text(encoding="utf-8"))
+    assert saved[-1]["cena"] == "10.00"
+
+
+def test_batch_failure_exit_code(setup_logging_fixture, tmp_path):
+    out = tmp_path / "wyniki.csv"
+    with patch("src.api.api_fetcher.fetch_data", side_effect=_fake_fetch):
+        code = batch.main(["AAPL", "FAIL", "--data-dir", str(tmp_path / "data"), "-o", str(out)])
+    assert code == 1
+    content = out.read_text(encoding="utf-8")
+    assert "FAIL,failed" in content
+
+
+def test_batch_merges_worker_metrics_and_records_run_once(tmp_path):
+    from src.api.fetch_metrics import FetchMetrics
+    from src.core.company_data import CompanyData
+
+    seen = []
+
+    def fetch(tickers, data_type="company", metrics=None, **kwargs):
+        seen.append(metrics)
+        metrics.record_provider_call("yfinance", 0.1, 1)
+        return _fake_fetch(tickers, data_type=data_type)
+
+    metrics = FetchMetrics()
+    with patch("src.api.api_fetcher.fetch_data", side_effect=fetch), \
+            patch.object(metrics, "record_run", wraps=metrics.record_run) as record_run:
+        batch.run_batch(["AAPL", "MSFT"], CompanyData(data_dir=str(tmp_path)), workers=2, metrics=metrics)
+    assert len({id(m) for m in seen}) == 2 and metrics not in seen
+    record_run.assert_called_once()
+    summary = metrics.summary()
+    assert summary["tickers"] == 2
+    assert summary["providers"]["yfinance"]["calls"] == 2
+
+
+def test_incremental_flag_is_passed_to_fetch_data(setup_logging_fixture, tmp_path, monkeypatch):
+    monkeypatch.delenv("REFRESH_MODE", raising=False)
+    with patch("src.api.api_fetcher.fetch_data", side_effect=_fake_fetch) as fetch:
+        batch.main(["AAPL", "--data-dir", str(tmp_path / "data"), "--incremental"])
+    assert fetch.call_args.kwargs["refresh_mode"] == "incremental"
+    assert "REFRESH_MODE" not in os.environ
+
+
+def test_batch_does_not_import_gui_modules():
+    code = "import sys, src.cli.batch; print('tkinter' in sys.modules or 'matplotlib' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip().splitlines()[-1] == "False"
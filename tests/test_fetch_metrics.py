@@ -0,0 +1,92 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_fetch_metrics.py
+import json
+from contextlib import ExitStack
+from unittest.mock import Mock, patch
+
+from src.api import api_fetcher
+from src.api.fetch_metrics import FetchMetrics, collecting, current_metrics
+from src.api.key_pool import KeyPool
+from src.api.provider_health import ProviderHealthRegistry
+from src.api.provider_planner import ProviderPlanner
+
+PROVIDERS = ["fetch_from_yfinance", "fetch_from_fmp", "fetch_from_alpha_vantage", "fetch_from_finnhub",
+             "fetch_from_yahooquery", "fetch_from_marketwatch", "fetch_from_investing"]
+
+
+def test_summary_aggregates_requests_and_merges():
+    metrics = FetchMetrics()
+    metrics.record_request("FMP", "profile", 0.03, status=200, size=120, retries=1)
+    metrics.record_request("FMP", "profile", 0.7, status=429)
+    metrics.record_cache_hit("FMP", "profile")
+    metrics.record_provider_call("FMP", 0.8, keys_filled=5)
+    metrics.record_rate_limit_sleep("FMP", 1.5)
+    other = FetchMetrics()
+    other.record_request("Finnhub", "quote", 0.2, error=True)
+    other.record_run(tickers=2, seconds=3.0)
+    metrics.merge(other)
+
+    summary = metrics.summary()
+    profile = summary["providers"]["FMP"]["endpoints"]["profile"]
+    assert profile["requests"] == 2 and profile["cache_hits"] == 1
+    assert profile["bytes"] == 120 and profile["retries"] == 1
+    assert profile["statuses"] == {"200": 1, "429": 1}
+    assert profile["latency"]["buckets"] == {"<=0.05s": 1, "<=1s": 1}
+    assert summary["providers"]["Finnhub"]["endpoints"]["quote"]["statuses"] == {"error": 1}
+    assert summary["totals"]["requests"] == 3
+    assert summary["totals"]["keys_filled"] == 5
+    assert summary["totals"]["rate_limit_sleep_seconds"] == 1.5
+    assert summary["tickers"] == 2
+
+
+def test_export_json_writes_file_and_appends_lines(tmp_path):
+    metrics = FetchMetrics()
+    metrics.record_provider_call("yfinance", 0.5, keys_filled=3)
+    path = tmp_path / "metrics.json"
+    metrics.export_json(str(path))
+    assert json.loads(path.read_text(encoding="utf-8"))["totals"]["provider_calls"] == 1
+    trend = tmp_path / "metrics.jsonl"
+    metrics.export_json(str(trend), append=True)
+    metrics.export_json(str(trend), append=True)
+    assert len(trend.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_get_records_requests_and_shared_responses():
+    metrics = FetchMetrics()
+    response = Mock(status_code=200, content=b'{"price": 1}')
+    response.raw.retries.history = (Mock(),)
+    with patch.object(api_fetcher, "_get_session") as mock_session, collecting(metrics):
+        mock_session.return_value.get.return_value = response
+        api_fetcher._get("FMP", "quote", "AAPL", "https://example.test/quote/AAPL")
+        api_fetcher._get("FMP", "quote", "aapl", "https://example.test/quote/AAPL")
+    assert current_metrics() is None
+    quote = metrics.summary()["providers"]["FMP"]["endpoints"]["quote"]
+    assert quote["requests"] == 1 and quote["cache_hits"] == 1
+    assert quote["bytes"] == 12 and quote["retries"] == 1
+
+
+def test_key_pool_wait_is_recorded_as_rate_limit_sleep():
+    now = [0.0]
+    pool = KeyPool("Finnhub", ["k1"], limit=1, period=10, clock=lambda: now[0],
+                   sleep=lambda seconds: now.__setitem__(0, now[0] + seconds))
+    metrics = FetchMetrics()
+    with collecting(metrics):
+        assert pool.acquire() == "k1"
+        assert pool.acquire() == "k1"
+    assert metrics.summary()["providers"]["Finnhub"]["rate_limit_sleep_seconds"] > 0
+
+
+def test_fetch_data_returns_metrics_with_filled_keys():
+    with ExitStack() as stack:
+        for name in PROVIDERS:
+            stack.enter_context(patch(f"src.api.api_fetcher.{name}", return_value={}))
+        stack.enter_context(patch("src.api.api_fetcher.fetch_from_yfinance",
+                                  return_value={"nazwa": "Apple Inc.", "cena": "150.00"}))
+        results, missing, metrics = api_fetcher.fetch_data(
+            ["AAPL"], health_registry=ProviderHealthRegistry(), planner=ProviderPlanner(path=None),
+            return_metrics=True,
+        )
+    assert results["AAPL"]["nazwa"] == "Apple Inc."
+    summary = metrics.summary()
+    assert summary["tickers"] == 1
+    assert summary["providers"]["yfinance"]["keys_filled"] == 2
+    assert summary["totals"]["provider_calls"] == len(PROVIDERS)
@@ -0,0 +1,110 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_key_pool.py
+import threading
+from collections import Counter
+from unittest.mock import MagicMock, patch
+
+from src.api import api_keys, key_pool
+from src.api.key_pool import KeyPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_keys_rotate_and_budget_scales_with_key_count():
+    clock = FakeClock()
+    pool = KeyPool("Finnhub", ["k1", "k2", "k3"], limit=60, period=60, clock=clock, sleep=clock.sleep)
+    used = Counter(pool.acquire(cost=4) for _ in range(45))  # 3 klucze × 15 wywołań po 4 żądania
+    assert used == {"k1": 15, "k2": 15, "k3": 15}
+    assert clock.now == 0.0  # w budżecie – bez czekania
+    assert pool.acquire(cost=4) is not None
+    assert clock.now > 0.0  # budżet wyczerpany – czekanie na uzupełnienie
+
+
+def test_rate_limited_key_is_retired_until_retry_after():
+    clock = FakeClock()
+    pool = KeyPool("FMP", ["k1", "k2"], limit=100, period=60, clock=clock, sleep=clock.sleep)
+    pool.report("k1", 429, retry_after=30)
+    assert {pool.acquire() for _ in range(10)} == {"k2"}
+    pool.report("k2", 403)
+    assert pool.acquire(max_wait=0) is None
+    clock.now = 31.0
+    assert pool.acquire(max_wait=0) == "k1"
+
+
+def test_acquire_returns_none_when_all_keys_retired_beyond_max_wait():
+    clock = FakeClock()
+    pool = KeyPool("Alpha Vantage", ["k1"], limit=5, period=60, clock=clock, sleep=clock.sleep)
+    pool.report("k1", 401)
+    assert pool.acquire(max_wait=10) is None
+
+
+def test_report_responses_reads_retry_after_header():
+    clock = FakeClock()
+    pool = KeyPool("Finnhub", ["k1"], limit=60, period=60, clock=clock, sleep=clock.sleep)
+    ok = MagicMock(status_code=200)
+    limited = MagicMock(status_code=429, headers={"Retry-After": "5"})
+    pool.report_responses("k1", [ok, limited])
+    assert pool.snapshot()[0]["retired_for"] == 5.0
+
+
+def test_concurrent_acquire_never_exceeds_budget():
+    pool = KeyPool("Finnhub", ["k1", "k2"], limit=10, period=3600)
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        key = pool.acquire(max_wait=0)
+        with lock:
+            results.append(key)
+
+    threads = [threading.Thread(target=worker) for _ in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert Counter(results) == {"k1": 10, "k2": 10, None: 10}
+
+
+def test_pool_reads_numbered_env_keys_and_falls_back_to_test_key(monkeypatch):
+    monkeypatch.setenv("FMP_API_KEY", "base")
+    monkeypatch.setenv("FMP_API_KEY_1", "one")
+    monkeypatch.setenv("FMP_API_KEY_2", "base")  # duplikat
+    assert api_keys._get_keys_from_env("FMP_API_KEY") == ["base", "one"]
+    for i in range(1, 6):
+        monkeypatch.delenv(f"FINNHUB_API_KEY_{i}", raising=False)
+    monkeypatch.delenv("FINNHUB_API_KEY", raising=False)
+    key_pool.reset_key_pools()
+    try:
+        assert len(key_pool.get_key_pool("FMP")) == 2
+        finnhub = key_pool.get_key_pool("Finnhub")
+        assert finnhub.limit is None and finnhub.acquire() == "TEST"
+        assert key_pool.get_key_pool("Finnhub") is finnhub
+        monkeypatch.setenv("FINNHUB_API_KEY", "saved")  # klucz zapisany w Ustawieniach (load_dotenv)
+        finnhub = key_pool.get_key_pool("Finnhub")
+        assert finnhub.limit == 60 and finnhub.acquire() == "saved"
+    finally:
+        key_pool.reset_key_pools()
+
+
+def test_finnhub_fetch_uses_pool_key_and_retires_it_on_429():
+    from src.api import api_fetcher
+
+    pool = KeyPool("Finnhub", ["k1", "k2"], limit=60, period=60)
+    response = MagicMock(status_code=429, headers={"Retry-After": "120"})
+    with patch.object(api_fetcher, "get_key_pool", return_value=pool), \
+            patch.object(api_fetcher, "_get_session") as mock_session:
+        mock_session.return_value.get.return_value = response
+        api_fetcher.fetch_from_finnhub("AAPL")
+        first_key = mock_session.return_value.get.call_args[0][0].rsplit("token=", 1)[1]
+        api_fetcher.fetch_from_finnhub("MSFT")
+        second_key = mock_session.return_value.get.call_args[0][0].rsplit("token=", 1)[1]
+    assert {first_key, second_key} == {"k1", "k2"}
+    assert all(entry["rate_limited"] == 1 for entry in pool.snapshot())
@@ -33,4 +33,60 @@ def test_logging_config_debug(setup_logging_fixture):
         assert "Testowy debug" in content
     with open(errors_only_log, "r", encoding="utf-8") as f:
         content = f.read()
-        assert "Testowy debug" not in content
\ No newline at end of file
+        assert "Testowy debug" not in content
+
+@pytest.fixture
+def fresh_logging(tmp_path, monkeypatch):
+    from src.core import logging_config
+    monkeypatch.setattr(logging_config, "_IS_CONFIGURED", False)
+    monkeypatch.setenv("ERROR_LOG_PATH", str(tmp_path / "error.log"))
+    monkeypatch.setenv("ERRORS_ONLY_LOG_PATH", str(tmp_path / "errors_only.log"))
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    root.handlers = []
+    yield tmp_path
+    logging_config.shutdown_logging()
+    for handler in root.handlers:
+        handler.close()
+    root.handlers = handlers
+    root.setLevel(level)
+
+
+def test_production_profile_logs_through_queue(fresh_logging):
+    from logging.handlers import QueueHandler
+    from src.core.logging_config import set_log_level, shutdown_logging
+    setup_logging(logging.INFO, profile="production")
+    assert [h for h in logging.getLogger().handlers if isinstance(h, QueueHandler)]
+    assert not [h for h in logging.getLogger().handlers if isinstance(h, logging.FileHandler)]
+    logging.debug("Pominięty debug")
+    logging.error("Błąd w tle")
+    set_log_level("DEBUG")
+    assert logging.getLogger().level == logging.DEBUG
+    logging.debug("Debug po zmianie poziomu")
+    shutdown_logging()
+    content = (fresh_logging / "error.log").read_text(encoding="utf-8")
+    assert "Błąd w tle" in content and "Debug po zmianie poziomu" in content
+    assert "Pominięty debug" not in content
+    assert "Błąd w tle" in (fresh_logging / "errors_only.log").read_text(encoding="utf-8")
+
+
+def test_production_profile_defaults_to_info_and_skips_debug_formatting(fresh_logging):
+    from src.core.logging_config import shutdown_logging
+
+    class Payload:
+        formatted = 0
+
+        def __repr__(self):
+            Payload.formatted += 1
+            return "payload"
+
+        __str__ = __repr__
+
+    setup_logging(profile="production")
+    assert logging.getLogger().level == logging.INFO
+    logging.debug("Duży payload: %s", Payload())
+    logging.info("Informacja")
+    shutdown_logging()
+    assert Payload.formatted == 0
+    content = (fresh_logging / "error.log").read_text(encoding="utf-8")
+    assert "Informacja" in content and "payload" not in content
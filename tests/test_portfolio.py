@@ -0,0 +1,63 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_portfolio.py
+import pytest
+
+from src.core.portfolio import PortfolioAnalytics, revenue_growth
+
+
+def _company(ticker, sektor="Technology", in_portfolio=True, **values):
+    company = {"ticker": ticker, "sektor": sektor, "is_in_portfolio": in_portfolio}
+    company.update(values)
+    return company
+
+
+@pytest.fixture
+def companies():
+    return [
+        _company("AAPL", punkty=80, pe_ratio="20", market_cap="3000",
+                 yearly_revenue=[{"date": "2024", "revenue": 100}, {"date": "2023", "revenue": 80}]),
+        _company("JPM", sektor="Financials", punkty=60, pe_ratio="10", market_cap="1000",
+                 yearly_revenue=[{"date": "2023", "revenue": 100}, {"date": "2024", "revenue": 90}]),
+        _company("KO", in_portfolio=False, punkty=99, pe_ratio="5"),
+    ]
+
+
+def test_revenue_growth_uses_two_latest_dated_values():
+    assert revenue_growth([{"date": "2024", "revenue": 110}, {"date": "2023", "revenue": 100}]) == pytest.approx(10.0)
+    assert revenue_growth([{"date": "2024", "revenue": None}]) is None
+    assert revenue_growth(None) is None
+
+
+def test_summary_aggregates_flagged_companies(companies):
+    portfolio = PortfolioAnalytics()
+    assert portfolio.sync(companies) == 2
+    summary = portfolio.summary()
+    assert summary["holdings"] == 2
+    assert summary["weighted_score"] == 70.0
+    assert summary["sector_exposure"] == {"Technology": 50.0, "Financials": 50.0}
+    assert summary["valuation"]["pe_ratio"] == pytest.approx(13.33)  # średnia harmoniczna
+    assert summary["valuation"]["market_cap"] == 4000.0
+    assert summary["revenue_trends"]["yearly"] == {"growth": 7.5, "growing": 1, "declining": 1}
+    assert "Portfel: 2 spółek" in portfolio.format_summary()
+
+    weighted = PortfolioAnalytics("market_cap")
+    weighted.sync(companies)
+    assert weighted.summary()["weighted_score"] == 75.0
+
+
+def test_sync_updates_only_changed_holdings(companies):
+    portfolio = PortfolioAnalytics()
+    portfolio.sync(companies)
+    updates = portfolio.updates
+    assert portfolio.sync(companies) == 0
+    companies[0]["punkty"] = 90
+    companies[2]["is_in_portfolio"] = True
+    assert portfolio.sync(companies) == 2
+    assert portfolio.updates == updates + 2
+    assert portfolio.tickers() == ["AAPL", "JPM", "KO"]
+    companies[1]["is_in_portfolio"] = False
+    portfolio.update_holding(companies[1])
+    assert portfolio.summary()["weighted_score"] == pytest.approx(94.5)
+    for ticker in portfolio.tickers():
+        portfolio.remove_holding(ticker)
+    assert portfolio.summary()["valuation"]["market_cap"] is None
+    assert portfolio.format_summary() == "Portfel: brak spółek"
@@ -0,0 +1,67 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_profiling.py
+import time
+
+import pytest
+
+from src.core import profiling
+
+
+@pytest.fixture(autouse=True)
+def no_session():
+    profiling.disable()
+    yield
+    profiling.disable()
+
+
+@profiling.profiled("outer")
+def _outer(n):
+    return sum(_inner(i) for i in range(n))
+
+
+@profiling.profiled("inner")
+def _inner(i):
+    return i * 2
+
+
+def test_profiled_is_transparent_when_disabled():
+    assert _outer(3) == 6
+    assert profiling.current_session() is None
+
+
+def test_cprofile_session_writes_dump_and_summary(tmp_path):
+    session = profiling.enable("cprofile", output_dir=str(tmp_path), top_n=50)
+    assert _outer(4) == 12
+    rows = {row[0]: row for row in session.timing_rows()}
+    assert rows["outer"][1] == 1 and rows["inner"][1] == 4
+    assert any("_inner" in row[0] for row in session.hotspot_rows())
+    path = profiling.disable()
+    assert path.endswith(".txt")
+    assert "outer" in open(path, encoding="utf-8").read()
+    assert list(tmp_path.glob("*.prof"))
+    assert not profiling.is_enabled()
+
+
+def test_sampling_session_collects_stacks(tmp_path):
+    session = profiling.enable("sampling", output_dir=str(tmp_path), interval=0.001)
+
+    @profiling.profiled("busy")
+    def busy():
+        end = time.perf_counter() + 0.05
+        while time.perf_counter() < end:
+            pass
+
+    busy()
+    profiling.disable()
+    assert session.timing_rows()[0][0] == "busy"
+    assert any("busy" in row[0] for row in session.hotspot_rows())
+    assert not list(tmp_path.glob("*.prof")) and list(tmp_path.glob("*.txt"))
+
+
+def test_enable_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("PROFILE", "0")
+    assert profiling.enable_from_env() is None
+    monkeypatch.setenv("PROFILE", "sampling")
+    assert profiling.enable_from_env().mode == "sampling"
+    with pytest.raises(ValueError):
+        profiling.ProfilingSession("perf")
@@ -0,0 +1,99 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_provider_health.py
+from contextlib import ExitStack
+from unittest.mock import Mock, patch
+
+from src.api import api_fetcher
+from src.api.key_pool import KeysExhausted
+from src.api.provider_health import ProviderHealthRegistry
+from src.api.provider_planner import ProviderPlanner
+
+PROVIDERS = ["fetch_from_yfinance", "fetch_from_fmp", "fetch_from_alpha_vantage", "fetch_from_finnhub",
+             "fetch_from_yahooquery", "fetch_from_marketwatch", "fetch_from_investing"]
+
+
+def _run_fetch(tickers, registry, overrides):
+    """Uruchamia fetch_data z podmienionymi fetcherami (domyślnie zwracają {})."""
+    with ExitStack() as stack:
+        mocks = {
+            name: stack.enter_context(patch(f"src.api.api_fetcher.{name}", **overrides.get(name, {"return_value": {}})))
+            for name in PROVIDERS
+        }
+        results, missing = api_fetcher.fetch_data(
+            tickers, health_registry=registry, planner=ProviderPlanner(path=None)
+        )
+    return results, missing, mocks
+
+
+def test_open_circuit_skips_failing_provider_for_remaining_tickers():
+    """Po serii błędów dostawca nie jest już wywoływany dla kolejnych tickerów."""
+    registry = ProviderHealthRegistry(failure_threshold=3, recovery_timeout=600)
+    tickers = ["AAA", "BBB", "CCC", "DDD", "EEE"]
+    results, _, mocks = _run_fetch(
+        tickers,
+        registry,
+        {
+            "fetch_from_yfinance": {"side_effect": ConnectionError("HTTP 503")},
+            "fetch_from_fmp": {"side_effect": lambda t, dt: {"nazwa": f"{t} Inc.", "cena": 10.0}},
+        },
+    )
+    assert mocks["fetch_from_yfinance"].call_count == 3
+    assert mocks["fetch_from_fmp"].call_count == 5
+    assert all(results[t]["nazwa"] == f"{t} Inc." for t in tickers)
+    assert registry.snapshot()["yfinance"]["state"] == "open"
+
+
+def test_empty_responses_do_not_open_circuit():
+    """Brak danych dla tickera (np. nieobsługiwany symbol) nie jest awarią dostawcy."""
+    registry = ProviderHealthRegistry(failure_threshold=3, recovery_timeout=600)
+    _, _, mocks = _run_fetch(["AAA", "BBB", "CCC", "DDD"], registry, {})
+    assert mocks["fetch_from_yfinance"].call_count == 4
+    assert registry.snapshot()["yfinance"]["state"] == "closed"
+
+
+def test_http_errors_count_as_provider_failures():
+    """429/5xx z _get oznaczają awarię dostawcy, nawet gdy fetcher zwraca pusty wynik."""
+    def fetch(ticker, data_type):
+        api_fetcher._get("FMP", "profile", ticker, f"https://example.test/{ticker}")
+        return {}
+
+    registry = ProviderHealthRegistry(failure_threshold=2, recovery_timeout=600)
+    with patch.object(api_fetcher, "_get_session") as session:
+        session.return_value.get.return_value = Mock(status_code=503, content=b"", raw=None)
+        _run_fetch(["AAA", "BBB", "CCC"], registry, {"fetch_from_fmp": {"side_effect": fetch}})
+    assert registry.snapshot()["FMP"]["state"] == "open"
+
+
+def test_degraded_provider_is_queried_last():
+    registry = ProviderHealthRegistry(failure_threshold=100)
+    for _ in range(5):
+        registry.record("yfinance", False, 2.0)
+        registry.record("FMP", True, 0.1)
+    assert registry.order(["yfinance", "FMP", "Finnhub"]) == ["FMP", "Finnhub", "yfinance"]
+
+
+def test_unsupported_data_type_is_not_counted_as_failure():
+    """Dostawcy nieobsługujący typu danych (np. 'etf' dla FMP) nie są wywoływani ani karani."""
+    registry = ProviderHealthRegistry(failure_threshold=1)
+    with ExitStack() as stack:
+        mocks = {name: stack.enter_context(patch(f"src.api.api_fetcher.{name}", return_value={})) for name in PROVIDERS}
+        api_fetcher.fetch_data(
+            ["SPY"], data_type="etf", health_registry=registry, planner=ProviderPlanner(path=None)
+        )
+    assert mocks["fetch_from_fmp"].call_count == 0
+    assert mocks["fetch_from_yfinance"].call_count == 1
+    assert "FMP" not in registry.snapshot()
+
+
+def test_exhausted_keys_release_half_open_probe():
+    """KeysExhausted w stanie półotwartym nie blokuje obwodu – następne wywołanie jest próbą."""
+    now = [0.0]
+    registry = ProviderHealthRegistry(failure_threshold=1, recovery_timeout=10, clock=lambda: now[0])
+    registry.record("FMP", False, 0.1)
+    now[0] += 11
+    fmp = {"side_effect": KeysExhausted("FMP: wyczerpany limit")}
+    _, _, mocks = _run_fetch(["AAPL"], registry, {"fetch_from_fmp": fmp})
+    assert mocks["fetch_from_fmp"].call_count == 1
+    assert registry.snapshot()["FMP"]["state"] == "half_open"
+    _, _, mocks = _run_fetch(["MSFT"], registry, {"fetch_from_fmp": {"return_value": {"nazwa": "MSFT", "cena": 1.0}}})
+    assert mocks["fetch_from_fmp"].call_count == 1
+    assert registry.snapshot()["FMP"]["state"] == "closed"
@@ -0,0 +1,98 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_provider_planner.py
+from contextlib import ExitStack
+from unittest.mock import Mock, patch
+
+from src.api import api_fetcher
+from src.api.provider_health import ProviderHealthRegistry
+from src.api.provider_planner import DECAY_HALF_LIFE, MIN_SAMPLES, ProviderPlanner
+
+KEYS = ["nazwa", "cena", "pe_ratio", "roe"]
+
+
+def _train(planner, provider, data, latency, times=MIN_SAMPLES + 5):
+    for _ in range(times):
+        planner.record(provider, KEYS, data, latency)
+
+
+def test_plan_prefers_expected_fill_per_second():
+    planner = ProviderPlanner(path=None)
+    full = {key: 1 for key in KEYS}
+    _train(planner, "slow", full, 2.0)
+    _train(planner, "fast", full, 0.2)
+    assert planner.plan(["slow", "fast"], KEYS)[0] == "fast"
+
+
+def test_excluded_provider_recovers_after_decay(tmp_path):
+    """Dostawca pominięty po serii pustych odpowiedzi wraca do planu po czasie i odzyskuje pozycję po trafieniach."""
+    now = [1_000_000.0]
+    path = tmp_path / "provider_stats.json"
+    planner = ProviderPlanner(path=str(path), clock=lambda: now[0])
+    _train(planner, "FMP", {}, 0.1, times=30)
+    assert planner.plan(["FMP"], KEYS) == []
+    planner.save()
+
+    now[0] += DECAY_HALF_LIFE / 4
+    reloaded = ProviderPlanner(path=str(path), clock=lambda: now[0])
+    assert reloaded.plan(["FMP"], KEYS) == ["FMP"]
+    _train(reloaded, "FMP", {key: 1 for key in KEYS}, 0.1, times=3)
+    assert reloaded.plan(["FMP"], KEYS) == ["FMP"]
+
+
+def test_stats_persist_between_runs(tmp_path):
+    path = tmp_path / "provider_stats.json"
+    planner = ProviderPlanner(path=str(path))
+    planner.record("FMP", KEYS, {"nazwa": "Apple", "cena": 1.0}, 0.5)
+    planner.save()
+    reloaded = ProviderPlanner(path=str(path))
+    assert reloaded.samples("FMP") == 1
+    assert reloaded.fill_rate("FMP", "nazwa") > reloaded.fill_rate("FMP", "roe")
+
+
+def test_fetch_data_orders_providers_per_ticker_from_history():
+    """fetch_data odpytuje najpierw dostawcę, który wg historii wypełnia brakujące klucze najtaniej."""
+    planner = ProviderPlanner(path=None)
+    calls = []
+
+    def fake(name, payload):
+        def fetch(ticker, data_type):
+            calls.append(name)
+            return payload
+        return fetch
+
+    names = {"fetch_from_yfinance": "yfinance", "fetch_from_fmp": "FMP", "fetch_from_alpha_vantage": "Alpha Vantage",
+             "fetch_from_finnhub": "Finnhub", "fetch_from_yahooquery": "yahooquery",
+             "fetch_from_marketwatch": "MarketWatch", "fetch_from_investing": "Investing"}
+    for provider in names.values():
+        _train(planner, provider, {}, 0.5, times=30)
+    planner.stats["Finnhub"]["fill"] = {}  # brak historii dla kluczy → eksploracja z priorytetem
+    with ExitStack() as stack:
+        for func, provider in names.items():
+            payload = {"nazwa": "Apple Inc.", "cena": 190.0} if provider == "Finnhub" else {}
+            stack.enter_context(patch(f"src.api.api_fetcher.{func}", side_effect=fake(provider, payload)))
+        results, _ = api_fetcher.fetch_data(
+            ["AAPL"], health_registry=ProviderHealthRegistry(), planner=planner
+        )
+    assert calls[0] == "Finnhub"
+    assert results["AAPL"]["nazwa"] == "Apple Inc."
+
+
+def test_exhausted_key_budget_is_not_recorded_as_provider_failure():
+    """Pominięcie dostawcy z braku budżetu kluczy nie trafia do zdrowia, planera ani metryk."""
+    planner = ProviderPlanner(path=None)
+    health = ProviderHealthRegistry()
+    pool = Mock()
+    pool.acquire.return_value = None
+    others = ["fetch_from_yfinance", "fetch_from_alpha_vantage", "fetch_from_finnhub", "fetch_from_yahooquery",
+              "fetch_from_marketwatch", "fetch_from_investing"]
+    with ExitStack() as stack:
+        stack.enter_context(patch("src.api.api_fetcher.get_key_pool", return_value=pool))
+        for func in others:
+            stack.enter_context(patch(f"src.api.api_fetcher.{func}", return_value={}))
+        _, missing, metrics = api_fetcher.fetch_data(
+            ["AAPL"], health_registry=health, planner=planner, return_metrics=True
+        )
+    pool.acquire.assert_called_once()
+    assert "AAPL" in missing
+    assert planner.samples("FMP") == 0
+    assert health.snapshot()["FMP"]["samples"] == 0
+    assert "FMP" not in metrics.summary()["providers"]
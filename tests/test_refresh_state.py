@@ -0,0 +1,121 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_refresh_state.py
+from contextlib import ExitStack
+from datetime import date
+from unittest.mock import Mock, patch
+
+from src.api import api_fetcher
+from src.api.key_pool import KeyPool
+from src.api.provider_health import ProviderHealthRegistry
+from src.api.provider_planner import ProviderPlanner
+from src.api.refresh_state import RefreshState
+
+PROVIDERS = ["fetch_from_yfinance", "fetch_from_fmp", "fetch_from_alpha_vantage", "fetch_from_finnhub",
+             "fetch_from_yahooquery", "fetch_from_marketwatch", "fetch_from_investing"]
+
+QUARTERLY = [{"date": "2024-06-30", "revenue": "1.00B"}, {"date": "2024-03-31", "revenue": "0.90B"}]
+
+
+def _state(**entry):
+    state = RefreshState(path=None)
+    state.tickers["AAPL"] = entry
+    return state
+
+
+def test_needs_statements_follows_reporting_calendar():
+    assert RefreshState(path=None).needs_statements("AAPL")  # brak stanu
+    state = _state(last_period="2024-06-30", refreshed="2024-08-05")
+    assert not state.needs_statements("AAPL", today=date(2024, 9, 1))
+    # kwartał + opóźnienie publikacji po 2024-06-30 → spodziewany nowy okres
+    assert state.needs_statements("AAPL", today=date(2024, 10, 30))
+    # zapamiętana data wyników wcześniejsza niż kalendarz
+    state.tickers["AAPL"]["next_earnings"] = "2024-08-20"
+    assert state.needs_statements("AAPL", today=date(2024, 8, 21))
+
+
+def test_record_keeps_previous_statements_when_refresh_returned_nothing():
+    state = RefreshState(path=None)
+    state.record("AAPL", {"quarterly_revenue": QUARTERLY, "revenue": "4.00B"}, True, today=date(2024, 8, 5))
+    assert state.tickers["AAPL"]["last_period"] == "2024-06-30"
+    state.record("AAPL", {"quarterly_revenue": [], "revenue": None}, True, today=date(2024, 11, 5))
+    assert state.cached_statements("AAPL")["revenue"] == "4.00B"
+    assert state.tickers["AAPL"]["refreshed"] == "2024-08-05"
+    assert state.is_new_period("AAPL", "2024-09-30") and not state.is_new_period("AAPL", "2024-06-30")
+
+
+def _run(state, yfinance_data):
+    """fetch_data w trybie przyrostowym; zwraca wyniki i listę wartości `statements` przekazanych do yfinance."""
+    calls = []
+
+    def yfinance(ticker, data_type, statements=True):
+        calls.append(statements)
+        return dict(yfinance_data(statements))
+
+    with ExitStack() as stack:
+        for name in PROVIDERS:
+            stack.enter_context(patch(f"src.api.api_fetcher.{name}", return_value={}))
+        stack.enter_context(patch("src.api.api_fetcher.fetch_from_yfinance", side_effect=yfinance))
+        results, _ = api_fetcher.fetch_data(
+            ["AAPL"], health_registry=ProviderHealthRegistry(), planner=ProviderPlanner(path=None),
+            refresh_mode="incremental", refresh_state=state,
+        )
+    return results, calls
+
+
+def test_incremental_refresh_reuses_statements_between_earnings():
+    state = RefreshState(path=None)
+    full = {"nazwa": "Apple Inc.", "cena": "150.00", "quarterly_revenue": QUARTERLY, "revenue": "4.00B"}
+    results, calls = _run(state, lambda statements: full)
+    assert calls == [True]
+    assert state.tickers["AAPL"]["last_period"] == "2024-06-30"
+
+    quote_only = {"nazwa": "Apple Inc.", "cena": "155.00", "latest_period": "2024-06-30"}
+    results, calls = _run(state, lambda statements: full if statements else quote_only)
+    assert calls == [False]
+    assert results["AAPL"]["cena"] == "155.00"
+    assert results["AAPL"]["revenue"] == "4.00B"
+    assert results["AAPL"]["quarterly_revenue"] == QUARTERLY
+
+
+def test_incremental_refresh_reuses_fmp_statement_ratios():
+    """Pola, które FMP wylicza ze sprawozdań, są uzupełniane ze stanu, gdy sprawozdań nie pobieramy."""
+    ratios = {"operating_margin": 0.3, "profit_margin": 0.25, "current_ratio": 1.1, "roe": 1.5,
+              "quick_ratio": 0.9, "cash_flow_to_debt_ratio": 1.2}
+    state = RefreshState(path=None)
+    full = {"nazwa": "Apple Inc.", "quarterly_revenue": QUARTERLY, "revenue": "4.00B", **ratios}
+    _run(state, lambda statements: full)
+    results, calls = _run(state, lambda statements: full if statements else {"nazwa": "Apple Inc."})
+    assert calls == [False]
+    assert {key: results["AAPL"][key] for key in ratios} == ratios
+
+
+def test_incremental_refresh_repulls_statements_when_new_period_detected():
+    state = RefreshState(path=None)
+    state.record("AAPL", {"quarterly_revenue": QUARTERLY, "revenue": "4.00B"}, True)
+    new_quarter = [{"date": "2024-09-30", "revenue": "1.10B"}] + QUARTERLY
+    results, calls = _run(
+        state,
+        lambda statements: {"nazwa": "Apple Inc.", "quarterly_revenue": new_quarter, "revenue": "4.20B"}
+        if statements else {"nazwa": "Apple Inc.", "latest_period": "2024-09-30"},
+    )
+    assert calls == [False, True]
+    assert results["AAPL"]["revenue"] == "4.20B"
+    assert state.tickers["AAPL"]["last_period"] == "2024-09-30"
+
+
+def test_fmp_without_statements_skips_statement_endpoints():
+    pool = KeyPool("FMP", ["DUMMY"])
+    quote = Mock(status_code=200, json=lambda: [{"price": 150.0, "earningsAnnouncement": "2024-10-31T20:00:00.000+0000"}])
+    with patch.object(api_fetcher, "get_key_pool", return_value=pool), \
+            patch.object(api_fetcher, "_get_session") as mock_session:
+        mock_session.return_value.get.side_effect = [
+            Mock(status_code=200, json=lambda: [{"companyName": "Apple Inc.", "mktCap": 2000000000000}]),
+            quote,
+            Mock(status_code=200, json=lambda: []),
+            Mock(status_code=200, json=lambda: []),
+        ]
+        result = api_fetcher.fetch_from_fmp("AAPL", statements=False)
+    urls = [call[0][0] for call in mock_session.return_value.get.call_args_list]
+    assert len(urls) == 4
+    assert not any("statement" in url for url in urls)
+    assert result["nazwa"] == "Apple Inc."
+    assert result["next_earnings"] == "2024-10-31"
@@ -0,0 +1,80 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_replay.py
+import pytest
+
+from src.api import api_fetcher
+from src.api.provider_health import ProviderHealthRegistry
+from src.api.provider_planner import ProviderPlanner
+from src.api.replay import Cassette, ReplayError, ReplayProvider, recording, replaying
+
+QUARTERLY = [{"date": "2024-06-30", "revenue": "1.00B"}]
+
+
+def _cassette():
+    cassette = Cassette()
+    cassette.put("yfinance", "company", "AAPL", {"nazwa": "Apple Inc.", "cena": "150.00",
+                                                 "quarterly_revenue": QUARTERLY}, 0.8)
+    cassette.put("FMP", "company", "MSFT", {"nazwa": "Microsoft Corporation"}, 0.5)
+    return cassette
+
+
+def test_cassette_round_trip(tmp_path):
+    path = str(tmp_path / "cassette.json")
+    cassette = _cassette()
+    cassette.save(path)
+    loaded = Cassette(path)
+    assert loaded.get("yfinance", "company", "aapl")["data"]["cena"] == "150.00"
+    assert loaded.tickers() == ["AAPL", "MSFT"]
+
+
+def test_replay_latency_and_statements():
+    sleeps = []
+    provider = ReplayProvider(_cassette(), latency_scale=0.5, sleep=sleeps.append)
+    data = provider.fetch("yfinance", "AAPL")
+    assert data["quarterly_revenue"] == QUARTERLY
+    assert "quarterly_revenue" not in provider.fetch("yfinance", "AAPL", statements=False)
+    assert provider.fetch("FMP", "AAPL") == {}
+    assert sleeps == [0.4, 0.4]
+    provider = ReplayProvider(_cassette(), latency={"FMP": 2.0}, sleep=sleeps.append)
+    provider.fetch("FMP", "MSFT")
+    assert sleeps[-1] == 2.0
+
+
+def test_error_injection_is_deterministic():
+    def failures(seed):
+        provider = ReplayProvider(_cassette(), error_rate=0.5, seed=seed, sleep=lambda s: None)
+        outcome = []
+        for _ in range(20):
+            try:
+                provider.fetch("yfinance", "AAPL")
+                outcome.append(False)
+            except ReplayError:
+                outcome.append(True)
+        return outcome
+
+    assert failures(1) == failures(1)
+    assert 0 < sum(failures(1)) < 20
+    provider = ReplayProvider(_cassette(), error_rate={"FMP": 1.0}, sleep=lambda s: None)
+    with pytest.raises(ReplayError):
+        provider.fetch("FMP", "MSFT")
+    assert provider.fetch("yfinance", "AAPL")
+
+
+def test_fetch_data_runs_offline_with_aliased_tickers():
+    original = api_fetcher.fetch_from_yfinance
+    with replaying(_cassette(), latency_scale=0, alias_unknown=True) as provider:
+        results, _ = api_fetcher.fetch_data(
+            ["AAPL", "ZZZ1", "ZZZ2"], health_registry=ProviderHealthRegistry(), planner=ProviderPlanner(path=None),
+        )
+    assert api_fetcher.fetch_from_yfinance is original
+    assert results["AAPL"]["cena"] == "150.00"
+    assert all(results[t]["nazwa"] for t in ("ZZZ1", "ZZZ2"))
+    assert provider.stats["errors"] == 0 and provider.stats["calls"] > 0
+
+
+def test_recording_captures_provider_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_fetcher, "fetch_from_finnhub",
+                        lambda ticker, data_type="company", statements=True: {"cena": "10.00"})
+    path = str(tmp_path / "cassette.json")
+    with recording(path):
+        api_fetcher.fetch_from_finnhub("AAPL", "company")
+    assert Cassette(path).get("Finnhub", "company", "AAPL")["data"] == {"cena": "10.00"}
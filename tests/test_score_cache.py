@@ -0,0 +1,98 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_score_cache.py
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.core.company_data import CompanyData
+from src.core.score_cache import ScoreCache, input_fingerprint
+from src.core.scoring_calculator import calculate_dynamic_thresholds, calculate_score, sector_thresholds
+
+RESULT = (50.0, {"used_fallbacks": {}, "bonuses": {}, "indicators": {}, "sector_phase_avg": 0.0,
+                 "sector_avg": 0.0, "trend_details": {}})
+
+
+@pytest.fixture
+def company_data(tmp_path):
+    data = CompanyData(data_dir=str(tmp_path))
+    data.save_company_data("AAPL", {"ticker": "AAPL", "sektor": "Technology", "roe": "10", "punkty": None})
+    return data
+
+
+def test_lru_eviction_and_invalidation():
+    cache = ScoreCache(max_entries=2)
+    cache.put(("A", 1), 1)
+    cache.put(("B", 1), 2)
+    assert cache.get(("A", 1)) == 1
+    cache.put(("C", 1), 3)
+    assert cache.get(("B", 1)) is None
+    cache.invalidate("a")
+    assert cache.get(("A", 1)) is None and cache.get(("C", 1)) == 3
+    cache.invalidate()
+    assert cache.stats() == {"hits": 2, "misses": 2, "evictions": 1, "size": 0}
+
+
+def test_fingerprint_ignores_score_and_display_fields():
+    base = {"ticker": "AAPL", "roe": "10", "quarterly_revenue": [{"revenue": 1.0}]}
+    decorated = {"punkty": 70, "indicator_color_roe": "red", "is_manual_roe": True, **base}
+    assert input_fingerprint(base) == input_fingerprint(decorated)
+    assert input_fingerprint(base) != input_fingerprint({**base, "roe": "11"})
+
+
+def test_calculate_score_reuses_result_until_inputs_change(company_data):
+    company = company_data.get_company("AAPL")
+    with patch("src.core.scoring_calculator._calculate_score", return_value=RESULT) as compute:
+        assert calculate_score("Technology", "Wzrost", company, company_data) == RESULT
+        score, details = calculate_score("Technology", "Wzrost", company, company_data)
+        assert compute.call_count == 1
+        details["bonuses"]["sector"] = 5  # kopia – modyfikacja nie psuje pamięci
+        assert calculate_score("Technology", "Wzrost", company, company_data) == RESULT
+
+        calculate_score("Technology", "Dojrzałość", company, company_data)
+        calculate_score("Technology", "Wzrost", {**company, "roe": "12"}, company_data)
+        assert compute.call_count == 3
+
+        company_data.save_company_data("AAPL", {**company, "punkty": 50.0})  # zmiana średnich sektora
+        calculate_score("Technology", "Wzrost", company, company_data)
+        company_data.save_company_data("AAPL", {**company, "punkty": 50.0})  # ten sam zapis – bez zmian
+        calculate_score("Technology", "Wzrost", company, company_data)
+        assert compute.call_count == 4
+
+        company_data.delete_company("AAPL")
+        calculate_score("Technology", "Wzrost", company, company_data)
+        assert compute.call_count == 5
+
+
+def test_calculate_score_without_versioned_data_is_not_cached():
+    with patch("src.core.scoring_calculator._calculate_score", return_value=RESULT) as compute:
+        calculate_score("Technology", "Wzrost", {"ticker": "AAPL"}, Mock())
+        calculate_score("Technology", "Wzrost", {"ticker": "AAPL"}, Mock())
+    assert compute.call_count == 2
+
+
+CONFIG = {
+    "indicators": {"Wzrost": {"main": ["roe"], "fallback": {"roe": [{"indicator": "profit_margin", "weight": 0.5}]}}},
+    "scoring_thresholds": {"Wzrost": {"roe": [{"threshold": 5, "points": 10, "condition": ">"},
+                                              {"threshold": 10, "points": 20, "condition": ">"},
+                                              {"threshold": 20, "points": 30, "condition": ">"}]}},
+}
+
+
+def test_sector_thresholds_computed_once_per_sector_version(company_data):
+    for ticker, roe in (("MSFT", "20"), ("GOOG", "30")):
+        company_data.save_company_data(ticker, {"ticker": ticker, "sektor": "Technology", "roe": roe})
+    for company in company_data.companies:
+        company_data.save_company_data(company["ticker"], {**company, "faza": "Wzrost"})
+    with patch("src.core.scoring_calculator.calculate_dynamic_thresholds", wraps=calculate_dynamic_thresholds) as averages:
+        averages_, thresholds = sector_thresholds("Technology", "Wzrost", CONFIG, company_data)
+        assert [t["threshold"] for t in thresholds["roe"]] == [15.0, 20.0, 30.0]
+        assert sector_thresholds("Technology", "Wzrost", CONFIG, company_data)[1] is thresholds
+
+        company = company_data.get_company("MSFT")
+        company_data.save_company_data("MSFT", {**company, "punkty": 80.0})
+        company_data.save_company_data("KO", {"ticker": "KO", "sektor": "Financials", "roe": "5"})
+        sector_thresholds("Technology", "Wzrost", CONFIG, company_data)
+        assert averages.call_count == 1
+
+        company_data.save_company_data("MSFT", {**company, "roe": "25"})
+        sector_thresholds("Technology", "Wzrost", CONFIG, company_data)
+        assert averages.call_count == 2
@@ -0,0 +1,77 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_scraper.py
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from src.api import scraper
+
+MARKETWATCH_HTML = """
+<html><head><script>var x = "<small>EPS</small>";</script></head><body>
+<h1 class="company__name">Apple Inc.</h1>
+<h2><bg-quote class="value" field="Last">227.52</bg-quote></h2>
+<ul>
+  <li><small class="label">P/E Ratio</small><span class="secondary">ttm</span><span class="primary">34.62</span></li>
+  <li><small class="label">EPS</small><span class="primary">$6.57</span></li>
+  <li><small class="label">Sector</small><span class="primary">Technology</span></li>
+</ul>
+</body></html>
+"""
+
+INVESTING_HTML = """
+<html><body>
+<h1 class="text-2xl instrument-header_title__GTWDv">Apple Inc (AAPL)</h1>
+<div class="instrument-price_instrument-price__3uw25 flex">227.52</div>
+<dl>
+  <div><dt><span>Sector</span></dt><dd><span>Technology</span></dd></div>
+  <div><dt><span>P/E Ratio</span></dt><dd><span>34.6</span></dd></div>
+  <div><dt><span>EPS</span></dt><dd><span>6.57</span></dd></div>
+</dl>
+</body></html>
+"""
+
+
+def test_parse_marketwatch_extracts_quote_and_key_data():
+    """Jedno przejście po przefiltrowanym dokumencie zwraca te same pola co wcześniejsze find/find_next."""
+    assert scraper.parse_marketwatch(MARKETWATCH_HTML) == {
+        "company_name": "Apple Inc.",
+        "current_price": "227.52",
+        "pe_ratio": "34.62",
+        "eps": "$6.57",
+        "sector": "Technology",
+    }
+
+
+def test_parse_investing_extracts_quote_and_key_data():
+    assert scraper.parse_investing(INVESTING_HTML) == {
+        "company_name": "Apple Inc (AAPL)",
+        "current_price": "227.52",
+        "sector": "Technology",
+        "pe_ratio": "34.6",
+        "eps": "6.57",
+    }
+
+
+def test_parse_falls_back_to_html_parser(monkeypatch):
+    """Bez lxml scraper działa na wbudowanym html.parser."""
+    monkeypatch.setattr(scraper, "_parser", "html.parser")
+    assert scraper.parse_marketwatch(MARKETWATCH_HTML)["pe_ratio"] == "34.62"
+
+
+def test_scrape_reuses_pooled_session():
+    """Kolejne strony pobierane są przez jedną sesję z pulą połączeń (bez nowego handshake'u)."""
+    response = MagicMock(status_code=200, text=MARKETWATCH_HTML)
+    with patch("requests.Session.get", return_value=response) as mock_get:
+        first = scraper.scrape_marketwatch("AAPL")
+        second = scraper.scrape_marketwatch("MSFT")
+    assert first["company_name"] == "Apple Inc."
+    assert second["current_price"] == "227.52"
+    assert mock_get.call_count == 2
+    assert scraper._get_session() is scraper._get_session()
+    assert mock_get.call_args_list[0].args[0].endswith("/investing/stock/AAPL")
+
+
+def test_scrape_returns_empty_dict_on_http_error():
+    response = MagicMock()
+    response.raise_for_status.side_effect = requests.HTTPError("403 Forbidden")
+    with patch("requests.Session.get", return_value=response):
+        assert scraper.scrape_investing("AAPL") == {}
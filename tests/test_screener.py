@@ -0,0 +1,92 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_screener.py
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from src.cli import screen as screen_cli
+from src.core.company_data import CompanyData
+from src.core.screener import Condition, ScreenerError, parse_query, screen, universe_index
+
+
+def _company(ticker, sektor="Technology", faza="Wzrost", **values):
+    company = {"ticker": ticker, "nazwa": f"{ticker} Inc.", "sektor": sektor, "faza": faza, "punkty": None}
+    company.update(values)
+    return company
+
+
+@pytest.fixture
+def universe():
+    company_data = Mock()
+    company_data.companies = [
+        _company("AAPL", roe="30", debt_equity="0.5", punkty=80),
+        _company("MSFT", roe="20", debt_equity="1.5", punkty=90),
+        _company("NVDA", roe="50", debt_equity=None, punkty=75),
+        _company("JPM", sektor="Financials", faza="Dojrzałość", roe="15", debt_equity="0.8", punkty=70),
+        _company("KO", faza="Dojrzałość", roe="N/A", debt_equity="0.2", punkty=None, is_in_portfolio=True),
+    ]
+    return company_data
+
+
+def test_parse_query_supports_aliases_lists_and_quotes():
+    conditions = parse_query("sector = 'Technology', phase in (Wzrost, Dojrzałość) and score >= 70 AND roe != 0")
+    assert [(c.field, c.op) for c in conditions] == [("sektor", "="), ("faza", "in"), ("punkty", ">="), ("roe", "!=")]
+    assert conditions[0].value == "technology" and conditions[1].value == ["wzrost", "dojrzałość"]
+    assert conditions[2].value == 70.0
+
+
+@pytest.mark.parametrize("query", ["roe >", "roe > abc", "sektor > Tech", "roe > 1 or punkty > 2",
+                                   "faza in (Wzrost", "roe 15", "roe > 1 and"])
+def test_parse_query_rejects_invalid_queries(query):
+    with pytest.raises(ScreenerError):
+        parse_query(query)
+
+
+def test_screen_filters_and_sorts(universe):
+    rows = screen(universe, "sektor = technology and faza = Wzrost and roe > 15 and debt_equity < 1")
+    assert [r["ticker"] for r in rows] == ["AAPL"]
+    rows = screen(universe, "roe >= 20", sort_by="roe", descending=False)
+    assert [r["ticker"] for r in rows] == ["MSFT", "AAPL", "NVDA"]
+    assert [r["ticker"] for r in screen(universe, "faza in (Dojrzałość)")] == ["JPM", "KO"]
+    assert [r["ticker"] for r in screen(universe, "portfolio = tak")] == ["KO"]
+    assert [r["ticker"] for r in screen(universe, [Condition("punkty", ">", 0)], limit=2)] == ["MSFT", "AAPL"]
+    with pytest.raises(ScreenerError):
+        screen(universe, "unknown_field > 1")
+
+
+def test_universe_index_rebuilt_after_version_change(tmp_path):
+    company_data = CompanyData(data_dir=str(tmp_path))
+    company_data.save_company_data("AAPL", _company("AAPL", roe="30"))
+    index = universe_index(company_data)
+    assert universe_index(company_data) is index
+    company_data.save_company_data("MSFT", _company("MSFT", roe="40"))
+    assert universe_index(company_data) is not index
+    assert [r["ticker"] for r in screen(company_data, "roe > 25", sort_by="roe")] == ["MSFT", "AAPL"]
+
+
+def test_in_place_score_update_visible_without_version_change(tmp_path):
+    company_data = CompanyData(data_dir=str(tmp_path))
+    company_data.save_company_data("AAPL", _company("AAPL", punkty=50))
+    assert screen(company_data, "punkty > 60") == []
+    company_data.companies[0]["punkty"] = "80.0"  # jak table_model.build_table_rows przy ręcznym sektorze i fazie
+    assert [r["ticker"] for r in screen(company_data, "punkty > 60")] == ["AAPL"]
+
+
+def test_empty_universe_accepts_known_fields(tmp_path):
+    company_data = CompanyData(data_dir=str(tmp_path))
+    assert screen(company_data, "sektor = Technology and roe > 15 and punkty > 70", sort_by="roe") == []
+    with pytest.raises(ScreenerError):
+        screen(company_data, "unknown_field > 1")
+    with pytest.raises(ScreenerError):
+        screen(company_data, "roe > 1", sort_by="unknown_field")
+
+
+def test_cli_writes_results(tmp_path, capsys):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    CompanyData(data_dir=str(data_dir)).save_company_data("AAPL", _company("AAPL", roe="30", punkty=80))
+    output = tmp_path / "wynik.json"
+    assert screen_cli.main(["roe > 10", "--data-dir", str(data_dir), "-o", str(output)]) == screen_cli.EXIT_OK
+    assert "AAPL" in capsys.readouterr().out
+    assert json.loads(output.read_text(encoding="utf-8"))[0]["ticker"] == "AAPL"
+    assert screen_cli.main(["roe >", "--data-dir", str(data_dir)]) == screen_cli.EXIT_ERROR
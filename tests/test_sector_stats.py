@@ -0,0 +1,87 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_sector_stats.py
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from src.core.company_data import CompanyData
+from src.core.scoring_calculator import calculate_score, calculate_sector_averages
+from src.core.sector_stats import SectorStats, SectorStatsEngine, column_stats
+
+
+def _company(ticker, roe, sektor="Technology", faza="Wzrost"):
+    return {"ticker": ticker, "sektor": sektor, "faza": faza, "roe": roe}
+
+
+def test_column_stats_robust_to_outlier_and_missing_values():
+    values = np.array([[1.0, np.nan], [2.0, 5.0], [3.0, np.nan], [4.0, 1.0], [1000.0, np.nan]])
+    stats, too_few = column_stats(values)
+    assert too_few is None
+    assert stats["count"] == 5 and stats["mean"] == 202.0 and stats["median"] == 3.0
+    assert stats["p25"] == 2.0 and stats["winsorized_mean"] < stats["mean"]
+
+
+def test_sector_stats_groups_by_phase_and_treats_negatives_as_zero():
+    companies = [_company("A", "-5"), _company("B", "10"), _company("C", "N/A"), _company("D", "20"),
+                 _company("E", "30", faza="Dojrzałość"), _company("F", "1", sektor="Financials")]
+    stats = SectorStats("Technology", companies, ["roe"])
+    assert stats.get("Wzrost", "roe")["mean"] == 10.0
+    assert stats.get("Dojrzałość", "roe") is None
+
+
+def test_engine_recomputes_only_changed_sector(tmp_path):
+    data = CompanyData(data_dir=str(tmp_path))
+    for company in (_company("A", "10"), _company("B", "20"), _company("C", "30"), _company("K", "50", "Financials")):
+        data.save_company_data(company["ticker"], company)
+    engine = SectorStatsEngine()
+    with patch("src.core.sector_stats.SectorStats", wraps=SectorStats) as build:
+        assert engine.baselines("Technology", "Wzrost", data, ["roe"], "median") == {"roe": 20.0}
+        data.save_company_data("K", _company("K", "70", "Financials"))
+        assert engine.baselines("Technology", "Wzrost", data, ["roe"]) == {"roe": 20.0}
+        assert build.call_count == 1
+        data.save_company_data("C", _company("C", "90"))
+        assert engine.baselines("Technology", "Wzrost", data, ["roe"]) == {"roe": 40.0}
+        assert build.call_count == 2
+
+
+def test_engine_without_versions_computes_directly():
+    company_data = Mock()
+    company_data.companies = [_company(t, v) for t, v in (("A", "1"), ("B", "2"), ("C", "30"))]
+    assert SectorStatsEngine().baselines("Technology", "Wzrost", company_data, ["roe"], "p50") == {"roe": 2.0}
+
+
+def test_calculate_sector_averages_uses_engine_means():
+    company_data = Mock()
+    company_data.companies = [_company(t, v) for t, v in (("A", "-5"), ("B", "10"), ("C", "20"), ("D", "30"))]
+    config = {"indicators": {"Wzrost": {"main": ["roe"]}}}
+    with patch("src.core.scoring_calculator.load_sector_config", return_value=config):
+        averages = calculate_sector_averages("Technology", "Wzrost", company_data, ["roe", "pe_ratio"])
+    assert averages == {"roe": 15.0, "pe_ratio": None}
+
+
+def test_percentile_rank_uses_sorted_peer_values():
+    companies = [_company(t, v) for t, v in (("A", "10"), ("B", "20"), ("C", "20"), ("D", "40"), ("E", "50"))]
+    stats = SectorStats("Technology", companies, ["roe"])
+    assert stats.percentile_rank("Wzrost", "roe", 10) == 0.0
+    assert stats.percentile_rank("Wzrost", "roe", 20) == 37.5
+    assert stats.percentile_rank("Wzrost", "roe", 50) == 100.0
+    assert stats.percentile_rank("Wzrost", "roe", 500) == 100.0
+    assert stats.percentile_rank("Dojrzałość", "roe", 10) is None
+
+
+def test_percentile_scoring_mode(tmp_path):
+    config = {
+        "scoring_mode": "percentile",
+        "indicators": {"Wzrost": {"main": ["roe", "debt_equity"], "fallback": {}, "lower_is_better": ["debt_equity"],
+                                  "weights": {"roe": 0.5, "debt_equity": 0.5}}},
+    }
+    data = CompanyData(data_dir=str(tmp_path))
+    for ticker, roe, debt in (("A", "10", "3"), ("B", "20", "2"), ("C", "30", "1.5")):
+        data.save_company_data(ticker, {**_company(ticker, roe), "debt_equity": debt})
+    with patch("src.core.scoring_calculator.load_sector_config", return_value=config), \
+            patch("src.core.scoring_calculator.calculate_trend", return_value=(None, {})):
+        best, details = calculate_score("Technology", "Wzrost", data.get_company("C"), data)
+        worst, _ = calculate_score("Technology", "Wzrost", data.get_company("A"), data)
+    assert details["indicators"]["roe"]["percentile"] == 100.0
+    assert details["indicators"]["debt_equity"]["percentile"] == 100.0
+    assert details["indicators"]["roe"]["points"] == 45.5
+    assert best > worst
@@ -0,0 +1,99 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_sentiment_analyzer.py
+import pytest
+from unittest.mock import patch
+
+from src.core import sentiment_analyzer
+from src.core.sentiment_analyzer import SentimentAnalyzer
+
+
+class FakeClassifier:
+    """Udaje pipeline HF: 'good' → POSITIVE, reszta → NEGATIVE; zapamiętuje wywołania."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, **kwargs):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        self.calls.append(list(batch))
+        return [
+            {"label": "POSITIVE" if "good" in post else "NEGATIVE", "score": 0.9}
+            for post in batch
+        ]
+
+
+@pytest.fixture
+def fake_classifier():
+    sentiment_analyzer._RESULT_CACHE.clear()
+    classifier = FakeClassifier()
+    with patch("src.core.sentiment_analyzer._get_pipeline", return_value=classifier):
+        yield classifier
+    sentiment_analyzer._RESULT_CACHE.clear()
+
+
+def test_analyze_posts_batches_sorted_by_length(fake_classifier):
+    """Posty trafiają do modelu partiami, posortowane po długości, a wynik zachowuje kolejność."""
+    analyzer = SentimentAnalyzer(batch_size=2)
+    posts = ["good long post about $AAPL", "bad", "good", "bad news again"]
+    labels = analyzer.classify_posts(posts)
+    assert [label for label, _ in labels] == ["positive", "negative", "positive", "negative"]
+    assert fake_classifier.calls == [["bad", "good"], ["bad news again", "good long post about $AAPL"]]
+
+
+def test_analyze_posts_uses_cache_and_deduplicates(fake_classifier):
+    """Powtórzone posty są klasyfikowane raz; kolejne wywołanie korzysta wyłącznie z cache."""
+    analyzer = SentimentAnalyzer(batch_size=8)
+    posts = ["good", "good", "bad"]
+    first = analyzer.analyze_posts(posts)
+    assert first["positive"] == pytest.approx(0.6)
+    assert first["negative"] == pytest.approx(0.3)
+    assert fake_classifier.calls == [["bad", "good"]]
+
+    assert analyzer.get_sentiment_score("AAPL", posts) == pytest.approx(3.0)
+    assert len(fake_classifier.calls) == 1
+
+
+def test_pipeline_is_shared_between_instances():
+    """Model ładowany jest raz na proces, niezależnie od liczby instancji analizatora."""
+    created = []
+
+    def fake_pipeline(task, model):
+        created.append(model)
+        return FakeClassifier()
+
+    sentiment_analyzer._PIPELINES.clear()
+    try:
+        with patch.dict("sys.modules", {"transformers": type("M", (), {"pipeline": staticmethod(fake_pipeline)})}):
+            first = SentimentAnalyzer()
+            second = SentimentAnalyzer()
+        assert first.backend.classifier is second.backend.classifier
+        assert created == [sentiment_analyzer.DEFAULT_MODEL]
+    finally:
+        sentiment_analyzer._PIPELINES.clear()
+
+
+def test_lexicon_backend_handles_negation_and_neutral():
+    """Backend słownikowy: negacja odwraca wydźwięk, post bez słów nacechowanych jest neutralny."""
+    analyzer = SentimentAnalyzer(backend="lexicon")
+    labels = analyzer.classify_posts(["$AAPL earnings beat, very bullish!", "not good at all", "holding $AAPL"])
+    assert [label for label, _ in labels] == ["positive", "negative", "neutral"]
+    assert all(0.0 <= score <= 1.0 for _, score in labels)
+    assert analyzer.get_sentiment_score("AAPL", ["great quarter", "great quarter"]) > 0
+
+
+def test_backend_selected_from_environment(monkeypatch):
+    """SENTIMENT_BACKEND wybiera backend; nieznana nazwa wraca do domyślnego."""
+    monkeypatch.setenv("SENTIMENT_BACKEND", "lexicon")
+    assert isinstance(SentimentAnalyzer().backend, sentiment_analyzer.LexiconBackend)
+    with patch("src.core.sentiment_analyzer._get_pipeline", return_value=FakeClassifier()):
+        backend = sentiment_analyzer.create_backend("unknown")
+    assert isinstance(backend, sentiment_analyzer.TransformersBackend)
+
+
+def test_score_tickers_parallel_matches_in_process():
+    """Tryb wieloprocesowy zwraca te same punktacje co analiza w procesie, dla każdego tickera raz."""
+    items = [(f"T{i}", ["great quarter, bullish", "weak guidance"] if i % 2 else ["terrible miss"]) for i in range(6)]
+    results = dict(
+        sentiment_analyzer.score_tickers_parallel(iter(items), workers=2, backend="lexicon", max_in_flight=2)
+    )
+    analyzer = SentimentAnalyzer(backend="lexicon")
+    assert results == {ticker: analyzer.get_sentiment_score(ticker, posts) for ticker, posts in items}
@@ -0,0 +1,74 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_singleflight.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.api import api_fetcher
+from src.api.key_pool import KeyPool
+from src.api.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight(ttl=0)
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(2)
+        return "wynik"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flight.do, ("FMP", "profile", "AAPL"), slow) for _ in range(5)]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result() for f in futures]
+    assert results == ["wynik"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 1, "shared": 4, "memo_hits": 0}
+
+
+def test_error_is_shared_and_not_memoized():
+    flight = SingleFlight(ttl=30)
+    with pytest.raises(RuntimeError):
+        flight.do("k", Mock(side_effect=RuntimeError("błąd")))
+    assert flight.do("k", lambda: 1) == 1
+
+
+def test_memo_expires_and_respects_predicate():
+    now = [0.0]
+    flight = SingleFlight(ttl=10, clock=lambda: now[0])
+    fn = Mock(side_effect=[1, 2, 3])
+    assert flight.do("k", fn) == 1
+    assert flight.do("k", fn) == 1
+    now[0] = 11.0
+    assert flight.do("k", fn) == 2
+    assert flight.do("x", lambda: 500, memoize=lambda result: result == 200) == 500
+    assert flight.do("x", lambda: 200, memoize=lambda result: result == 200) == 200
+    assert fn.call_count == 2
+
+
+def test_parallel_finnhub_fetches_of_same_ticker_share_http_calls():
+    pool = KeyPool("Finnhub", ["TEST"])
+    barrier = threading.Barrier(3)
+
+    def get(url, timeout=None):
+        time.sleep(0.05)
+        return Mock(status_code=200, json=lambda: {})
+
+    with patch.object(api_fetcher, "get_key_pool", return_value=pool), \
+            patch.object(api_fetcher, "_get_session") as mock_session:
+        mock_session.return_value.get.side_effect = get
+
+        def fetch():
+            barrier.wait()
+            return api_fetcher.fetch_from_finnhub("AAPL")
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(lambda _: fetch(), range(3)))
+        # kolejne wywołanie w oknie pamięci – bez ruchu sieciowego
+        api_fetcher.fetch_from_finnhub("AAPL")
+    assert mock_session.return_value.get.call_count == 4  # 4 endpointy, raz
@@ -0,0 +1,34 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_startup_imports.py
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["requests", "yfinance", "pandas", "matplotlib", "transformers", "bs4"]
+
+
+@pytest.mark.parametrize("module", ["src.api.api_fetcher", "src.core.company_data", "src.core.sentiment_analyzer"])
+def test_import_does_not_load_heavy_modules(module):
+    """Import modułów biblioteki nie ładuje ciężkich zależności ani nie pisze na stdout."""
+    code = (
+        f"import json, sys; import {module}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    lines = proc.stdout.strip().splitlines()
+    assert len(lines) == 1, f"Nieoczekiwany tekst na stdout: {proc.stdout!r}"
+    assert json.loads(lines[0]) == []
+
+
+def test_import_does_not_configure_logging(tmp_path):
+    """Import nie tworzy plików logów w katalogu roboczym – robi to dopiero punkt wejścia."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    code = "import src.core.company_data, src.api.api_fetcher"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert not (tmp_path / "error.log").exists()
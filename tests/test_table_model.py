@@ -0,0 +1,53 @@
+# ŚCIEŻKA: C:\Users\Msi\Desktop\analizator\tests\test_table_model.py
+from unittest.mock import Mock, patch
+
+from src.core.table_model import build_table_rows, row_tag
+
+COLUMNS = ("ticker", "nazwa", "sektor", "faza", "punkty", "więcej")
+CONFIG = {
+    "indicators": {
+        "Wzrost": {
+            "main": ["revenue_growth", "roe"],
+            "fallback": {"roe": [{"indicator": "profit_margin", "weight": 0.2}]},
+        }
+    }
+}
+
+
+def _company(ticker, **values):
+    company = {"ticker": ticker, "nazwa": f"{ticker} Inc.", "sektor": "Technology", "faza": None, "punkty": None}
+    company.update(values)
+    return company
+
+
+def test_row_tag_reflects_missing_main_and_fallback_indicators():
+    with patch("src.core.table_model.load_sector_config", return_value=CONFIG):
+        assert row_tag(_company("A", faza="Wzrost", revenue_growth="10", roe="5")) == "green_row"
+        assert row_tag(_company("B", faza="Wzrost", revenue_growth="10", profit_margin="3")) == "orange_row"
+        assert row_tag(_company("C", faza="Wzrost", roe="5")) == "red_row"
+        assert row_tag(_company("D", faza="None")) == "green_row"
+
+
+def test_build_table_rows_scores_and_formats_portfolio_first():
+    company_data = Mock()
+    company_data.companies = [_company("AAPL", revenue_growth="10", roe="5"),
+                              _company("MSFT", revenue_growth="10", roe="5", is_in_portfolio=True)]
+    details = {"used_fallbacks": {}, "bonuses": {"sector": 5}, "indicators": {}, "sector_phase_avg": 1.0,
+               "sector_avg": 1.0, "trend_details": {}}
+    with patch("src.core.table_model.load_sector_config", return_value=CONFIG), \
+            patch("src.core.table_model.classify_phase", return_value="Wzrost"), \
+            patch("src.core.table_model.calculate_score", return_value=(61.234, details)):
+        rows = build_table_rows(company_data, COLUMNS)
+    assert [row["ticker"] for row in rows] == ["MSFT", "AAPL"]
+    assert rows[0]["values"] == ["MSFT", "MSFT Inc.", "Technology", "Wzrost", "61.23", "Pokaż"]
+    assert rows[0]["tag"] == "green_row"
+    assert "Bonus za Sektor: +5 pkt" in rows[0]["tooltips"]["punkty"]
+    assert company_data.save_company_data.call_count == 2
+
+
+def test_build_table_rows_skips_company_that_failed_to_save():
+    company_data = Mock()
+    company_data.companies = [_company("AAPL", sektor=None)]
+    company_data.save_company_data.side_effect = PermissionError("read-only")
+    assert build_table_rows(company_data, COLUMNS) == []
+    assert build_table_rows(company_data, COLUMNS, save=False)[0]["values"][4] == ""